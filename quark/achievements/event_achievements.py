@@ -1,38 +1,102 @@
 import re
 import string
 
+from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Count
 
-from quark.achievements.models import Achievement
+from quark.achievements.models import PendingAchievementEvaluation
 from quark.base.models import Term
 from quark.events.models import Event
 from quark.events.models import EventAttendance
-from quark.shortcuts import get_object_or_none
+from quark.events.models import attendance_updated
 
 
-def event_achievements(sender, instance, created, **kwargs):
-    # obtain lifetime attendance for the user
-    total_attendance = EventAttendance.objects.select_related(
-        'event__term').filter(
-        user=instance.user, event__cancelled=False).order_by('event__term__pk')
-
-    # obtain the events in the term that the edited event is in
-    term_events = Event.objects.filter(
-        cancelled=False, term=instance.event.term)
-
-    # obtain the events that the user has attended in this term
-    term_attendance = total_attendance.filter(
-        event__term=instance.event.term).select_related(
-        'term', 'event__event_type')
+# a map from the name of the event_type to the name of the corresponding
+# achievement, for use in determining what achievement to update
+EVENT_TYPE_MAP = {
+    'Meeting': 'meetings',
+    'Big Social': 'big_socials',
+    'Bent Polishing': 'bent_polishings',
+    'Infosession': 'infosessions',
+    'Community Service': 'service',
+    'E Futures': 'efutures',
+    'Fun': 'fun',
+    'Professional Development': 'prodev'
+    }
 
-    # obtain the events in the term with the same type
-    type_events = term_events.filter(event_type=instance.event.event_type)
-
-    # sets of the event types attended and existing in the term to assign
-    # the achievement for attending 1 event of each type
-    types_attended = term_attendance.values('event__event_type').distinct()
-    types_existing = term_events.values('event_type').distinct()
 
+def event_achievements(sender, instance, created, **kwargs):
+    # only queue the user for evaluation here, since evaluating all event
+    # achievements is too expensive to do while recording attendance
+    PendingAchievementEvaluation.objects.enqueue(
+        instance.user, PendingAchievementEvaluation.EVENT_ATTENDANCE,
+        term=instance.event.term)
+
+
+def event_achievements_bulk(sender, event, added_users, **kwargs):
+    # attendance recorded for many users at once only queues them as well
+    if added_users:
+        PendingAchievementEvaluation.objects.enqueue_users(
+            added_users, PendingAchievementEvaluation.EVENT_ATTENDANCE,
+            term=event.term)
+
+
+def evaluate_event_achievements(user_terms, achievements):
+    """Evaluate event achievements for a batch of users.
+
+    user_terms is a dictionary mapping user IDs to the set of term IDs in which
+    their attendance changed, and achievements is a dictionary of all
+    achievements keyed by short name.
+    """
+    users = get_user_model().objects.in_bulk(user_terms.keys())
+
+    # obtain the number of events of each type in every term being evaluated,
+    # as a dictionary mapping term IDs to dictionaries of event type IDs to
+    # the number of events of that type
+    all_term_ids = set()
+    for term_ids in user_terms.itervalues():
+        all_term_ids.update(term_ids)
+    term_type_counts = {}
+    type_counts = Event.objects.filter(
+        cancelled=False, term__in=all_term_ids).values(
+        'term', 'event_type').annotate(count=Count('pk')).order_by()
+    for type_count in type_counts:
+        term_type_counts.setdefault(type_count['term'], {})[
+            type_count['event_type']] = type_count['count']
+
+    for user_id, term_ids in user_terms.iteritems():
+        user = users.get(user_id)
+        if user is None:
+            continue
+
+        # obtain lifetime attendance for the user
+        total_attendance = list(EventAttendance.objects.select_related(
+            'event__term', 'event__event_type').filter(
+            user=user, event__cancelled=False).order_by('event__term__pk'))
+
+        assign_lifetime_achievements(user, achievements, total_attendance)
+
+        for term_id in term_ids:
+            # obtain the events that the user has attended in this term
+            term_attendance = [attendance for attendance in total_attendance
+                               if attendance.event.term_id == term_id]
+            if not term_attendance:
+                continue
+            term = term_attendance[0].event.term
+            type_events = term_type_counts.get(term_id, {})
+
+            assign_alphabet_achievement(
+                user, achievements, term, term_attendance)
+            assign_event_type_achievements(
+                user, achievements, term, term_attendance, type_events)
+            assign_salad_bowl_achievement(
+                user, achievements, term, term_attendance, type_events)
+            assign_specific_event_achievements(
+                user, achievements, term, term_attendance)
+
+
+def assign_alphabet_achievement(user, achievements, term, term_attendance):
     # remaining letters to track the achievement for attending events with
     # the letters a-z in their titles in a term
     remaining_letters = set(string.lowercase)
@@ -43,105 +107,84 @@ def event_achievements(sender, instance, created, **kwargs):
         if len(remaining_letters) == 0:
             break
 
-    assign_alphabet_achievement(instance, remaining_letters)
-    assign_event_type_achievements(instance, type_events)
-    assign_lifetime_achievements(instance, total_attendance)
-    assign_salad_bowl_achievement(instance, types_attended, types_existing)
-    assign_specific_event_achievements(instance)
-
-
-def assign_alphabet_achievement(instance, remaining_letters):
     if len(remaining_letters) == 0:
-        achievement = get_object_or_none(Achievement,
-                                         short_name='alphabet_attendance')
+        achievement = achievements.get('alphabet_attendance')
         if achievement:
-            achievement.assign(instance.user, term=instance.event.term)
-
-
-def assign_event_type_achievements(instance, type_events):
-    # obtain the user's attendance for events with the same type as instance
-    type_attendance = EventAttendance.objects.filter(
-        user=instance.user,
-        event__event_type=instance.event.event_type,
-        event__term=instance.event.term,
-        event__cancelled=False)
-
-    event_type = instance.event.event_type
-    # a map from the name of the event_type to the name of the corresponding
-    # achievement, for use in determining what achievement to update
-    event_type_map = {
-        'Meeting': 'meetings',
-        'Big Social': 'big_socials',
-        'Bent Polishing': 'bent_polishings',
-        'Infosession': 'infosessions',
-        'Community Service': 'service',
-        'E Futures': 'efutures',
-        'Fun': 'fun',
-        'Professional Development': 'prodev'
-        }
-
-    if event_type.name in event_type_map:
-        short_name = 'attend_all_{}'.format(
-            event_type_map[instance.event.event_type.name])
-        achievement = get_object_or_none(
-            Achievement, short_name=short_name)
-        if achievement and (type_events.count() == type_attendance.count()):
-            achievement.assign(instance.user, term=instance.event.term)
-
-
-def assign_lifetime_achievements(instance, total_attendance):
-    attendance_count = total_attendance.count()
+            achievement.assign(user, term=term)
+
+
+def assign_event_type_achievements(user, achievements, term, term_attendance,
+                                   type_events):
+    # count the user's attendance for events of each type in the term
+    type_attendance = {}
+    for event_attendance in term_attendance:
+        event_type = event_attendance.event.event_type
+        type_attendance[event_type] = type_attendance.get(event_type, 0) + 1
+
+    for event_type, attendance_count in type_attendance.iteritems():
+        if event_type.name in EVENT_TYPE_MAP:
+            short_name = 'attend_all_{}'.format(EVENT_TYPE_MAP[event_type.name])
+            achievement = achievements.get(short_name)
+            if achievement and (
+                    type_events.get(event_type.pk) == attendance_count):
+                achievement.assign(user, term=term)
+
+
+def assign_lifetime_achievements(user, achievements, total_attendance):
+    attendance_count = len(total_attendance)
 
     # the number of events needed to get achievements
     benchmarks = [25, 50, 78, 100, 150, 200, 300]
 
     for benchmark in benchmarks:
         short_name = 'attend{:03d}events'.format(benchmark)
-        achievement = get_object_or_none(Achievement, short_name=short_name)
+        achievement = achievements.get(short_name)
         if achievement:
             if attendance_count < benchmark:
                 achievement.assign(
-                    instance.user, acquired=False, progress=attendance_count)
+                    user, acquired=False, progress=attendance_count)
             else:
                 achievement.assign(
-                    instance.user,
-                    term=total_attendance[benchmark - 1].event.term)
+                    user, term=total_attendance[benchmark - 1].event.term)
 
 
-def assign_salad_bowl_achievement(instance, types_attended, types_existing):
-    if types_attended.count() == types_existing.count():
-        achievement = get_object_or_none(
-            Achievement, short_name='attend_each_type')
+def assign_salad_bowl_achievement(user, achievements, term, term_attendance,
+                                  type_events):
+    # sets of the event types attended and existing in the term to assign
+    # the achievement for attending 1 event of each type
+    types_attended = set(event_attendance.event.event_type_id
+                         for event_attendance in term_attendance)
+    if len(types_attended) == len(type_events):
+        achievement = achievements.get('attend_each_type')
         if achievement:
-            achievement.assign(instance.user, term=instance.event.term)
+            achievement.assign(user, term=term)
 
 
-def assign_specific_event_achievements(instance):
+def assign_specific_event_achievements(user, achievements, term,
+                                       term_attendance):
     d15_regex = re.compile(r'.*D(istrict)?[\s]?15.*')
-    if d15_regex.match(instance.event.name):
-        d15_achievement = get_object_or_none(Achievement,
-                                             short_name='attend_d15')
-        if d15_achievement:
-            d15_achievement.assign(instance.user, term=instance.event.term)
-
-    if 'National Convention' in instance.event.name:
-        natl_achievement = get_object_or_none(Achievement,
-                                              short_name='attend_convention')
-        if natl_achievement:
-            natl_achievement.assign(instance.user, term=instance.event.term)
-
-    if 'Envelope Stuffing' in instance.event.name:
-        envelope_achievement = get_object_or_none(
-            Achievement, short_name='attend_envelope_stuffing')
-        if envelope_achievement:
-            envelope_achievement.assign(instance.user, term=instance.event.term)
-
-    if instance.event.name == 'Candidate Meeting' and (
-            instance.event.term == Term(term=Term.FALL, year=2013)):
-        cm2013_achievement = get_object_or_none(
-            Achievement, short_name='berkeley_explosion')
-        if cm2013_achievement:
-            cm2013_achievement.assign(instance.user, term=instance.event.term)
+    short_names = set()
+
+    for event_attendance in term_attendance:
+        event_name = event_attendance.event.name
+        if d15_regex.match(event_name):
+            short_names.add('attend_d15')
+
+        if 'National Convention' in event_name:
+            short_names.add('attend_convention')
+
+        if 'Envelope Stuffing' in event_name:
+            short_names.add('attend_envelope_stuffing')
+
+        if event_name == 'Candidate Meeting' and (
+                term == Term(term=Term.FALL, year=2013)):
+            short_names.add('berkeley_explosion')
+
+    for short_name in short_names:
+        achievement = achievements.get(short_name)
+        if achievement:
+            achievement.assign(user, term=term)
 
 
 models.signals.post_save.connect(event_achievements, sender=EventAttendance)
+attendance_updated.connect(event_achievements_bulk, sender=EventAttendance)
@@ -2,7 +2,6 @@ from django.db import models
 
 from quark.achievements.models import Achievement
 from quark.exams.models import Exam
-from quark.shortcuts import get_object_or_none
 
 
 def exam_achievements(sender, instance, created, **kwargs):
@@ -22,7 +21,7 @@ def assign_lifetime_exam_achievements(instance):
 
     for benchmark in benchmarks:
         short_name = 'upload_{:02d}_exams'.format(benchmark)
-        achievement = get_object_or_none(Achievement, short_name=short_name)
+        achievement = Achievement.objects.get_by_short_name(short_name)
         if achievement:
             if approved_exam_count < benchmark:
                 achievement.assign(
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from quark.achievements.models import PendingAchievementEvaluation
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **kwargs):
+        """Evaluate achievements for all users queued for evaluation since the
+        last time the queue was processed.
+        """
+        num_users = PendingAchievementEvaluation.objects.process()
+        if int(kwargs.get('verbosity')) > 0:
+            self.stdout.write(
+                'Evaluated achievements for {} users'.format(num_users))
@@ -2,7 +2,6 @@ from django.db import models
 
 from quark.achievements.models import Achievement
 from quark.achievements.models import UserAchievement
-from quark.shortcuts import get_object_or_none
 
 
 # achievement-related achievements
@@ -24,8 +23,8 @@ def assign_award_achievements(sender, instance, created, **kwargs):
         # check if all short names in list are present in user's achievements
         if (len(short_name_set & user_achievements_set) ==
                 len(short_name_set)):
-            achievement = get_object_or_none(Achievement,
-                                             short_name='cots_mots_oots')
+            achievement = Achievement.objects.get_by_short_name(
+                'cots_mots_oots')
             if achievement:
                 achievement.assign(instance.user, term=instance.term)
 
@@ -44,8 +43,7 @@ def assign_completion_achievements(sender, instance, created, **kwargs):
 
         for benchmark in benchmarks:
             short_name = 'acquire_{:02d}_achievements'.format(benchmark)
-            achievement = get_object_or_none(
-                Achievement, short_name=short_name)
+            achievement = Achievement.objects.get_by_short_name(short_name)
             if achievement:
                 if achievement_count < benchmark:
                     achievement.assign(
@@ -71,7 +69,7 @@ def assign_icon_achievements(sender, instance, created, **kwargs):
 
         for benchmark in benchmarks:
             short_name = 'create_{:02d}_icons'.format(benchmark)
-            achievement = get_object_or_none(Achievement, short_name=short_name)
+            achievement = Achievement.objects.get_by_short_name(short_name)
             if achievement:
                 if achievement_count < benchmark:
                     achievement.assign(
@@ -1,13 +1,57 @@
+import uuid
+
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.db import IntegrityError
 from django.db import models
+from django.db import transaction
 
 from quark.base.models import Term
 from quark.notifications.models import Notification
 from quark.shortcuts import get_object_or_none
 
 
+class AchievementManager(models.Manager):
+    # The cache key for the version number of the achievement catalog, which
+    # is shared between processes so that a change to any achievement makes
+    # every process reload its copy of the catalog
+    CATALOG_VERSION_KEY = 'achievement_catalog_version'
+
+    def __init__(self):
+        super(AchievementManager, self).__init__()
+        self._catalog = None
+        self._catalog_version = None
+
+    def get_catalog(self):
+        """Return a dictionary of all achievements keyed by short name.
+
+        The catalog is only loaded from the database once per process, and is
+        reloaded after any achievement is saved or deleted.
+        """
+        version = cache.get(self.CATALOG_VERSION_KEY)
+        if self._catalog is None or version != self._catalog_version:
+            self._catalog = dict(
+                (achievement.short_name, achievement)
+                for achievement in self.get_query_set())
+            self._catalog_version = version
+        return self._catalog
+
+    def get_by_short_name(self, short_name):
+        """Return the achievement with the given short name, or None if no
+        such achievement exists.
+        """
+        return self.get_catalog().get(short_name)
+
+    def invalidate_catalog(self):
+        """Discard this process's catalog and bump the shared catalog version
+        so that other processes discard theirs as well.
+        """
+        self._catalog = None
+        cache.set(self.CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
+
+
 class Achievement(models.Model):
     """An achievement shows significant user accomplishment in some way."""
     # These are strings because they're easier to deal with in fixtures.
@@ -97,6 +141,8 @@ class Achievement(models.Model):
         settings.AUTH_USER_MODEL, blank=True, null=True,
         help_text='The creator of the icon used for this achievement.')
 
+    objects = AchievementManager()
+
     class Meta(object):
         ordering = ('rank',)
 
@@ -185,6 +231,118 @@ class UserAchievement(models.Model):
                                 self.achievement.name)
 
 
+class PendingAchievementEvaluationManager(models.Manager):
+    def enqueue(self, user, trigger, term=None):
+        """Record that the given user's achievements for the given trigger
+        (and optionally term) need to be re-evaluated.
+
+        Enqueueing the same user, trigger and term more than once before the
+        queue is processed only results in a single evaluation.
+        """
+        self.get_or_create(user=user, trigger=trigger, term=term)
+
+    def enqueue_users(self, users, trigger, term=None):
+        """Record that the achievements of each of the given users need to be
+        re-evaluated, like enqueue, using a single insert.
+        """
+        queued_pks = set(self.filter(
+            user__in=users, trigger=trigger, term=term).values_list(
+            'user_id', flat=True))
+        new_users = dict((user.pk, user) for user in users
+                         if user.pk not in queued_pks)
+        try:
+            with transaction.atomic():
+                self.bulk_create([
+                    self.model(user=user, trigger=trigger, term=term)
+                    for user in new_users.itervalues()])
+        except IntegrityError:  # pylint: disable=E0712
+            # Some of the users were enqueued at the same time elsewhere, so
+            # enqueue them individually instead
+            for user in new_users.itervalues():
+                self.enqueue(user, trigger, term=term)
+
+    def process(self):
+        """Evaluate achievements for every pending (user, trigger) pair and
+        remove them from the queue.
+
+        Each trigger's evaluator is called once with a dictionary mapping user
+        IDs to the set of term IDs that need to be evaluated for that user,
+        along with a dictionary of all achievements keyed by short name, so
+        that each affected user is only evaluated once per batch. Returns the
+        number of users evaluated.
+        """
+        # Avoid circular dependency by importing here:
+        from quark.achievements.event_achievements import (
+            evaluate_event_achievements)
+        evaluators = {
+            PendingAchievementEvaluation.EVENT_ATTENDANCE:
+                evaluate_event_achievements,
+        }
+
+        with transaction.atomic():
+            pending = list(self.values_list(
+                'pk', 'user_id', 'trigger', 'term_id'))
+            if not pending:
+                return 0
+
+            # Remove the claimed entries before evaluating, so that anything
+            # enqueued while the evaluation runs is picked up by the next batch
+            self.filter(pk__in=[entry[0] for entry in pending]).delete()
+
+            users_by_trigger = {}
+            for _, user_id, trigger, term_id in pending:
+                user_terms = users_by_trigger.setdefault(trigger, {})
+                terms = user_terms.setdefault(user_id, set())
+                if term_id is not None:
+                    terms.add(term_id)
+
+            achievements = Achievement.objects.get_catalog()
+
+            evaluated_users = set()
+            for trigger, user_terms in users_by_trigger.iteritems():
+                evaluators[trigger](user_terms, achievements)
+                evaluated_users.update(user_terms.keys())
+
+        return len(evaluated_users)
+
+
+class PendingAchievementEvaluation(models.Model):
+    """A queued request to re-evaluate a user's automatic achievements.
+
+    Signal handlers enqueue these rather than evaluating achievements while the
+    triggering request is being handled. The queue is processed in batches by
+    the process_achievements management command, which evaluates each affected
+    user only once no matter how many times they were enqueued.
+    """
+    EVENT_ATTENDANCE = 'event_attendance'
+    TRIGGER_CHOICES = (
+        (EVENT_ATTENDANCE, 'Event attendance'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL)
+    trigger = models.CharField(choices=TRIGGER_CHOICES, max_length=32)
+    term = models.ForeignKey(
+        Term, null=True, blank=True,
+        help_text='The term to evaluate achievements for, or null.')
+    created = models.DateTimeField(auto_now_add=True)
+
+    objects = PendingAchievementEvaluationManager()
+
+    class Meta(object):
+        unique_together = ('user', 'trigger', 'term')
+
+    def __unicode__(self):
+        return '{} - {}'.format(self.user.get_full_name(),
+                                self.get_trigger_display())
+
+
+def invalidate_achievement_catalog(sender, **kwargs):
+    """Make sure the achievement catalog is reloaded after an achievement is
+    changed, including by loaddata.
+    """
+    Achievement.objects.invalidate_catalog()
+
+
 def achievement_notification(sender, instance, created, **kwargs):
     """Create a notification if the user achievement has been acquired."""
     if instance.acquired:
@@ -214,6 +372,10 @@ def achievement_notification_delete(sender, instance, **kwargs):
         notification.delete()
 
 
+models.signals.post_save.connect(
+    invalidate_achievement_catalog, sender=Achievement)
+models.signals.post_delete.connect(
+    invalidate_achievement_catalog, sender=Achievement)
 models.signals.post_save.connect(
     achievement_notification, sender=UserAchievement)
 models.signals.post_delete.connect(
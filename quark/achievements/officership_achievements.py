@@ -4,7 +4,6 @@ from django.db import models
 
 from quark.achievements.models import Achievement
 from quark.base.models import Officer
-from quark.shortcuts import get_object_or_none
 
 
 # officership-related achievements
@@ -89,7 +88,7 @@ def assign_tenure_achievements(instance, unique_terms):
     # 1 to 8 officer semesters
     for i in range(1, 9):
         short_name = 'officersemester{:02d}'.format(i)
-        achievement = get_object_or_none(Achievement, short_name=short_name)
+        achievement = Achievement.objects.get_by_short_name(short_name)
         if achievement:
             if num_unique_terms < i:
                 achievement.assign(
@@ -101,10 +100,10 @@ def assign_tenure_achievements(instance, unique_terms):
 def assign_chair_achievements(instance, chair_terms):
     num_committees_chaired = len(chair_terms)
 
-    chair1achievement = get_object_or_none(
-        Achievement, short_name='chair1committee')
-    chair2achievement = get_object_or_none(
-        Achievement, short_name='chair2committees')
+    chair1achievement = Achievement.objects.get_by_short_name(
+        'chair1committee')
+    chair2achievement = Achievement.objects.get_by_short_name(
+        'chair2committees')
     if num_committees_chaired >= 1:
         # terms is a list of lists
         terms = chair_terms.values()
@@ -129,12 +128,12 @@ def assign_chair_achievements(instance, chair_terms):
 
 
 def assign_repeat_achievements(instance, repeat_positions):
-    twice_same_position = get_object_or_none(
-        Achievement, short_name='twice_same_position')
-    thrice_same_position = get_object_or_none(
-        Achievement, short_name='thrice_same_position')
-    two_repeated_positions = get_object_or_none(
-        Achievement, short_name='two_repeated_positions')
+    twice_same_position = Achievement.objects.get_by_short_name(
+        'twice_same_position')
+    thrice_same_position = Achievement.objects.get_by_short_name(
+        'thrice_same_position')
+    two_repeated_positions = Achievement.objects.get_by_short_name(
+        'two_repeated_positions')
 
     twice_held_positions = set()
     num_unique_twice_held_positions = 0
@@ -161,8 +160,8 @@ def assign_repeat_achievements(instance, repeat_positions):
 
 
 def assign_diffposition_achievements(instance, committee_terms):
-    three_unique_positions = get_object_or_none(
-        Achievement, short_name='three_unique_positions')
+    three_unique_positions = Achievement.objects.get_by_short_name(
+        'three_unique_positions')
     if len(committee_terms) >= 3:
         # terms is a list of lists
         terms = committee_terms.values()
@@ -176,8 +175,8 @@ def assign_diffposition_achievements(instance, committee_terms):
 
 
 def assign_straight_to_the_top_achievement(instance, straight_to_the_top_term):
-    straighttothetop = get_object_or_none(
-        Achievement, short_name='straighttothetop')
+    straighttothetop = Achievement.objects.get_by_short_name(
+        'straighttothetop')
     if straighttothetop:
         straighttothetop.assign(instance.user, term=straight_to_the_top_term)
 
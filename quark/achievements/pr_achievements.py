@@ -4,7 +4,6 @@ from django.db import models
 
 from quark.achievements.models import Achievement
 from quark.project_reports.models import ProjectReport
-from quark.shortcuts import get_object_or_none
 
 
 def project_report_achievements(sender, instance, created, **kwargs):
@@ -29,8 +28,8 @@ def assign_alphabet_pr_achievement(instance):
     unused_letters.difference_update(project_report_text.lower())
 
     if len(unused_letters) == 0:
-        achievement = get_object_or_none(Achievement,
-                                         short_name='alphabet_project_report')
+        achievement = Achievement.objects.get_by_short_name(
+            'alphabet_project_report')
         if achievement:
             achievement.assign(instance.author, term=instance.term)
 
@@ -48,7 +47,7 @@ def assign_lifetime_pr_achievements(instance):
 
     for benchmark in benchmarks:
         short_name = 'write_{:02d}_project_reports'.format(benchmark)
-        achievement = get_object_or_none(Achievement, short_name=short_name)
+        achievement = Achievement.objects.get_by_short_name(short_name)
         if achievement:
             if project_report_count < benchmark:
                 achievement.assign(
@@ -68,8 +67,8 @@ def assign_procrastination_achievement(instance):
     writing_time = completion_date - event_date
 
     if writing_time.days >= 60:
-        achievement = get_object_or_none(
-            Achievement, short_name='project_report_procrastination')
+        achievement = Achievement.objects.get_by_short_name(
+            'project_report_procrastination')
         if achievement:
             achievement.assign(instance.author, term=instance.term)
 
@@ -9,6 +9,7 @@ from django.utils import timezone
 from freezegun import freeze_time
 
 from quark.achievements.models import Achievement
+from quark.achievements.models import PendingAchievementEvaluation
 from quark.achievements.models import UserAchievement
 from quark.base.models import Officer
 from quark.base.models import OfficerPosition
@@ -22,7 +23,14 @@ from quark.project_reports.models import ProjectReport
 from quark.shortcuts import get_object_or_none
 
 
-class AchievementAssignmentTest(TestCase):
+class AchievementTestCase(TestCase):
+    def tearDown(self):
+        # The achievements created by the test are rolled back without any
+        # signals being sent, so make sure that later tests don't use them
+        Achievement.objects.invalidate_catalog()
+
+
+class AchievementAssignmentTest(AchievementTestCase):
     fixtures = ['test/term.yaml']
 
     def setUp(self):
@@ -114,8 +122,26 @@ class AchievementAssignmentTest(TestCase):
         self.assertEqual(self.achievements.filter(term=self.sp2010).count(), 1)
         self.assertEqual(self.achievements.filter(acquired=True).count(), 1)
 
+    def test_catalog(self):
+        # test to see that achievements can be looked up by short name without
+        # any queries once the catalog is loaded, and that the catalog is
+        # reloaded when an achievement is changed
+        Achievement.objects.get_catalog()
+        with self.assertNumQueries(0):
+            self.assertEqual(Achievement.objects.get_by_short_name('test'),
+                             self.achievement)
+            self.assertIsNone(Achievement.objects.get_by_short_name('other'))
+
+        self.achievement.name = 'Renamed'
+        self.achievement.save()
+        self.assertEqual(
+            Achievement.objects.get_by_short_name('test').name, 'Renamed')
+
+        self.achievement.delete()
+        self.assertIsNone(Achievement.objects.get_by_short_name('test'))
 
-class EventAchievementsTest(TestCase):
+
+class EventAchievementsTest(AchievementTestCase):
     fixtures = ['achievement.yaml',
                 'officer_position.yaml',
                 'test/term.yaml']
@@ -163,6 +189,7 @@ class EventAchievementsTest(TestCase):
         if attendance:
             EventAttendance.objects.get_or_create(event=event,
                                                   user=self.sample_user)
+            PendingAchievementEvaluation.objects.process()
 
         return event
 
@@ -190,6 +217,41 @@ class EventAchievementsTest(TestCase):
                            for event in created_events]
             EventAttendance.objects.bulk_create(attendances)
 
+    def test_evaluation_is_queued(self):
+        """Recording attendance only queues the user for evaluation, and
+        attendance in the same term is evaluated once when the queue is
+        processed.
+        """
+        for name in ['D15', 'National Convention']:
+            event = self.create_event(name=name, event_type=self.fun,
+                                      attendance=False)
+            EventAttendance.objects.create(event=event, user=self.sample_user)
+
+        self.assertEqual(PendingAchievementEvaluation.objects.filter(
+            user=self.sample_user, term=self.sp2013).count(), 1)
+        self.assertFalse(self.achievements.exists())
+
+        self.assertEqual(PendingAchievementEvaluation.objects.process(), 1)
+        self.assertFalse(PendingAchievementEvaluation.objects.exists())
+        self.assertEqual(self.achievements.filter(
+            achievement__short_name__in=['attend_d15', 'attend_convention'],
+            acquired=True).count(), 2)
+
+    def test_bulk_attendance_is_queued(self):
+        """Recording attendance for many users at once queues them all for
+        evaluation.
+        """
+        event = self.create_event(name='D15', event_type=self.fun,
+                                  attendance=False)
+        EventAttendance.objects.update_attendance(
+            event, add_users=[self.sample_user])
+        self.assertEqual(PendingAchievementEvaluation.objects.filter(
+            user=self.sample_user, term=self.sp2013).count(), 1)
+
+        PendingAchievementEvaluation.objects.process()
+        self.assertEqual(self.achievements.filter(
+            achievement__short_name='attend_d15', acquired=True).count(), 1)
+
     def test_25_lifetime_events(self):
         """Achievement for 25 lifetime events is obtained after 25th event.
         """
@@ -585,7 +647,7 @@ class EventAchievementsTest(TestCase):
             acquired=True).count(), 1)
 
 
-class ExamAchievementsTest(TestCase):
+class ExamAchievementsTest(AchievementTestCase):
     fixtures = ['achievement.yaml',
                 'test/course_instance.yaml']
 
@@ -775,7 +837,7 @@ class ExamAchievementsTest(TestCase):
             progress__gte=1).count(), 1)
 
 
-class MetaAchievementsTest(TestCase):
+class MetaAchievementsTest(AchievementTestCase):
     fixtures = ['achievement.yaml',
                 'test/term.yaml']
 
@@ -927,7 +989,7 @@ class MetaAchievementsTest(TestCase):
             acquired=True).count(), 1)
 
 
-class OfficerAchievementsTest(TestCase):
+class OfficerAchievementsTest(AchievementTestCase):
     fixtures = ['achievement.yaml',
                 'officer_position.yaml',
                 'test/term.yaml']
@@ -1208,7 +1270,7 @@ class OfficerAchievementsTest(TestCase):
             acquired=True).count(), 0)
 
 
-class ProjectReportAchievementsTest(TestCase):
+class ProjectReportAchievementsTest(AchievementTestCase):
     fixtures = ['achievement.yaml',
                 'test/term.yaml',
                 'officer_position.yaml']
@@ -1,3 +1,6 @@
+import re
+import uuid
+
 from django.conf import settings
 from django.contrib.auth.models import Group
 from django.core.cache import cache
@@ -48,18 +51,41 @@ class Major(models.Model):
 
 
 class TermManager(models.Manager):
+    # The cached terms are only looked up under the current version of the term
+    # cache, which invalidate_cache changes whenever any term is changed
+    CACHE_VERSION_KEY = 'term_cache_version'
+
+    # Matches URL names (like "fa2012") whose terms are cached, which excludes
+    # names with characters that cannot be used in cache keys
+    URL_NAME_RE = re.compile(r'^[a-z]{2}[0-9]{1,5}$')
+
+    def get_cache_key(self, name):
+        """Return the cache key for the given name under the current version of
+        the term cache.
+        """
+        version = cache.get(self.CACHE_VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.set(self.CACHE_VERSION_KEY, version, None)
+        return 'term_{}_{}'.format(version, name)
+
+    def invalidate_cache(self):
+        """Discard all cached terms, in every process sharing the cache."""
+        cache.set(self.CACHE_VERSION_KEY, uuid.uuid4().hex, None)
+
     def get_current_term(self):
         """Return the term with current set to True, or None if no current term
         exists.
         """
-        term = cache.get('current_term')
-        if not term:
+        cache_key = self.get_cache_key('current')
+        term = cache.get(cache_key)
+        if term is None:
             try:
                 term = self.get(current=True)
-                cache.set('current_term', term)
             except Term.DoesNotExist:
-                pass
-        return term
+                term = False
+            cache.set(cache_key, term)
+        return term or None
 
     def get_terms(self, include_future=False, include_summer=False,
                   include_unknown=False, reverse=False):
@@ -86,6 +112,19 @@ class TermManager(models.Manager):
 
         return terms
 
+    def get_term_list(self, **kwargs):
+        """Return a list of the terms that get_terms returns for the given
+        arguments, which is cached until any term changes.
+        """
+        cache_key = self.get_cache_key('list_{}'.format('_'.join(
+            '{}{:d}'.format(key, bool(value))
+            for key, value in sorted(kwargs.items()))))
+        terms = cache.get(cache_key)
+        if terms is None:
+            terms = list(self.get_terms(**kwargs))
+            cache.set(cache_key, terms)
+        return terms
+
     def get_by_url_name(self, name):
         """
         The url param is generated by the get_url_name function. It takes the
@@ -94,6 +133,17 @@ class TermManager(models.Manager):
         if not isinstance(name, basestring):
             return None
 
+        if self.URL_NAME_RE.match(name) is None:
+            return self._get_by_url_name(name)
+
+        cache_key = self.get_cache_key('name_{}'.format(name))
+        term = cache.get(cache_key)
+        if term is None:
+            term = self._get_by_url_name(name) or False
+            cache.set(cache_key, term)
+        return term or None
+
+    def _get_by_url_name(self, name):
         try:
             return self.get(term=name[0:2], year=name[2:])
         except Term.DoesNotExist:
@@ -174,8 +224,10 @@ class Term(models.Model):
                     id=self.id).update(current=False)
             super(Term, self).save(*args, **kwargs)
             self.update_term_officer_groups()
-            if self.current:
-                cache.set('current_term', self)  # Update the cache
+        # The post_save signal handler already invalidated the cached terms, but
+        # other processes may have cached them again before the transaction
+        # was committed
+        Term.objects.invalidate_cache()
 
     def verbose_name(self):
         """Returns the verbose name of this object in this form: Fall 2012."""
@@ -253,10 +305,20 @@ class Term(models.Model):
             for group in groups:
                 group.user_set.clear()
 
-            # Update groups for all officers from this new current term
-            officers = Officer.objects.filter(term=self)
+            # Update groups for all officers from this new current term, adding
+            # all users of a group at once rather than one officer at a time
+            group_users = {}
+            position_groups = {}
+            officers = Officer.objects.filter(term=self).select_related(
+                'position')
             for officer in officers:
-                officer._add_user_to_officer_groups()
+                if officer.position_id not in position_groups:
+                    position_groups[officer.position_id] = (
+                        officer.position.get_corresponding_groups(term=self))
+                for group in position_groups[officer.position_id]:
+                    group_users.setdefault(group, set()).add(officer.user_id)
+            for group, user_ids in group_users.iteritems():
+                group.user_set.add(*user_ids)
 
     class Meta(object):
         ordering = ('id',)
@@ -414,5 +476,14 @@ def officer_post_delete(sender, instance, *args, **kwargs):
     instance._remove_user_from_officer_groups()
 
 
+def invalidate_term_cache(sender, **kwargs):
+    """Make sure the cached terms are discarded after any term is changed,
+    including by loaddata.
+    """
+    Term.objects.invalidate_cache()
+
+
+models.signals.post_save.connect(invalidate_term_cache, sender=Term)
+models.signals.post_delete.connect(invalidate_term_cache, sender=Term)
 models.signals.post_save.connect(officer_post_save, sender=Officer)
 models.signals.post_delete.connect(officer_post_delete, sender=Officer)
@@ -2,6 +2,7 @@ from django import template
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.utils.http import urlencode
+from easy_thumbnails.files import get_thumbnailer
 
 from quark.accounts.models import APIKey
 
@@ -22,6 +23,32 @@ def get_item(dictionary, key):
     return dictionary.get(key)
 
 
+@register.filter
+def pregenerated_thumbnail_url(source, alias):
+    """Return the url of the thumbnail of a source file (like a FieldFile)
+    for the given easy_thumbnails alias, without generating the thumbnail.
+
+    Thumbnails are generated when images are saved (or by the
+    generate_thumbnails management command), so rendering a template never
+    waits for images to be resized. If the thumbnail does not exist (yet), the
+    url of the source file itself is returned.
+
+    Usage in templates:
+    {% load template_utils %}
+    <img src="{{ user_profile.picture|pregenerated_thumbnail_url:'avatar' }}">
+    """
+    try:
+        thumbnailer = get_thumbnailer(source)
+        thumbnailer.generate = False
+        thumbnail = thumbnailer[alias]
+    except Exception:  # pylint: disable=W0703
+        # Like easy_thumbnails' thumbnail_url, never fail to render
+        thumbnail = None
+    if thumbnail:
+        return thumbnail.url
+    return source.url if source else ''
+
+
 @register.simple_tag(takes_context=True)
 def modify_query_params(context, **kwargs):
     """
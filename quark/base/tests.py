@@ -6,13 +6,16 @@ from django.contrib.auth.models import AnonymousUser
 from django.db import IntegrityError
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.core.cache import get_cache
 from django.core.exceptions import ValidationError
 from django.template import Context
 from django.template import Template
 from django.test import TestCase
 from django.test.utils import override_settings
+from mock import patch
 
 from quark.base import fields
+from quark.base import models as base_models
 from quark.base.models import Major
 from quark.base.models import Officer
 from quark.base.models import OfficerPosition
@@ -214,6 +217,36 @@ class TermManagerTest(TestCase):
         term = Term.objects.get_by_natural_key(Term.FALL, 2012)
         self.assertIsNone(term)
 
+    def test_cached_lookups(self):
+        # A separate cache for this test, since caches of the same location
+        # are shared by the whole process
+        cache = get_cache('django.core.cache.backends.locmem.LocMemCache',
+                          LOCATION=self.id())
+        with patch.object(base_models, 'cache', cache):
+            Term(term=Term.SPRING, year=2012, current=False).save()
+            Term(term=Term.FALL, year=2012, current=True).save()
+            current_term = Term.objects.get_current_term()
+            term_list = Term.objects.get_term_list(reverse=True)
+            self.assertEqual(Term.objects.get_by_url_name('sp2012').year, 2012)
+            self.assertIsNone(Term.objects.get_by_url_name('fa2013'))
+
+            # The lookups are now cached
+            with self.assertNumQueries(0):
+                self.assertEqual(Term.objects.get_current_term(), current_term)
+                self.assertEqual(
+                    Term.objects.get_term_list(reverse=True), term_list)
+                self.assertEqual(
+                    Term.objects.get_by_url_name('sp2012').term, Term.SPRING)
+                self.assertIsNone(Term.objects.get_by_url_name('fa2013'))
+
+            # Changing any term invalidates the cached terms
+            Term(term=Term.FALL, year=2013, current=True).save()
+            self.assertEqual(Term.objects.get_current_term().year, 2013)
+            self.assertEqual(len(Term.objects.get_term_list(reverse=True)), 3)
+            self.assertEqual(Term.objects.get_by_url_name('fa2013').year, 2013)
+            Term.objects.get(term=Term.SPRING, year=2012).delete()
+            self.assertIsNone(Term.objects.get_by_url_name('sp2012'))
+
 
 class TermTest(TestCase):
     def test_save(self):
@@ -97,7 +97,7 @@ class TermParameterMixin(object):
 
         # Add queryset of all Terms up to and including the current term,
         # ordered from current to oldest
-        context['terms'] = Term.objects.get_terms(reverse=True)
+        context['terms'] = Term.objects.get_term_list(reverse=True)
         return context
 
 
@@ -3,11 +3,16 @@ import os
 from django.conf import settings
 from django.contrib.auth.models import Group
 from django.db import models
+from django.db.models import Count
 from django.db.models import Sum
+from easy_thumbnails.signal_handlers import generate_aliases_global
+from easy_thumbnails.signals import saved_file
 
 from quark.base.models import Term
 from quark.events.models import Event
+from quark.events.models import EventAttendance
 from quark.events.models import EventType
+from quark.events.models import LeaderboardEntry
 from quark.exams.models import Exam
 from quark.resumes.models import Resume
 
@@ -60,43 +65,20 @@ class Candidate(models.Model):
         for all requirements. If requirement is specified, only progress for
         the specific requirement type is returned.
 
-        Useful for summary info, progress bars, and other visualizations.
+        Useful for summary info, progress bars, and other visualizations. Use
+        TermCandidateProgress directly when progress is needed for many
+        candidates at once.
         """
-        if requirement_type is None:
-            requirements = CandidateRequirement.objects.filter(term=self.term)
-        else:
-            requirements = CandidateRequirement.objects.filter(
-                term=self.term, requirement_type=requirement_type)
-
-        # Select-related to improve performance, fetching data for requirements
-        # from multiple tables
-        requirements.select_related(
-            'eventcandidaterequirement',
-            'eventcandidaterequirement__event_type',
-            'challengecandidaterequirement',
-            'challengecandidaterequirement__challenge_type',
-            'examfilecandidaterequirement')
-
-        # TODO(sjdemartini): Figure out a way to optimize fetching the progress
-        # for event requirements and fetching CandidateRequirementProgress
-        # objects in order to minimize number of queries
-
-        progress = [req.get_progress(self) for req in requirements]
-        completed = sum([x['completed'] for x in progress])
-        required = sum([x['required'] for x in progress])
-        return {'completed': completed, 'required': required}
+        progress = TermCandidateProgress(
+            self.term, candidates=[self], requirement_type=requirement_type)
+        return progress.get_progress(self)
 
     def are_electives_required(self):
         """Return true if elective events are required; false otherwise."""
-        event_reqs = CandidateRequirement.objects.filter(
-            term=self.term,
+        progress = TermCandidateProgress(
+            self.term, candidates=[self],
             requirement_type=CandidateRequirement.EVENT)
-        try:
-            elective_req = event_reqs.get(
-                eventcandidaterequirement__event_type__name='Elective')
-        except CandidateRequirement.DoesNotExist:
-            return False
-        return elective_req.get_progress(self)['required'] > 0
+        return progress.are_electives_required(self)
 
     def __unicode__(self):
         return '{user} ({term})'.format(user=self.user, term=self.term)
@@ -148,7 +130,25 @@ def candidate_post_save(sender, instance, created, **kwargs):
         else:
             instance.user.groups.remove(candidate_group)
 
+
+def candidate_leaderboard_post_save(sender, instance, **kwargs):
+    """Update the candidate's leaderboard position for the candidate's term."""
+    LeaderboardEntry.objects.update_user_position(instance.term, instance.user)
+
+
+def candidate_leaderboard_post_delete(sender, instance, **kwargs):
+    """Update the former candidate's leaderboard position for the term."""
+    LeaderboardEntry.objects.update_user_position(instance.term, instance.user)
+
 models.signals.post_save.connect(candidate_post_save, sender=Candidate)
+models.signals.post_save.connect(
+    candidate_leaderboard_post_save, sender=Candidate)
+models.signals.post_delete.connect(
+    candidate_leaderboard_post_delete, sender=Candidate)
+
+# Generate the thumbnails of uploaded photos right away, so that templates
+# never have to generate them
+saved_file.connect(generate_aliases_global, sender=Candidate)
 
 
 class ChallengeTypeManager(models.Manager):
@@ -398,3 +398,205 @@ class CandidateRequirementProgress(models.Model):
     class Meta(object):
         ordering = ('requirement', 'candidate')
         verbose_name_plural = 'candidate requirement progresses'
+
+
+class TermCandidateProgress(object):
+    """Progress towards a term's candidate requirements for many candidates.
+
+    Rather than querying once per candidate and requirement, the credits
+    completed for each kind of requirement are fetched for all of the given
+    candidates with a single grouped query apiece, so the number of queries
+    made does not depend on how many candidates or requirements there are.
+
+    If candidates is not specified, progress is computed for every candidate
+    in the term. If requirement_type is specified, only requirements of that
+    type are considered.
+    """
+    def __init__(self, term, candidates=None, requirement_type=None):
+        self.term = term
+        if candidates is None:
+            candidates = Candidate.objects.filter(term=term)
+        # Map candidate pks to the pks of their users
+        self.candidate_users = {
+            candidate.pk: candidate.user_id for candidate in candidates}
+
+        requirements = CandidateRequirement.objects.filter(
+            term=term).select_related(
+            'eventcandidaterequirement',
+            'eventcandidaterequirement__event_type',
+            'challengecandidaterequirement',
+            'challengecandidaterequirement__challenge_type',
+            'examfilecandidaterequirement',
+            'resumecandidaterequirement',
+            'manualcandidaterequirement')
+        if requirement_type is not None:
+            requirements = requirements.filter(
+                requirement_type=requirement_type)
+        self.requirements = list(requirements)
+
+        # Dictionary mapping (candidate pk, requirement pk) tuples to
+        # dictionaries with keys "completed" and "required"
+        self.progresses = {}
+        if self.candidate_users and self.requirements:
+            self._compute_progresses()
+
+    def _compute_progresses(self):
+        """Fetch the credits completed by every candidate in grouped queries
+        and fill in the progresses dictionary.
+        """
+        completed_credits = self._get_completed_credits()
+
+        # Per-candidate overrides and exemptions
+        overrides = {}
+        progress_values = CandidateRequirementProgress.objects.filter(
+            candidate__in=self.candidate_users.keys(),
+            requirement__in=[req.pk for req in self.requirements]).values_list(
+            'candidate', 'requirement', 'manually_recorded_credits',
+            'alternate_credits_needed')
+        for candidate_pk, req_pk, recorded, alternate in progress_values:
+            overrides[(candidate_pk, req_pk)] = (recorded, alternate)
+
+        for candidate_pk, user_pk in self.candidate_users.iteritems():
+            for req in self.requirements:
+                if req.requirement_type == CandidateRequirement.EVENT:
+                    key = (user_pk,
+                           req.eventcandidaterequirement.event_type_id)
+                elif req.requirement_type == CandidateRequirement.CHALLENGE:
+                    key = (candidate_pk,
+                           req.challengecandidaterequirement.challenge_type_id)
+                elif req.requirement_type in (CandidateRequirement.EXAM_FILE,
+                                              CandidateRequirement.RESUME):
+                    key = user_pk
+                elif req.requirement_type == CandidateRequirement.MANUAL:
+                    # Actual credits earned are read from the overrides below
+                    key = None
+                else:
+                    raise NotImplementedError(
+                        'Unknown type {}'.format(req.requirement_type))
+                completed = completed_credits[req.requirement_type].get(key, 0)
+
+                required = req.credits_needed
+                override = overrides.get((candidate_pk, req.pk))
+                if override:
+                    completed += override[0]
+                    required = override[1]
+
+                self.progresses[(candidate_pk, req.pk)] = {
+                    'completed': completed, 'required': required}
+
+    def _get_completed_credits(self):
+        """Return a dictionary mapping each requirement type to a dictionary
+        of the credits completed towards requirements of that type.
+
+        Event credits are keyed by (user pk, event type pk), challenge credits
+        by (candidate pk, challenge type pk), and exam file and resume credits
+        by user pk. Only one query is made for each requirement type in the
+        term. The ordering of each query is cleared so that the models' default
+        ordering fields are not added to the GROUP BY clause.
+        """
+        completed_credits = dict(
+            [(req_type, {}) for req_type, _ in
+             CandidateRequirement.REQUIREMENT_TYPE_CHOICES])
+        requirement_types = set(
+            [req.requirement_type for req in self.requirements])
+        candidate_pks = self.candidate_users.keys()
+        user_pks = set(self.candidate_users.values())
+
+        if CandidateRequirement.EVENT in requirement_types:
+            attendances = EventAttendance.objects.filter(
+                user__in=user_pks, event__term=self.term).values(
+                'user', 'event__event_type').annotate(
+                total=Sum('event__requirements_credit')).order_by()
+            for row in attendances:
+                completed_credits[CandidateRequirement.EVENT][
+                    (row['user'], row['event__event_type'])] = (
+                    row['total'] or 0)
+
+        if CandidateRequirement.CHALLENGE in requirement_types:
+            challenges = Challenge.objects.filter(
+                candidate__in=candidate_pks, verified=True).values(
+                'candidate', 'challenge_type').annotate(
+                total=Count('pk')).order_by()
+            for row in challenges:
+                completed_credits[CandidateRequirement.CHALLENGE][
+                    (row['candidate'], row['challenge_type'])] = row['total']
+
+        if CandidateRequirement.EXAM_FILE in requirement_types:
+            exams = Exam.objects.get_approved().filter(
+                submitter__in=user_pks).values('submitter').annotate(
+                total=Count('pk')).order_by()
+            exam_credits = completed_credits[CandidateRequirement.EXAM_FILE]
+            for row in exams:
+                exam_credits[row['submitter']] = row['total']
+
+        if CandidateRequirement.RESUME in requirement_types:
+            resumes = Resume.objects.filter(
+                user__in=user_pks, verified=True).values('user').annotate(
+                total=Count('pk')).order_by()
+            resume_credits = completed_credits[CandidateRequirement.RESUME]
+            for row in resumes:
+                resume_credits[row['user']] = row['total']
+
+        return completed_credits
+
+    def get_requirements(self, requirement_type=None):
+        """Return the list of requirements for the term, optionally only those
+        of the given requirement type.
+        """
+        if requirement_type is None:
+            return self.requirements
+        return [req for req in self.requirements
+                if req.requirement_type == requirement_type]
+
+    def get_requirement_progress(self, candidate, requirement):
+        """Return a dictionary with keys "completed" and "required" for the
+        given candidate's progress towards the given requirement.
+        """
+        return self.progresses.get(
+            (candidate.pk, requirement.pk),
+            {'completed': 0, 'required': requirement.credits_needed})
+
+    def get_progress(self, candidate, requirement_type=None):
+        """Return a dictionary with keys "completed" and "required" summed
+        over all requirements (or only those of the given type) for the given
+        candidate, like Candidate.get_progress.
+        """
+        return self._sum_progress(candidate.pk, requirement_type)
+
+    def get_all_progresses(self, requirement_type=None):
+        """Return a dictionary mapping each candidate pk to the candidate's
+        total progress (as returned by get_progress).
+        """
+        return {candidate_pk: self._sum_progress(candidate_pk, requirement_type)
+                for candidate_pk in self.candidate_users}
+
+    def _sum_progress(self, candidate_pk, requirement_type=None):
+        completed = 0
+        required = 0
+        for req in self.get_requirements(requirement_type):
+            progress = self.progresses.get(
+                (candidate_pk, req.pk),
+                {'completed': 0, 'required': req.credits_needed})
+            completed += progress['completed']
+            required += progress['required']
+        return {'completed': completed, 'required': required}
+
+    def get_elective_requirement(self):
+        """Return the event requirement for elective events, or None if the
+        term has no such requirement.
+        """
+        for req in self.get_requirements(CandidateRequirement.EVENT):
+            event_type = req.eventcandidaterequirement.event_type
+            if event_type.name == 'Elective':
+                return req
+        return None
+
+    def are_electives_required(self, candidate):
+        """Return true if elective events are required for the given
+        candidate; false otherwise.
+        """
+        elective_req = self.get_elective_requirement()
+        if elective_req is None:
+            return False
+        return self.get_requirement_progress(
+            candidate, elective_req)['required'] > 0
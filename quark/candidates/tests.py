@@ -22,6 +22,7 @@ from quark.candidates.models import ChallengeType
 from quark.candidates.models import EventCandidateRequirement
 from quark.candidates.models import ExamFileCandidateRequirement
 from quark.candidates.models import ManualCandidateRequirement
+from quark.candidates.models import TermCandidateProgress
 from quark.courses.models import CourseInstance
 from quark.events.models import Event
 from quark.events.models import EventAttendance
@@ -328,6 +329,59 @@ class CandidateTest(TestCase):
         self.assertEqual(progress['required'], num_required)
         self.assertEqual(progress['completed'], total_completed)
 
+    def test_term_candidate_progress(self):
+        """Test that TermCandidateProgress computes the same progress as
+        Candidate.get_progress for every candidate in the term, using the same
+        number of queries regardless of the number of candidates.
+        """
+        other_user = get_user_model().objects.create_user(
+            username='luser2',
+            email='test2@tbp.berkeley.edu',
+            password='password',
+            first_name='Other',
+            last_name='Candidate')
+        other_candidate = Candidate(user=other_user, term=self.term)
+        other_candidate.save()
+
+        EventAttendance(event=self.fun_event2, user=self.user).save()
+        EventAttendance(event=self.fun_event1, user=other_user).save()
+        Challenge(candidate=other_candidate, description='Hello kitty',
+                  verifying_user=self.officer.user,
+                  verified=True,
+                  challenge_type=self.individual_challenge_type).save()
+        self.test_exam1.submitter = self.user
+        self.test_exam1.save()
+        CandidateRequirementProgress(
+            candidate=other_candidate,
+            requirement=self.manual_req1,
+            manually_recorded_credits=1,
+            alternate_credits_needed=1).save()
+
+        # One query for the requirements, one for the completed credits of each
+        # of the three kinds of automatically-tracked requirements in this term
+        # (event, challenge and exam file), and one for the progress overrides
+        with self.assertNumQueries(5):
+            progress = TermCandidateProgress(
+                self.term, candidates=[self.candidate, other_candidate])
+
+        for candidate in [self.candidate, other_candidate]:
+            self.assertEqual(progress.get_progress(candidate),
+                             candidate.get_progress())
+            for req_type, _ in CandidateRequirement.REQUIREMENT_TYPE_CHOICES:
+                self.assertEqual(progress.get_progress(candidate, req_type),
+                                 candidate.get_progress(req_type))
+            for req in CandidateRequirement.objects.filter(term=self.term):
+                self.assertEqual(
+                    progress.get_requirement_progress(candidate, req),
+                    req.get_progress(candidate))
+
+        all_progresses = progress.get_all_progresses()
+        self.assertEqual(all_progresses[self.candidate.pk],
+                         {'completed': 3, 'required': 16})
+        self.assertEqual(all_progresses[other_candidate.pk],
+                         {'completed': 3, 'required': 15})
+        self.assertFalse(progress.are_electives_required(self.candidate))
+
 
 class CandidateViewsTest(TestCase):
     fixtures = ['major.yaml', 'groups.yaml', 'university.yaml',
@@ -33,6 +33,7 @@ from quark.candidates.models import EventCandidateRequirement
 from quark.candidates.models import ExamFileCandidateRequirement
 from quark.candidates.models import ManualCandidateRequirement
 from quark.candidates.models import ResumeCandidateRequirement
+from quark.candidates.models import TermCandidateProgress
 from quark.candidates.forms import CandidateCreationForm
 from quark.candidates.forms import CandidateUserProfileForm
 from quark.candidates.forms import CandidatePhotoForm
@@ -54,12 +55,19 @@ from quark.utils.ajax import json_response
 class CandidateContextMixin(ContextMixin):
     """Mixin for getting the candidate, events, challenges, and exams for
     the context dictionary. Used in candidate management and candidate portal.
+
+    The candidate's requirement progress is read from the TermCandidateProgress
+    passed in as the "candidate_progress" keyword argument, if provided.
     """
     def get_context_data(self, **kwargs):
         # pylint: disable=R0914
         context = super(CandidateContextMixin, self).get_context_data(**kwargs)
         candidate = kwargs.get('candidate')
         context['candidate'] = candidate
+        progress = kwargs.get('candidate_progress')
+        if progress is None:
+            progress = TermCandidateProgress(
+                candidate.term, candidates=[candidate])
 
         attended_events_by_type = collections.defaultdict(list)
         past_signup_events_by_type = collections.defaultdict(list)
@@ -95,23 +103,16 @@ class CandidateContextMixin(ContextMixin):
         for event in future_signup_events:
             future_signup_events_by_type[event.event_type.name].append(event)
 
-        event_reqs = CandidateRequirement.objects.filter(
-            term=candidate.term,
-            requirement_type=CandidateRequirement.EVENT)
-        try:
-            elective_req = event_reqs.get(
-                eventcandidaterequirement__event_type__name='Elective')
-        except CandidateRequirement.DoesNotExist:
-            elective_req = None
+        event_reqs = progress.get_requirements(CandidateRequirement.EVENT)
 
         # If at least 1 elective event is required and the candidate has
         # attended at least the required amount of events for an event type,
         # extra events will count as elective events. Any future sign ups will
         # also be displayed under elective events instead of that event type.
-        if (elective_req and
-                elective_req.get_progress(candidate)['required'] > 0):
+        if progress.are_electives_required(candidate):
             for event_req in event_reqs:
-                req_progress = event_req.get_progress(candidate)
+                req_progress = progress.get_requirement_progress(
+                    candidate, event_req)
                 event_type = event_req.eventcandidaterequirement.event_type
                 extra = req_progress['completed'] - req_progress['required']
                 if extra >= 0 and event_type.eligible_elective:
@@ -128,8 +129,7 @@ class CandidateContextMixin(ContextMixin):
         # requirements
         non_required_event_types = EventType.objects.filter(
             eligible_elective=True).exclude(
-            eventcandidaterequirement__pk__in=event_reqs.values_list(
-                'pk', flat=True))
+            eventcandidaterequirement__pk__in=[req.pk for req in event_reqs])
         attended_elective_events += list(attended_events.filter(
             event_type__in=non_required_event_types))
         future_signup_elective_events += list(future_signup_events.filter(
@@ -188,6 +188,15 @@ class CandidateListView(TermParameterMixin, ListView):
             'user__userprofile', 'user__collegestudentinfo').prefetch_related(
             'user__collegestudentinfo__major')
 
+    def get_context_data(self, **kwargs):
+        context = super(CandidateListView, self).get_context_data(**kwargs)
+        # Compute every candidate's total progress for the term at once,
+        # rather than with separate queries for each candidate
+        progress = TermCandidateProgress(
+            self.display_term, candidates=context['candidates'])
+        context['candidate_progresses'] = progress.get_all_progresses()
+        return context
+
 
 class CandidatePhotoView(UpdateView):
     context_object_name = 'candidate'
@@ -292,6 +301,7 @@ class CandidateEditView(FormView, CandidateContextMixin):
     form_class = CandidateRequirementProgressFormSet
     template_name = 'candidates/edit.html'
     candidate = None
+    candidate_progress = None
     progress_dict = None
     requirements = None
 
@@ -301,13 +311,9 @@ class CandidateEditView(FormView, CandidateContextMixin):
     def dispatch(self, *args, **kwargs):
         self.candidate = get_object_or_404(
             Candidate, pk=self.kwargs['candidate_pk'])
-        self.requirements = CandidateRequirement.objects.filter(
-            term=self.candidate.term).select_related(
-            'eventcandidaterequirement',
-            'eventcandidaterequirement__event_type',
-            'challengecandidaterequirement',
-            'challengecandidaterequirement__challenge_type',
-            'examfilecandidaterequirement')
+        self.candidate_progress = TermCandidateProgress(
+            self.candidate.term, candidates=[self.candidate])
+        self.requirements = self.candidate_progress.get_requirements()
 
         progresses = CandidateRequirementProgress.objects.filter(
             candidate=self.candidate)
@@ -329,6 +335,7 @@ class CandidateEditView(FormView, CandidateContextMixin):
 
     def get_context_data(self, **kwargs):
         kwargs['candidate'] = self.candidate
+        kwargs['candidate_progress'] = self.candidate_progress
         context = super(CandidateEditView, self).get_context_data(**kwargs)
         formset = self.get_form(self.form_class)
 
@@ -337,12 +344,14 @@ class CandidateEditView(FormView, CandidateContextMixin):
         for req in CandidateRequirement.REQUIREMENT_TYPE_CHOICES:
             req_types[req[0]] = []
 
-        electives_required = Candidate.are_electives_required(self.candidate)
+        electives_required = self.candidate_progress.are_electives_required(
+            self.candidate)
 
         for i, req in enumerate(self.requirements):
             progress = self.progress_dict.get(req.pk)
             form = formset[i]
-            req_progress = req.get_progress(self.candidate)
+            req_progress = self.candidate_progress.get_requirement_progress(
+                self.candidate, req)
             completed = req_progress['completed']
             credits_needed = req_progress['required']
 
@@ -717,6 +726,7 @@ class CandidatePortalView(CreateView, CandidateContextMixin):
     form_class = ChallengeForm
     template_name = 'candidates/portal.html'
     candidate = None
+    candidate_progress = None
     current_term = None
 
     @method_decorator(login_required)
@@ -725,29 +735,27 @@ class CandidatePortalView(CreateView, CandidateContextMixin):
         self.current_term = Term.objects.get_current_term()
         self.candidate = get_object_or_404(
             Candidate, user=self.request.user, term=self.current_term)
+        self.candidate_progress = TermCandidateProgress(
+            self.current_term, candidates=[self.candidate])
         return super(CandidatePortalView, self).dispatch(
             *args, **kwargs)
 
     def get_context_data(self, **kwargs):
         kwargs['candidate'] = self.candidate
+        kwargs['candidate_progress'] = self.candidate_progress
         context = super(CandidatePortalView, self).get_context_data(**kwargs)
-        requirements = CandidateRequirement.objects.filter(
-            term=self.current_term).select_related(
-            'eventcandidaterequirement',
-            'eventcandidaterequirement__event_type',
-            'challengecandidaterequirement',
-            'challengecandidaterequirement__challenge_type',
-            'examfilecandidaterequirement')
 
         # Initialize req_types to contain lists for every requirement type
         req_types = {}
         for req in CandidateRequirement.REQUIREMENT_TYPE_CHOICES:
             req_types[req[0]] = []
 
-        electives_required = Candidate.are_electives_required(self.candidate)
+        electives_required = self.candidate_progress.are_electives_required(
+            self.candidate)
 
-        for req in requirements:
-            req_progress = req.get_progress(self.candidate)
+        for req in self.candidate_progress.get_requirements():
+            req_progress = self.candidate_progress.get_requirement_progress(
+                self.candidate, req)
             completed = req_progress['completed']
             credits_needed = req_progress['required']
             if electives_required and completed > credits_needed:
@@ -3,6 +3,7 @@ from django.db import models
 
 from quark.base.models import Term
 from quark.courses.models import Course
+from quark.courses.models import CourseCatalogEntry
 from quark.courses.models import Instructor
 
 
@@ -43,3 +44,32 @@ class Survey(models.Model):
 
     class Meta(object):
         ordering = ('course', 'instructor', '-term')
+
+
+def store_survey_course(sender, instance, **kwargs):
+    """Remember the course that a survey belongs to before it is saved or
+    deleted, so that the catalog entry of that course is updated afterwards
+    even if the survey moves to a different course.
+    """
+    instance.previous_course_pk = Survey.objects.filter(
+        pk=instance.pk).values_list('course', flat=True).first()
+
+
+def update_survey_catalog_entries(sender, instance, **kwargs):
+    """Update the catalog entries of the courses that a survey belonged to
+    before and after it was saved or deleted, since whether it counts as a
+    published survey of its course may have changed.
+    """
+    if kwargs.get('raw'):
+        # Skip loading fixtures (disable_for_loaddata needs save signals)
+        return
+    course_pks = set([instance.course_id,
+                      getattr(instance, 'previous_course_pk', None)])
+    course_pks.discard(None)
+    CourseCatalogEntry.objects.update_courses(course_pks)
+
+
+models.signals.pre_save.connect(store_survey_course, sender=Survey)
+models.signals.pre_delete.connect(store_survey_course, sender=Survey)
+models.signals.post_save.connect(update_survey_catalog_entries, sender=Survey)
+models.signals.post_delete.connect(update_survey_catalog_entries, sender=Survey)
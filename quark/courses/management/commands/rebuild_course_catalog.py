@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from quark.courses.models import CourseCatalogEntry
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **kwargs):
+        """Create the missing catalog entries of all courses and recount the
+        approved exams and published surveys of every course (for instance,
+        after exams or surveys were loaded from fixtures or changed with
+        queryset updates).
+        """
+        CourseCatalogEntry.objects.rebuild()
+        if int(kwargs.get('verbosity')) > 0:
+            self.stdout.write(
+                'Rebuilt the catalog entries of {} courses'.format(
+                    CourseCatalogEntry.objects.count()))
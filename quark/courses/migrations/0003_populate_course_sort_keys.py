@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from south.utils import datetime_utils as datetime
+from south.db import db
+from south.v2 import DataMigration
+from django.db import models
+
+from quark.courses.models import get_course_sort_key
+
+
+class Migration(DataMigration):
+
+    def forwards(self, orm):
+        # Initialize the sort keys of all existing courses
+        courses = orm.Course.objects.values_list(
+            'pk', 'department__abbreviation', 'number')
+        for course_pk, abbreviation, number in courses:
+            orm.Course.objects.filter(pk=course_pk).update(
+                sort_key=get_course_sort_key(abbreviation, number))
+
+    def backwards(self, orm):
+        # The sort keys are removed by the previous migration
+        pass
+
+    models = {
+        u'base.term': {
+            'Meta': {'ordering': "('id',)", 'unique_together': "(('term', 'year'),)", 'object_name': 'Term'},
+            'current': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'id': ('django.db.models.fields.IntegerField', [], {'primary_key': 'True'}),
+            'term': ('django.db.models.fields.CharField', [], {'max_length': '2'}),
+            'year': ('django.db.models.fields.PositiveSmallIntegerField', [], {})
+        },
+        u'courses.course': {
+            'Meta': {'ordering': "('sort_key',)", 'unique_together': "(('department', 'number'),)", 'object_name': 'Course'},
+            'department': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['courses.Department']"}),
+            'description': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'number': ('django.db.models.fields.CharField', [], {'max_length': '10', 'db_index': 'True'}),
+            'sort_key': ('django.db.models.fields.CharField', [], {'max_length': '55', 'db_index': 'True'}),
+            'title': ('django.db.models.fields.CharField', [], {'max_length': '100', 'blank': 'True'})
+        },
+        u'courses.courseinstance': {
+            'Meta': {'object_name': 'CourseInstance'},
+            'course': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['courses.Course']"}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'instructors': ('django.db.models.fields.related.ManyToManyField', [], {'to': u"orm['courses.Instructor']", 'symmetrical': 'False'}),
+            'term': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['base.Term']", 'null': 'True'})
+        },
+        u'courses.department': {
+            'Meta': {'ordering': "('long_name',)", 'object_name': 'Department'},
+            'abbreviation': ('django.db.models.fields.CharField', [], {'max_length': '25'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'long_name': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'short_name': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '25'}),
+            'slug': ('django.db.models.fields.SlugField', [], {'max_length': '25'})
+        },
+        u'courses.instructor': {
+            'Meta': {'ordering': "('last_name', 'first_name', 'middle_initial')", 'unique_together': "(('first_name', 'middle_initial', 'last_name', 'department'),)", 'object_name': 'Instructor'},
+            'department': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['courses.Department']"}),
+            'first_name': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'last_name': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'middle_initial': ('django.db.models.fields.CharField', [], {'max_length': '1', 'blank': 'True'}),
+            'website': ('django.db.models.fields.URLField', [], {'max_length': '200', 'blank': 'True'})
+        }
+    }
+
+    complete_apps = ['courses']
+    symmetrical = True
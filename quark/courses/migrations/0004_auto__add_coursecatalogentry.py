@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from south.utils import datetime_utils as datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding model 'CourseCatalogEntry'
+        db.create_table(u'courses_coursecatalogentry', (
+            (u'id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('course', self.gf('django.db.models.fields.related.OneToOneField')(to=orm['courses.Course'], unique=True)),
+            ('num_exams', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+            ('num_surveys', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+        ))
+        db.send_create_signal(u'courses', ['CourseCatalogEntry'])
+
+
+    def backwards(self, orm):
+        # Deleting model 'CourseCatalogEntry'
+        db.delete_table(u'courses_coursecatalogentry')
+
+
+    models = {
+        u'base.term': {
+            'Meta': {'ordering': "('id',)", 'unique_together': "(('term', 'year'),)", 'object_name': 'Term'},
+            'current': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'id': ('django.db.models.fields.IntegerField', [], {'primary_key': 'True'}),
+            'term': ('django.db.models.fields.CharField', [], {'max_length': '2'}),
+            'year': ('django.db.models.fields.PositiveSmallIntegerField', [], {})
+        },
+        u'courses.course': {
+            'Meta': {'ordering': "('sort_key',)", 'unique_together': "(('department', 'number'),)", 'object_name': 'Course'},
+            'department': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['courses.Department']"}),
+            'description': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'number': ('django.db.models.fields.CharField', [], {'max_length': '10', 'db_index': 'True'}),
+            'sort_key': ('django.db.models.fields.CharField', [], {'max_length': '55', 'db_index': 'True'}),
+            'title': ('django.db.models.fields.CharField', [], {'max_length': '100', 'blank': 'True'})
+        },
+        u'courses.coursecatalogentry': {
+            'Meta': {'object_name': 'CourseCatalogEntry'},
+            'course': ('django.db.models.fields.related.OneToOneField', [], {'to': u"orm['courses.Course']", 'unique': 'True'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'num_exams': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'num_surveys': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'})
+        },
+        u'courses.courseinstance': {
+            'Meta': {'object_name': 'CourseInstance'},
+            'course': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['courses.Course']"}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'instructors': ('django.db.models.fields.related.ManyToManyField', [], {'to': u"orm['courses.Instructor']", 'symmetrical': 'False'}),
+            'term': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['base.Term']", 'null': 'True'})
+        },
+        u'courses.department': {
+            'Meta': {'ordering': "('long_name',)", 'object_name': 'Department'},
+            'abbreviation': ('django.db.models.fields.CharField', [], {'max_length': '25'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'long_name': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'short_name': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '25'}),
+            'slug': ('django.db.models.fields.SlugField', [], {'max_length': '25'})
+        },
+        u'courses.instructor': {
+            'Meta': {'ordering': "('last_name', 'first_name', 'middle_initial')", 'unique_together': "(('first_name', 'middle_initial', 'last_name', 'department'),)", 'object_name': 'Instructor'},
+            'department': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['courses.Department']"}),
+            'first_name': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'last_name': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'middle_initial': ('django.db.models.fields.CharField', [], {'max_length': '1', 'blank': 'True'}),
+            'website': ('django.db.models.fields.URLField', [], {'max_length': '200', 'blank': 'True'})
+        }
+    }
+
+    complete_apps = ['courses']
\ No newline at end of file
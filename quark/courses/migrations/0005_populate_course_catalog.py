@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+from south.utils import datetime_utils as datetime
+from south.db import db
+from south.v2 import DataMigration
+from django.db import models
+
+from quark.exams.models import ExamFlag
+
+
+class Migration(DataMigration):
+    depends_on = (
+        ('course_surveys', '0001_initial'),
+        ('exams', '0002_auto__add_field_exam_file_hash'),
+    )
+
+    def forwards(self, orm):
+        # Create the catalog entries of all courses, with the numbers of their
+        # approved exams and published surveys
+        exam_counts = dict(
+            (counts['course_instance__course'], counts['pk__count'])
+            for counts in orm['exams.Exam'].objects.filter(
+                verified=True, blacklisted=False,
+                flags__lte=ExamFlag.LIMIT).values(
+                'course_instance__course').annotate(
+                models.Count('pk')).order_by())
+        survey_counts = dict(
+            (counts['course'], counts['pk__count'])
+            for counts in orm['course_surveys.Survey'].objects.filter(
+                published=True).values('course').annotate(
+                models.Count('pk')).order_by())
+        orm.CourseCatalogEntry.objects.bulk_create([
+            orm.CourseCatalogEntry(
+                course_id=course_pk,
+                num_exams=exam_counts.get(course_pk, 0),
+                num_surveys=survey_counts.get(course_pk, 0))
+            for course_pk in orm.Course.objects.values_list('pk', flat=True)])
+
+    def backwards(self, orm):
+        # The catalog entries are removed by the previous migration
+        pass
+
+    models = {
+        u'auth.group': {
+            'Meta': {'object_name': 'Group'},
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '80'}),
+            'permissions': ('django.db.models.fields.related.ManyToManyField', [], {'to': u"orm['auth.Permission']", 'symmetrical': 'False', 'blank': 'True'})
+        },
+        u'auth.permission': {
+            'Meta': {'ordering': "(u'content_type__app_label', u'content_type__model', u'codename')", 'unique_together': "((u'content_type', u'codename'),)", 'object_name': 'Permission'},
+            'codename': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['contenttypes.ContentType']"}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '50'})
+        },
+        u'auth.user': {
+            'Meta': {'object_name': 'User'},
+            'date_joined': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'email': ('django.db.models.fields.EmailField', [], {'max_length': '75', 'blank': 'True'}),
+            'first_name': ('django.db.models.fields.CharField', [], {'max_length': '30', 'blank': 'True'}),
+            'groups': ('django.db.models.fields.related.ManyToManyField', [], {'symmetrical': 'False', 'related_name': "u'user_set'", 'blank': 'True', 'to': u"orm['auth.Group']"}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'is_active': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'is_staff': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'is_superuser': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'last_login': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'last_name': ('django.db.models.fields.CharField', [], {'max_length': '30', 'blank': 'True'}),
+            'password': ('django.db.models.fields.CharField', [], {'max_length': '128'}),
+            'user_permissions': ('django.db.models.fields.related.ManyToManyField', [], {'symmetrical': 'False', 'related_name': "u'user_set'", 'blank': 'True', 'to': u"orm['auth.Permission']"}),
+            'username': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '30'})
+        },
+        u'base.term': {
+            'Meta': {'ordering': "('id',)", 'unique_together': "(('term', 'year'),)", 'object_name': 'Term'},
+            'current': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'id': ('django.db.models.fields.IntegerField', [], {'primary_key': 'True'}),
+            'term': ('django.db.models.fields.CharField', [], {'max_length': '2'}),
+            'year': ('django.db.models.fields.PositiveSmallIntegerField', [], {})
+        },
+        u'contenttypes.contenttype': {
+            'Meta': {'ordering': "('name',)", 'unique_together': "(('app_label', 'model'),)", 'object_name': 'ContentType', 'db_table': "'django_content_type'"},
+            'app_label': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'model': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        u'course_surveys.survey': {
+            'Meta': {'ordering': "('course', 'instructor', '-term')", 'object_name': 'Survey'},
+            'comments': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'course': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['courses.Course']"}),
+            'course_rating': ('django.db.models.fields.PositiveSmallIntegerField', [], {}),
+            'created': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'exam_difficulty': ('django.db.models.fields.PositiveSmallIntegerField', [], {'null': 'True', 'blank': 'True'}),
+            'hw_difficulty': ('django.db.models.fields.PositiveSmallIntegerField', [], {'null': 'True', 'blank': 'True'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'instructor': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['courses.Instructor']"}),
+            'prof_rating': ('django.db.models.fields.PositiveSmallIntegerField', [], {}),
+            'published': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'submitter': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['auth.User']"}),
+            'term': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['base.Term']"}),
+            'time_commitment': ('django.db.models.fields.PositiveSmallIntegerField', [], {})
+        },
+        u'courses.course': {
+            'Meta': {'ordering': "('sort_key',)", 'unique_together': "(('department', 'number'),)", 'object_name': 'Course'},
+            'department': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['courses.Department']"}),
+            'description': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'number': ('django.db.models.fields.CharField', [], {'max_length': '10', 'db_index': 'True'}),
+            'sort_key': ('django.db.models.fields.CharField', [], {'max_length': '55', 'db_index': 'True'}),
+            'title': ('django.db.models.fields.CharField', [], {'max_length': '100', 'blank': 'True'})
+        },
+        u'courses.coursecatalogentry': {
+            'Meta': {'object_name': 'CourseCatalogEntry'},
+            'course': ('django.db.models.fields.related.OneToOneField', [], {'to': u"orm['courses.Course']", 'unique': 'True'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'num_exams': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'num_surveys': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'})
+        },
+        u'courses.courseinstance': {
+            'Meta': {'object_name': 'CourseInstance'},
+            'course': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['courses.Course']"}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'instructors': ('django.db.models.fields.related.ManyToManyField', [], {'to': u"orm['courses.Instructor']", 'symmetrical': 'False'}),
+            'term': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['base.Term']", 'null': 'True'})
+        },
+        u'courses.department': {
+            'Meta': {'ordering': "('long_name',)", 'object_name': 'Department'},
+            'abbreviation': ('django.db.models.fields.CharField', [], {'max_length': '25'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'long_name': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'short_name': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '25'}),
+            'slug': ('django.db.models.fields.SlugField', [], {'max_length': '25'})
+        },
+        u'courses.instructor': {
+            'Meta': {'ordering': "('last_name', 'first_name', 'middle_initial')", 'unique_together': "(('first_name', 'middle_initial', 'last_name', 'department'),)", 'object_name': 'Instructor'},
+            'department': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['courses.Department']"}),
+            'first_name': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'last_name': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'middle_initial': ('django.db.models.fields.CharField', [], {'max_length': '1', 'blank': 'True'}),
+            'website': ('django.db.models.fields.URLField', [], {'max_length': '200', 'blank': 'True'})
+        },
+        u'exams.exam': {
+            'Meta': {'object_name': 'Exam'},
+            'blacklisted': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'course_instance': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['courses.CourseInstance']"}),
+            'exam_file': ('django.db.models.fields.files.FileField', [], {'max_length': '100'}),
+            'exam_number': ('django.db.models.fields.CharField', [], {'max_length': '5'}),
+            'exam_type': ('django.db.models.fields.CharField', [], {'max_length': '4'}),
+            'file_ext': ('django.db.models.fields.CharField', [], {'max_length': '5'}),
+            'file_hash': ('django.db.models.fields.CharField', [], {'db_index': 'True', 'max_length': '64', 'blank': 'True'}),
+            'flags': ('django.db.models.fields.PositiveSmallIntegerField', [], {'default': '0'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'submitter': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['auth.User']", 'null': 'True', 'blank': 'True'}),
+            'unique_id': ('uuidfield.fields.UUIDField', [], {'unique': 'True', 'max_length': '32', 'blank': 'True'}),
+            'verified': ('django.db.models.fields.BooleanField', [], {'default': 'False'})
+        },
+        u'exams.examflag': {
+            'Meta': {'object_name': 'ExamFlag'},
+            'created': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'exam': ('django.db.models.fields.related.ForeignKey', [], {'to': u"orm['exams.Exam']"}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'reason': ('django.db.models.fields.TextField', [], {}),
+            'resolution': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'resolved': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'updated': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'blank': 'True'})
+        },
+        u'exams.instructorpermission': {
+            'Meta': {'ordering': "('instructor',)", 'object_name': 'InstructorPermission'},
+            'correspondence': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'instructor': ('django.db.models.fields.related.OneToOneField', [], {'to': u"orm['courses.Instructor']", 'unique': 'True'}),
+            'permission_allowed': ('django.db.models.fields.BooleanField', [], {})
+        }
+    }
+
+    complete_apps = ['exams', 'course_surveys', 'courses']
+    symmetrical = True
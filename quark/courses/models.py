@@ -1,11 +1,33 @@
-# pylint: disable=W0402
-import string
+import re
 
 from django.core.urlresolvers import reverse
 from django.db import models
+from django.db import transaction
+from django.db.models import Count
 from django.template.defaultfilters import slugify
 
 from quark.base.models import Term
+from quark.shortcuts import disable_for_loaddata
+
+
+# Splits a course number into its prefix letters, its numeric part and its
+# suffix (for example, "C191W" into "C", "191" and "W")
+COURSE_NUMBER_REGEX = re.compile(r'^([A-Z]*)([0-9]*)(.*)$')
+
+
+def get_course_sort_key(department_abbreviation, number):
+    """Return the string that orders a course among all courses, given its
+    department's abbreviation and its course number.
+
+    Courses are ordered by department abbreviation, then by the numeric part
+    of the course number, then by its suffix and finally by its prefix (e.g.
+    COMPSCI 61A, COMPSCI H61A, COMPSCI 61B, COMPSCI 70, COMPSCI C149). Every
+    part is padded to a fixed width, so that comparing keys as strings (like
+    the database does) gives the same order as comparing the parts in turn.
+    """
+    prefix, numeric, suffix = COURSE_NUMBER_REGEX.match(number).groups()
+    return '{:<25}{:0>10}{:<10}{}'.format(
+        department_abbreviation, numeric, suffix, prefix)
 
 
 class Department(models.Model):
@@ -38,43 +60,33 @@ class Department(models.Model):
         self.abbreviation = self.abbreviation.upper().strip()
         super(Department, self).save(*args, **kwargs)
 
+        # Update the sort keys of the department's courses if the department
+        # abbreviation (which the keys start with) has changed
+        key_prefix = get_course_sort_key(self.abbreviation, '')[:25]
+        stale_courses = self.course_set.exclude(
+            sort_key__startswith=key_prefix)
+        for course in stale_courses.only('pk', 'number'):
+            Course.objects.filter(pk=course.pk).update(
+                sort_key=get_course_sort_key(self.abbreviation, course.number))
+
 
 class Course(models.Model):
     department = models.ForeignKey(Department)
     number = models.CharField(max_length=10, db_index=True)
     title = models.CharField(max_length=100, blank=True)
     description = models.TextField(blank=True)
+    # The natural ordering of courses, kept up to date when the course is
+    # saved, so that courses can be ordered by the database
+    sort_key = models.CharField(max_length=55, db_index=True, editable=False)
 
     class Meta(object):
+        ordering = ('sort_key',)
         unique_together = ('department', 'number')
 
     def __lt__(self, other):
         if not isinstance(other, Course):
             return False
-        # Compare departments of courses
-        if self.department.abbreviation < other.department.abbreviation:
-            return True
-        elif self.department.abbreviation > other.department.abbreviation:
-            return False
-        else:
-            # Compare integer part of course numbers
-            if (int(self.number.strip(string.letters)) <
-                    int(other.number.strip(string.letters))):
-                return True
-            elif (int(self.number.strip(string.letters)) >
-                    int(other.number.strip(string.letters))):
-                return False
-            else:
-                # Compare postfix letters of course numbers
-                if (self.number.lstrip(string.letters) <
-                        other.number.lstrip(string.letters)):
-                    return True
-                elif (self.number.lstrip(string.letters) >
-                        other.number.lstrip(string.letters)):
-                    return False
-                else:
-                    # Compare prefix letters of the course numbers
-                    return self.number < other.number
+        return self.get_sort_key() < other.get_sort_key()
 
     def __le__(self, other):
         if not isinstance(other, Course):
@@ -124,12 +136,19 @@ class Course(models.Model):
         """
         return '{}{}'.format(self.department.slug, self.number)
 
+    def get_sort_key(self):
+        """Return the sort key of the course from its current department and
+        number (see get_course_sort_key).
+        """
+        return get_course_sort_key(self.department.abbreviation, self.number)
+
     def get_absolute_url(self):
         return reverse('courses:course-detail', args=(
             self.department.slug, self.number))
 
     def save(self, *args, **kwargs):
         self.number = self.number.upper().strip()
+        self.sort_key = self.get_sort_key()
         super(Course, self).save(*args, **kwargs)
 
 
@@ -172,3 +191,82 @@ class CourseInstance(models.Model):
 
     def __unicode__(self):
         return '{} - {}'.format(self.course, self.term)
+
+
+class CourseCatalogEntryManager(models.Manager):
+    def update_courses(self, course_pks=None):
+        """Recount the approved exams and published surveys of the courses
+        with the given primary keys (or of all courses, if none are given),
+        and correct the catalog entries whose counts are wrong.
+        """
+        # Avoid circular dependency by importing here:
+        from quark.course_surveys.models import Survey
+        from quark.exams.models import Exam
+
+        exams = Exam.objects.get_approved()
+        surveys = Survey.objects.filter(published=True)
+        entries = self.all()
+        if course_pks is not None:
+            exams = exams.filter(course_instance__course__in=course_pks)
+            surveys = surveys.filter(course__in=course_pks)
+            entries = entries.filter(course__in=course_pks)
+
+        exam_counts = dict(
+            (counts['course_instance__course'], counts['pk__count'])
+            for counts in exams.values('course_instance__course').annotate(
+                Count('pk')).order_by())
+        survey_counts = dict(
+            (counts['course'], counts['pk__count'])
+            for counts in surveys.values('course').annotate(
+                Count('pk')).order_by())
+        with transaction.atomic():
+            stored_counts = entries.select_for_update().values_list(
+                'course', 'num_exams', 'num_surveys')
+            for course_pk, num_exams, num_surveys in stored_counts:
+                counts = (exam_counts.get(course_pk, 0),
+                          survey_counts.get(course_pk, 0))
+                if counts != (num_exams, num_surveys):
+                    self.filter(course=course_pk).update(
+                        num_exams=counts[0], num_surveys=counts[1])
+
+    def rebuild(self):
+        """Create the missing catalog entries of all courses (such as courses
+        loaded from fixtures) and recount all entries.
+        """
+        self.bulk_create([
+            CourseCatalogEntry(course_id=course_pk)
+            for course_pk in Course.objects.filter(
+                coursecatalogentry=None).values_list('pk', flat=True)])
+        self.update_courses()
+
+
+class CourseCatalogEntry(models.Model):
+    """The number of approved exams and published surveys of a course, kept
+    up to date by the exam and survey signal handlers, so that the course
+    catalog can list the courses that have any without searching all exams
+    and surveys.
+
+    Every course has a catalog entry, which is created along with it.
+    """
+    course = models.OneToOneField(Course)
+    num_exams = models.PositiveIntegerField(default=0)
+    num_surveys = models.PositiveIntegerField(default=0)
+
+    objects = CourseCatalogEntryManager()
+
+    class Meta(object):
+        verbose_name_plural = 'course catalog entries'
+
+    def __unicode__(self):
+        return '{} ({} exams, {} surveys)'.format(
+            self.course, self.num_exams, self.num_surveys)
+
+
+@disable_for_loaddata
+def create_catalog_entry(sender, instance, created, **kwargs):
+    """Create the catalog entry of a course when the course is created."""
+    if created:
+        CourseCatalogEntry.objects.create(course=instance)
+
+
+models.signals.post_save.connect(create_catalog_entry, sender=Course)
@@ -1,13 +1,20 @@
 from django.contrib.auth import get_user_model
+from django.http import Http404
 from django.test import TestCase
+from django.test.client import RequestFactory
 
 from quark.base.models import Term
 from quark.courses.models import Course
+from quark.courses.models import CourseCatalogEntry
 from quark.courses.models import CourseInstance
 from quark.courses.models import Department
 from quark.courses.models import Instructor
+from quark.courses.views import CourseDepartmentListView
+from quark.courses.views import CourseListView
 from quark.course_surveys.models import Survey
 from quark.exams.models import Exam
+from quark.exams.models import ExamFlag
+from quark.exams.models import InstructorPermission
 
 
 def make_test_department():
@@ -233,6 +240,32 @@ class CourseTest(TestCase):
         # TD2 70, TD2 130AC, TD2 C130AC, TD2 H130AC
         self.assertEquals(test_list, sorted_list)
 
+    def test_sort_key(self):
+        sorted_list = [self.test_course_1, self.test_course_2,
+                       self.test_course_3, self.test_course_4,
+                       self.test_course_5, self.test_course_6,
+                       self.test_course_7, self.test_course_8,
+                       self.test_course_9]
+        # The database orders courses the same way as sorting them
+        self.assertEqual(list(Course.objects.all()), sorted_list)
+        self.assertEqual(
+            list(Course.objects.order_by('-sort_key')), sorted_list[::-1])
+
+        # Changing a course number updates its sort key
+        self.test_course_4.number = '1'
+        self.test_course_4.save()
+        self.assertEqual(Course.objects.all()[0], self.test_course_4)
+
+        # Changing a department abbreviation updates the sort keys of its
+        # courses
+        self.test_department_2.abbreviation = 'A DEPT'
+        self.test_department_2.save()
+        self.assertEqual(
+            list(Course.objects.all()),
+            [self.test_course_5, self.test_course_6, self.test_course_7,
+             self.test_course_8, self.test_course_9, self.test_course_4,
+             self.test_course_1, self.test_course_2, self.test_course_3])
+
 
 class InstructorTest(TestCase):
     def setUp(self):
@@ -295,6 +328,57 @@ class CourseListViewTest(CoursesTestCase):
         self.assertEqual(resp.status_code, 404)
 
 
+class CourseCatalogEntryTest(CoursesTestCase):
+    def get_counts(self, course):
+        entry = CourseCatalogEntry.objects.get(course=course)
+        return (entry.num_exams, entry.num_surveys)
+
+    def test_catalog_entries(self):
+        self.assertEqual(self.get_counts(self.course_cs_1), (0, 2))
+        self.assertEqual(self.get_counts(self.course_ee_1), (1, 0))
+        request = RequestFactory().get('/courses/')
+        departments = CourseDepartmentListView.as_view()(
+            request).context_data['departments']
+        self.assertEqual(
+            [(dept, dept.num_exams, dept.num_surveys)
+             for dept in departments],
+            [(self.dept_cs, 0, 2), (self.dept_ee, 1, 0)])
+
+        # Moving a survey to a different course updates both courses
+        self.survey_cs_1.course = self.course_ee_1
+        self.survey_cs_1.save()
+        self.assertEqual(self.get_counts(self.course_cs_1), (0, 1))
+        self.assertEqual(self.get_counts(self.course_ee_1), (1, 1))
+        self.survey_cs_1.delete()
+        self.assertEqual(self.get_counts(self.course_ee_1), (1, 0))
+
+        # Flagged and blacklisted exams are not counted
+        for _ in range(ExamFlag.LIMIT + 1):
+            ExamFlag(exam=self.exam_ee_1, reason='Test reason').save()
+        self.assertEqual(self.get_counts(self.course_ee_1), (0, 0))
+        ExamFlag.objects.update(resolved=True)
+        ExamFlag.objects.all()[0].save()
+        self.assertEqual(self.get_counts(self.course_ee_1), (1, 0))
+        InstructorPermission(instructor=self.instructor_ee,
+                             permission_allowed=False).save()
+        self.assertEqual(self.get_counts(self.course_ee_1), (0, 0))
+        request = RequestFactory().get('/courses/ee/')
+        self.assertRaises(
+            Http404, CourseListView.as_view(), request, dept_slug='ee')
+
+        # Changes that send no signals are corrected by rebuilding
+        Survey.objects.update(published=False)
+        self.assertEqual(self.get_counts(self.course_cs_1), (0, 1))
+        CourseCatalogEntry.objects.all().delete()
+        CourseCatalogEntry.objects.rebuild()
+        self.assertEqual(self.get_counts(self.course_cs_1), (0, 0))
+        self.assertEqual(self.get_counts(self.course_ee_1), (0, 0))
+
+        # Deleting a course deletes its entry
+        self.course_cs_1.delete()
+        self.assertEqual(CourseCatalogEntry.objects.count(), 1)
+
+
 class CourseDetailViewTest(CoursesTestCase):
     def test_response(self):
         resp = self.client.get('/courses/cs/1/')
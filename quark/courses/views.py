@@ -4,6 +4,7 @@ from django.contrib.auth.decorators import permission_required
 from django.core.urlresolvers import reverse
 from django.db.models import Avg
 from django.db.models import Q
+from django.db.models import Sum
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
@@ -28,13 +29,13 @@ class CourseDepartmentListView(ListView):
     template_name = 'courses/course_department_list.html'
 
     def get_queryset(self):
-        courses_with_surveys = Course.objects.filter(survey__published=True)
-        course_pks = Exam.objects.get_approved().values_list(
-            'course_instance__course__pk', flat=True)
-        courses_with_exams = Course.objects.filter(pk__in=course_pks)
+        # Only list departments with courses that have approved exams or
+        # published surveys, along with the total numbers of them
         return Department.objects.filter(
-            Q(course__in=courses_with_surveys) |
-            Q(course__in=courses_with_exams)).distinct()
+            Q(course__coursecatalogentry__num_exams__gt=0) |
+            Q(course__coursecatalogentry__num_surveys__gt=0)).annotate(
+            num_exams=Sum('course__coursecatalogentry__num_exams'),
+            num_surveys=Sum('course__coursecatalogentry__num_surveys'))
 
 
 class CourseListView(ListView):
@@ -48,15 +49,14 @@ class CourseListView(ListView):
         return super(CourseListView, self).dispatch(*args, **kwargs)
 
     def get_queryset(self):
-        courses_with_exams_pks = Exam.objects.get_approved().values_list(
-            'course_instance__course__pk', flat=True)
-        courses_query = Course.objects.select_related('department').filter(
-            Q(survey__published=True) |
-            Q(pk__in=courses_with_exams_pks),
-            department=self.dept).distinct()
+        courses_query = Course.objects.select_related(
+            'department', 'coursecatalogentry').filter(
+            Q(coursecatalogentry__num_exams__gt=0) |
+            Q(coursecatalogentry__num_surveys__gt=0),
+            department=self.dept).order_by('sort_key')
         if not courses_query.exists():
             raise Http404
-        return sorted(courses_query)
+        return courses_query
 
     def get_context_data(self, **kwargs):
         context = super(CourseListView, self).get_context_data(**kwargs)
@@ -186,8 +186,9 @@ class InstructorDetailView(DetailView):
         # courses taught
         course_instances = CourseInstance.objects.filter(
             instructors=self.instructor)
-        courses = sorted(Course.objects.select_related('department').filter(
-            courseinstance__in=course_instances).distinct())
+        courses = Course.objects.select_related('department').filter(
+            courseinstance__in=course_instances).distinct().order_by(
+            'sort_key')
         context['courses'] = courses
         context['total_prof_ratings_avg'] = surveys.aggregate(
             Avg('prof_rating'))['prof_rating__avg']
@@ -0,0 +1,15 @@
+from django.core.mail.backends.base import BaseEmailBackend
+
+from quark.emailer.models import QueuedEmail
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Email backend that adds messages to the queue of outgoing email instead
+    of sending them. The queued messages are sent by the send_queued_email
+    management command, using the EMAIL_BACKEND setting.
+    """
+    def send_messages(self, email_messages):
+        email_messages = [message for message in email_messages
+                          if message.recipients()]
+        QueuedEmail.objects.enqueue(email_messages)
+        return len(email_messages)
@@ -47,7 +47,8 @@ class ContactForm(forms.Form):
 
     def send_email(self, to_email=None, cc_list=None, bcc_list=None,
                    headers=None, name='', email='', from_email='',
-                   subject='', message=''):
+                   subject='', message='', connection=None):
+        # pylint: disable=R0913
         # returns a status True for success and False for failure
         if not (to_email or cc_list or bcc_list):
             raise BadHeaderError('No recipients found.')
@@ -68,7 +69,8 @@ class ContactForm(forms.Form):
                                     headers=headers,
                                     subject=subject,
                                     body=body,
-                                    from_email=from_email)
+                                    from_email=from_email,
+                                    connection=connection)
         try:
             sent_message.send()
             return True
@@ -0,0 +1,37 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from quark.emailer.models import QueuedEmail
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '-b', '--batch-size', type='int', dest='batch_size', default=100,
+            help='The number of queued emails to load at a time'),
+        )
+
+    def handle(self, *args, **kwargs):
+        """Send all queued emails that are due over a single connection to the
+        mail server. Only one instance of this command should run at a time.
+        """
+        sent, failed = QueuedEmail.objects.send_due(
+            batch_size=kwargs.get('batch_size', 100))
+        if int(kwargs.get('verbosity')) > 0:
+            self.stdout.write('Sent {} emails'.format(len(sent)))
+            if sent:
+                latencies = [queued_email.get_latency().total_seconds()
+                             for queued_email in sent]
+                self.stdout.write(
+                    'Latency: {average:.1f}s average, {maximum:.1f}s '
+                    'maximum'.format(
+                        average=sum(latencies) / len(latencies),
+                        maximum=max(latencies)))
+            for queued_email in failed:
+                self.stdout.write(
+                    'Failed to send "{subject}" (attempt {attempt}): '
+                    '{error}'.format(
+                        subject=queued_email.subject,
+                        attempt=queued_email.attempts,
+                        error=queued_email.last_error))
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from south.utils import datetime_utils as datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding model 'QueuedEmail'
+        db.create_table(u'emailer_queuedemail', (
+            (u'id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('from_email', self.gf('django.db.models.fields.CharField')(max_length=255)),
+            ('to_list', self.gf('django.db.models.fields.TextField')()),
+            ('cc_list', self.gf('django.db.models.fields.TextField')()),
+            ('bcc_list', self.gf('django.db.models.fields.TextField')()),
+            ('headers', self.gf('django.db.models.fields.TextField')()),
+            ('subject', self.gf('django.db.models.fields.TextField')()),
+            ('body', self.gf('django.db.models.fields.TextField')()),
+            ('created', self.gf('django.db.models.fields.DateTimeField')(auto_now_add=True, blank=True)),
+            ('attempts', self.gf('django.db.models.fields.PositiveSmallIntegerField')(default=0)),
+            ('next_attempt', self.gf('django.db.models.fields.DateTimeField')(default=datetime.datetime.now, db_index=True)),
+            ('last_error', self.gf('django.db.models.fields.TextField')(blank=True)),
+            ('sent', self.gf('django.db.models.fields.DateTimeField')(null=True, blank=True)),
+        ))
+        db.send_create_signal(u'emailer', ['QueuedEmail'])
+
+
+    def backwards(self, orm):
+        # Deleting model 'QueuedEmail'
+        db.delete_table(u'emailer_queuedemail')
+
+
+    models = {
+        u'emailer.queuedemail': {
+            'Meta': {'ordering': "('created',)", 'object_name': 'QueuedEmail'},
+            'attempts': ('django.db.models.fields.PositiveSmallIntegerField', [], {'default': '0'}),
+            'bcc_list': ('django.db.models.fields.TextField', [], {}),
+            'body': ('django.db.models.fields.TextField', [], {}),
+            'cc_list': ('django.db.models.fields.TextField', [], {}),
+            'created': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'from_email': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'headers': ('django.db.models.fields.TextField', [], {}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'last_error': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'next_attempt': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now', 'db_index': 'True'}),
+            'sent': ('django.db.models.fields.DateTimeField', [], {'null': 'True', 'blank': 'True'}),
+            'subject': ('django.db.models.fields.TextField', [], {}),
+            'to_list': ('django.db.models.fields.TextField', [], {})
+        }
+    }
+
+    complete_apps = ['emailer']
\ No newline at end of file
@@ -0,0 +1,167 @@
+import datetime
+import json
+
+from django.core.mail import EmailMessage
+from django.core.mail import get_connection
+from django.db import models
+from django.db import transaction
+from django.utils import timezone
+from django.utils.encoding import force_text
+
+
+class QueuedEmailManager(models.Manager):
+    def enqueue(self, email_messages):
+        """Add the given EmailMessages to the queue of outgoing email, to be
+        sent later by send_due.
+        """
+        self.bulk_create([self.model.from_message(message)
+                          for message in email_messages])
+
+    def get_due(self):
+        """Return the queued emails that have not been sent yet and are due
+        to be (re)tried, oldest first.
+        """
+        return self.filter(
+            sent__isnull=True, attempts__lt=self.model.MAX_ATTEMPTS,
+            next_attempt__lte=timezone.now()).order_by('pk')
+
+    def claim_due(self, batch_size):
+        """Claim and return up to batch_size of the queued emails that are
+        due, so that no other send_due run sends them too.
+
+        The emails are locked while their next attempt is pushed back by
+        QueuedEmail.CLAIM_DURATION, so a concurrent run either waits for the
+        claim and then skips them, or claims other emails. If sending is
+        interrupted, claimed emails are retried once the claim runs out.
+        """
+        with transaction.atomic():
+            batch = list(self.get_due().select_for_update()[:batch_size])
+            if batch:
+                claimed_pks = [queued_email.pk for queued_email in batch]
+                self.filter(pk__in=claimed_pks).update(
+                    next_attempt=timezone.now() + self.model.CLAIM_DURATION)
+        return batch
+
+    def send_due(self, batch_size=100, connection=None):
+        """Send all queued emails that are due, in batches of batch_size, over
+        a single connection to the mail server.
+
+        The connection defaults to one for the EMAIL_BACKEND setting. An email
+        that fails to send is retried later with exponential backoff, up to
+        QueuedEmail.MAX_ATTEMPTS times. Returns a list of the QueuedEmails that
+        were sent and a list of the ones that failed.
+        """
+        connection = connection or get_connection()
+        sent = []
+        failed = []
+        try:
+            while True:
+                # Claimed emails and emails that fail are not due again until
+                # their next attempt, so every batch only contains emails not
+                # yet tried in this run (or claimed by a concurrent run)
+                batch = self.claim_due(batch_size)
+                if not batch:
+                    break
+                for queued_email in batch:
+                    if queued_email.send(connection):
+                        sent.append(queued_email)
+                    else:
+                        failed.append(queued_email)
+        finally:
+            connection.close()
+        return sent, failed
+
+
+class QueuedEmail(models.Model):
+    """An outgoing email waiting to be sent by the send_queued_email management
+    command, so that views don't have to wait for the mail server.
+
+    Queued emails are plain EmailMessages; attachments and alternative
+    contents are not supported.
+    """
+    # The number of times sending an email is tried before giving up on it
+    MAX_ATTEMPTS = 5
+
+    # The time to wait before retrying a failed email, which is doubled after
+    # each further failure
+    RETRY_DELAY = datetime.timedelta(minutes=1)
+
+    # The time that a send_due run has to send the emails it has claimed,
+    # before they are due again
+    CLAIM_DURATION = datetime.timedelta(minutes=10)
+
+    from_email = models.CharField(max_length=255)
+    # The lists of recipients and the dictionary of headers are stored as JSON
+    to_list = models.TextField()
+    cc_list = models.TextField()
+    bcc_list = models.TextField()
+    headers = models.TextField()
+    subject = models.TextField()
+    body = models.TextField()
+
+    created = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.TextField(blank=True)
+    sent = models.DateTimeField(null=True, blank=True)
+
+    objects = QueuedEmailManager()
+
+    class Meta(object):
+        ordering = ('created',)
+
+    def __unicode__(self):
+        return '{} ({})'.format(self.subject, self.from_email)
+
+    @classmethod
+    def from_message(cls, message):
+        """Return a new (unsaved) QueuedEmail for the given EmailMessage."""
+        return cls(
+            from_email=message.from_email,
+            to_list=json.dumps(message.to),
+            cc_list=json.dumps(message.cc),
+            bcc_list=json.dumps(message.bcc),
+            headers=json.dumps(message.extra_headers),
+            subject=message.subject,
+            body=message.body)
+
+    def get_message(self):
+        """Return the EmailMessage for this queued email."""
+        return EmailMessage(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email,
+            to=json.loads(self.to_list),
+            cc=json.loads(self.cc_list),
+            bcc=json.loads(self.bcc_list),
+            headers=json.loads(self.headers))
+
+    def get_latency(self):
+        """Return the time between this email being queued and being sent, or
+        None if it has not been sent yet.
+        """
+        if self.sent is None:
+            return None
+        return self.sent - self.created
+
+    def send(self, connection):
+        """Send this email using the given connection, which is opened if it
+        is not open yet and left open for sending more emails, and record the
+        result. Returns whether the email was sent.
+        """
+        self.attempts += 1
+        try:
+            connection.open()
+            connection.send_messages([self.get_message()])
+        except Exception as exception:  # pylint: disable=W0703
+            # Close the connection so that it is reopened for the next email,
+            # in case the failure was caused by the connection being dropped
+            connection.close()
+            self.last_error = force_text(exception, errors='replace')
+            self.next_attempt = timezone.now() + (
+                self.RETRY_DELAY * 2 ** (self.attempts - 1))
+            self.save(update_fields=['attempts', 'last_error', 'next_attempt'])
+            return False
+        self.sent = timezone.now()
+        self.save(update_fields=['attempts', 'sent'])
+        return True
@@ -1,15 +1,21 @@
+from smtplib import SMTPException
+
+from mock import patch
 import mox
 
 from django import forms
 from django.contrib.auth import get_user_model
 from django.core import mail
 from django.core.mail import BadHeaderError
+from django.core.mail import EmailMessage
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 from django.test.utils import override_settings
+from django.utils import timezone
 
 from quark.emailer.forms import ContactCaptcha
 from quark.emailer.forms import ContactForm
+from quark.emailer.models import QueuedEmail
 
 
 class ContactFormTest(TestCase):
@@ -88,6 +94,85 @@ class ContactFormTest(TestCase):
         self.assertTrue(result)
 
 
+class QueuedEmailTest(TestCase):
+    def setUp(self):
+        self.message = EmailMessage(
+            subject='Queued', body='Queued message', from_email='a@b.edu',
+            to=['test@tbp.berkeley.edu'], bcc=['bcc@tbp.berkeley.edu'],
+            headers={'Reply-To': 'c@d.edu'},
+            connection=mail.get_connection(
+                'quark.emailer.backends.QueuedEmailBackend'))
+
+    def test_send_queued(self):
+        self.assertEqual(self.message.send(), 1)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(QueuedEmail.objects.get_due().count(), 1)
+
+        sent, failed = QueuedEmail.objects.send_due()
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(failed, [])
+        self.assertIsNotNone(sent[0].get_latency())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Queued')
+        self.assertEqual(mail.outbox[0].body, 'Queued message')
+        self.assertEqual(mail.outbox[0].from_email, 'a@b.edu')
+        self.assertEqual(mail.outbox[0].to, ['test@tbp.berkeley.edu'])
+        self.assertEqual(mail.outbox[0].bcc, ['bcc@tbp.berkeley.edu'])
+        self.assertEqual(mail.outbox[0].extra_headers, {'Reply-To': 'c@d.edu'})
+
+        # Sent emails are not sent again
+        self.assertFalse(QueuedEmail.objects.get_due().exists())
+        self.assertEqual(QueuedEmail.objects.send_due(), ([], []))
+
+    def test_retry(self):
+        self.message.send()
+        connection = mail.get_connection()
+        with patch.object(connection, 'send_messages',
+                          side_effect=SMTPException('Server down')):
+            sent, failed = QueuedEmail.objects.send_due(connection=connection)
+        self.assertEqual(sent, [])
+        self.assertEqual(len(failed), 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+        queued_email = QueuedEmail.objects.get()
+        self.assertEqual(queued_email.attempts, 1)
+        self.assertEqual(queued_email.last_error, 'Server down')
+        self.assertGreater(queued_email.next_attempt, timezone.now())
+        self.assertIsNone(queued_email.sent)
+
+        # The email is retried once its next attempt is due
+        self.assertFalse(QueuedEmail.objects.get_due().exists())
+        queued_email.next_attempt = timezone.now()
+        queued_email.save()
+        sent, failed = QueuedEmail.objects.send_due()
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(sent[0].attempts, 2)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_claimed_not_sent_twice(self):
+        self.message.send()
+        self.message.send()
+        # A concurrent run has claimed one of the emails, so this run only
+        # sends the other one
+        claimed = QueuedEmail.objects.claim_due(batch_size=1)
+        self.assertEqual(len(claimed), 1)
+        sent, failed = QueuedEmail.objects.send_due()
+        self.assertEqual([queued_email.pk for queued_email in sent],
+                         [QueuedEmail.objects.exclude(
+                             pk=claimed[0].pk).get().pk])
+        self.assertEqual(failed, [])
+        self.assertEqual(len(mail.outbox), 1)
+
+        # Claimed emails are due again if the claim runs out without them
+        # being sent
+        self.assertEqual(QueuedEmail.objects.send_due(), ([], []))
+        QueuedEmail.objects.filter(pk=claimed[0].pk).update(
+            next_attempt=timezone.now())
+        sent, _ = QueuedEmail.objects.send_due()
+        self.assertEqual(sent, claimed)
+        self.assertEqual(len(mail.outbox), 2)
+
+
 @override_settings(HELPDESK_ADDRESS='test_hd@tbp.berkeley.edu')
 class HelpdeskEmailerTest(TestCase):
     def setUp(self):
@@ -128,6 +213,7 @@ class HelpdeskEmailerTest(TestCase):
                            HELPDESK_SEND_SPAM_NOTICE=True):
             response = self.client.post(self.url, submit_data)
         context = response.context
+        QueuedEmail.objects.send_due()
         self.assertEqual(response.status_code, 200)
 
         self.assertEqual(len(mail.outbox), 1)
@@ -151,6 +237,7 @@ class HelpdeskEmailerTest(TestCase):
         with self.settings(HELPDESK_CC_ASKER=False, ENABLE_HELPDESKQ=False):
             response = self.client.post(self.url, self.default_entry)
         context = response.context
+        QueuedEmail.objects.send_due()
         self.assertEqual(response.status_code, 200)
 
         self.assertEqual(len(mail.outbox), 1)
@@ -166,6 +253,7 @@ class HelpdeskEmailerTest(TestCase):
         with self.settings(HELPDESK_CC_ASKER=True, ENABLE_HELPDESKQ=False):
             response = self.client.post(self.url, self.default_entry)
         context = response.context
+        QueuedEmail.objects.send_due()
         self.assertEqual(response.status_code, 200)
 
         self.assertEqual(len(mail.outbox), 2)
@@ -185,6 +273,7 @@ class HelpdeskEmailerTest(TestCase):
         with self.settings(ENABLE_HELPDESKQ=True, HELPDESK_CC_ASKER=False):
             response = self.client.post(self.url, self.default_entry)
         context = response.context
+        QueuedEmail.objects.send_due()
         self.assertEqual(response.status_code, 200)
 
         self.assertEqual(len(mail.outbox), 2)
@@ -300,6 +389,7 @@ class CompanyEmailerTest(TestCase):
         with self.settings(INDREL_SEND_SPAM=False):
             response = self.client.post(self.url, submit_data)
         context = response.context
+        QueuedEmail.objects.send_due()
         self.assertEqual(response.status_code, 200)
 
         self.assertEqual(len(mail.outbox), 1)
@@ -317,6 +407,7 @@ class CompanyEmailerTest(TestCase):
                            INDREL_SEND_SPAM_NOTICE=True):
             response = self.client.post(self.url, submit_data)
         context = response.context
+        QueuedEmail.objects.send_due()
         self.assertEqual(response.status_code, 200)
 
         self.assertEqual(len(mail.outbox), 1)
@@ -340,6 +431,7 @@ class CompanyEmailerTest(TestCase):
         self.client.logout()
         response = self.client.post(self.url, self.default_entry)
         context = response.context
+        QueuedEmail.objects.send_due()
         self.assertEqual(response.status_code, 200)
 
         self.assertEqual(len(mail.outbox), 1)
@@ -356,6 +448,7 @@ class CompanyEmailerTest(TestCase):
         submit_data['email'] = 'test_logged_in@tbp.berkeley.edu'
         response = self.client.post(self.url, submit_data)
         context = response.context
+        QueuedEmail.objects.send_due()
         self.assertEqual(response.status_code, 200)
 
         self.assertEqual(len(mail.outbox), 1)
@@ -5,6 +5,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.decorators import permission_required
 from django.core.exceptions import PermissionDenied
 from django.core.mail import EmailMessage
+from django.core.mail import get_connection
 from django.core.mail import make_msgid
 from django.shortcuts import get_object_or_404
 from django.shortcuts import render_to_response
@@ -49,6 +50,10 @@ class EmailerView(FormView):
     get_context_data should be overridden to add any custom context variables.
     EmailerView already adds result_message and success
 
+    Emails are sent using get_email_connection, which by default adds them to
+    the queue of outgoing email (see the EMAILER_BACKEND setting), so that
+    responses don't have to wait for the mail server.
+
     The form_id instance variable is used for header information in sending the
     email.
     """
@@ -78,6 +83,7 @@ class EmailerView(FormView):
         headers['X{}-IP-Address'.format(form_id)] = ip_addr
         headers['X{}-UserAgent'.format(form_id)] = useragent
         kwargs['headers'] = headers
+        kwargs['connection'] = self.get_email_connection()
 
         self.success = form.send_email(**kwargs)
         self.result_message = self.result_messages[self.success]
@@ -103,6 +109,10 @@ class EmailerView(FormView):
         context['success'] = self.success
         return context
 
+    def get_email_connection(self):
+        """Return the connection used to send the emails of this view."""
+        return get_connection(settings.EMAILER_BACKEND)
+
     def handle_spam(self, form, to_email, from_email, send_spam_notice,
                     send_spam, headers):
         form_id = ('-' + self.form_id) if self.form_id else self.form_id
@@ -128,7 +138,8 @@ class EmailerView(FormView):
                           message=form.cleaned_data['message'])),
                 from_email=sender,
                 to=to_email,
-                headers=headers)
+                headers=headers,
+                connection=self.get_email_connection())
             # server will return 500 error if spamnotice cannot be sent.
             spamnotice.send()
 
@@ -310,7 +321,8 @@ class HelpdeskEmailerView(EmailerView):
             from_email=sender,
             to=assigning_to,
             cc=[settings.HELPDESK_ADDRESS],
-            headers=headers)
+            headers=headers,
+            connection=self.get_email_connection())
 
         assigning_message.send(fail_silently=True)
 
@@ -326,7 +338,8 @@ class HelpdeskEmailerView(EmailerView):
                       name=form.cleaned_data['name'],
                       question=form.cleaned_data['message'])),
             from_email=sender,
-            to=[from_email],)
+            to=[from_email],
+            connection=self.get_email_connection())
         # sending is nonessential due to confirmation page
         ccmessage.send(fail_silently=True)
 
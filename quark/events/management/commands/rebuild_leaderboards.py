@@ -0,0 +1,34 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from quark.base.models import Term
+from quark.events.models import LeaderboardEntry
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '-t', '--term', dest='term', default='',
+            help='Only rebuild the leaderboard for the given term (e.g., '
+                 'fa2012)'),
+        )
+
+    def handle(self, *args, **kwargs):
+        """Recompute the event attendance leaderboard entries for every term,
+        or for only the given term.
+        """
+        term_name = kwargs.get('term')
+        if term_name:
+            terms = [Term.objects.get_by_url_name(term_name)]
+            if terms[0] is None:
+                self.stderr.write('Invalid term: {}'.format(term_name))
+                return
+        else:
+            terms = Term.objects.filter(event__isnull=False).distinct()
+
+        for term in terms:
+            LeaderboardEntry.objects.rebuild(term)
+            if int(kwargs.get('verbosity')) > 0:
+                self.stdout.write('Rebuilt leaderboard for {}'.format(
+                    term.verbose_name()))
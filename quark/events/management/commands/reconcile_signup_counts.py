@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from quark.events.models import Event
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **kwargs):
+        """Recompute the denormalized signup, guest and seat counters of every
+        event from its signups, correcting any that have drifted (for
+        instance, because signups were loaded from fixtures or changed with
+        queryset updates).
+        """
+        corrected_pks = Event.objects.reconcile_signup_counts()
+        if int(kwargs.get('verbosity')) > 0:
+            self.stdout.write(
+                'Corrected the signup counts of {} events{}'.format(
+                    len(corrected_pks),
+                    ': {}'.format(', '.join(str(pk) for pk in corrected_pks))
+                    if corrected_pks else ''))
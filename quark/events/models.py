@@ -1,15 +1,27 @@
+import time
+
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.db import connections
 from django.db import models
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import F
 from django.db.models import Sum
 from django.db.models.query import QuerySet
+from django.dispatch import Signal
 from django.template import defaultfilters
 from django.utils import timezone
 from django.utils.http import urlencode
 
+from quark.base.models import Officer
 from quark.base.models import OfficerPosition
 from quark.base.models import Term
 from quark.project_reports.models import ProjectReport
+from quark.shortcuts import disable_for_loaddata
+from quark.shortcuts import get_object_or_none
 
 
 class EventTypeManager(models.Manager):
@@ -55,8 +67,13 @@ class EventQuerySetMixin(object):
 
         Viewability is based on the "restriction" level for the events.
         """
-        user_level = Event.get_user_restriction_level(user)
+        return self.get_viewable_at_level(
+            Event.get_user_restriction_level(user))
 
+    def get_viewable_at_level(self, user_level):
+        """Return events that can be viewed by a user with the given
+        restriction level (see Event.get_user_restriction_level).
+        """
         # Initialize visible_levels to those that are visible to everyone
         visible_levels = list(Event.VISIBLE_TO_EVERYONE)
         if user_level >= Event.MEMBER:
@@ -76,9 +93,65 @@ class EventManager(models.Manager, EventQuerySetMixin):
 
     Based on https://djangosnippets.org/snippets/2114/
     """
+    # The cache key for the time at which any event was last changed, which
+    # is used to version the cached iCal feeds and event lists
+    VERSION_KEY = 'event_version'
+
     def get_query_set(self):
         return EventQuerySet(self.model, using=self._db)
 
+    def get_version(self):
+        """Return the time at which any event was last changed, as a
+        timestamp, for use in versioning the cached iCal feeds and event lists.
+        """
+        version = cache.get(self.VERSION_KEY)
+        if version is None:
+            # Nothing is known about when events last changed, so treat them
+            # as having changed now
+            version = time.time()
+            cache.set(self.VERSION_KEY, version, None)
+        return version
+
+    def invalidate_cache(self):
+        """Mark all cached iCal feeds and event lists as out of date."""
+        cache.set(self.VERSION_KEY, time.time(), None)
+
+    def update_signup_counts(self, event_pk, num_signups=0, num_guests=0,
+                             num_seats=0):
+        """Atomically add the given (possibly negative) amounts to the signup
+        counters of the event with the given primary key.
+        """
+        self.filter(pk=event_pk).update(
+            num_signups=F('num_signups') + num_signups,
+            num_guests=F('num_guests') + num_guests,
+            num_seats=F('num_seats') + num_seats)
+
+    def reconcile_signup_counts(self):
+        """Recompute the signup counters of all events from their signups,
+        correct the counters that are wrong and return the primary keys of
+        the events they belong to.
+        """
+        counts = dict(
+            (event_counts['event'], (event_counts['pk__count'],
+                                     event_counts['num_guests__sum'] or 0,
+                                     event_counts['driving__sum'] or 0))
+            for event_counts in EventSignUp.objects.filter(
+                unsignup=False).values('event').annotate(
+                Count('pk'), Sum('num_guests'), Sum('driving')).order_by())
+        corrected_pks = []
+        with transaction.atomic():
+            stored_counts = self.select_for_update().values_list(
+                'pk', 'num_signups', 'num_guests', 'num_seats')
+            for event_pk, num_signups, num_guests, num_seats in stored_counts:
+                event_counts = counts.get(event_pk, (0, 0, 0))
+                if event_counts != (num_signups, num_guests, num_seats):
+                    self.filter(pk=event_pk).update(
+                        num_signups=event_counts[0],
+                        num_guests=event_counts[1],
+                        num_seats=event_counts[2])
+                    corrected_pks.append(event_pk)
+        return corrected_pks
+
 
 class Event(models.Model):
     # Restriction constants
@@ -98,6 +171,9 @@ class Event(models.Model):
 
     VISIBLE_TO_EVERYONE = (OPEN, PUBLIC, CANDIDATE)
 
+    # The counters that only signups update
+    SIGNUP_COUNT_FIELDS = ('num_signups', 'num_guests', 'num_seats')
+
     name = models.CharField(max_length=80, verbose_name='event name')
     event_type = models.ForeignKey(EventType)
 
@@ -141,6 +217,13 @@ class Event(models.Model):
                                        related_name='event', default=None,
                                        on_delete=models.SET_NULL)
 
+    # Denormalized counts of the signups that have not been unsigned up, and
+    # of their guests and seats in cars, which are maintained by
+    # EventSignUp.save so that they need not be aggregated for every display
+    num_signups = models.PositiveIntegerField(default=0, editable=False)
+    num_guests = models.PositiveIntegerField(default=0, editable=False)
+    num_seats = models.PositiveIntegerField(default=0, editable=False)
+
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
@@ -157,6 +240,18 @@ class Event(models.Model):
     def __unicode__(self):
         return u'{} - {}'.format(self.name, unicode(self.term))
 
+    def save(self, *args, **kwargs):
+        """Save the event, except for the signup counters of an event that
+        already exists, since signups may have changed them (with F-expression
+        updates) since the event was loaded.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.fields
+                if not field.primary_key and
+                field.name not in self.SIGNUP_COUNT_FIELDS]
+        super(Event, self).save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse('events:detail', args=(self.pk,))
 
@@ -179,8 +274,7 @@ class Event(models.Model):
         This number does not include the signed-up users, themselves; only
         their guests are counted here.
         """
-        return (self.eventsignup_set.filter(unsignup=False).aggregate(
-                Sum('num_guests'))['num_guests__sum'] or 0)
+        return self.num_guests
 
     def get_num_rsvps(self, include_guests=True):
         """Return the expected number of attendees based on signups.
@@ -189,7 +283,7 @@ class Event(models.Model):
         include_guests is True (as default), this count also includes the
         number of guests for each signup.
         """
-        count = self.eventsignup_set.filter(unsignup=False).count()
+        count = self.num_signups
         if include_guests:
             count += self.get_num_guests()
         return count
@@ -367,6 +461,39 @@ class EventSignUp(models.Model):
             ('view_driving_numbers', 'Can view driving number details'),
         )
 
+    def save(self, *args, **kwargs):
+        """Save the signup and update the signup counters of its event (and
+        of its previous event, if it was moved) by the difference the change
+        makes to them.
+        """
+        with transaction.atomic():
+            old_signup = None
+            if self.pk is not None:
+                old_signup = get_object_or_none(
+                    EventSignUp.objects.select_for_update(), pk=self.pk)
+            super(EventSignUp, self).save(*args, **kwargs)
+
+            counts = self.get_counts()
+            if old_signup is not None:
+                old_counts = old_signup.get_counts()
+                if old_signup.event_id != self.event_id:
+                    Event.objects.update_signup_counts(
+                        old_signup.event_id,
+                        *[-count for count in old_counts])
+                else:
+                    counts = [count - old_count for count, old_count in
+                              zip(counts, old_counts)]
+            if any(counts):
+                Event.objects.update_signup_counts(self.event_id, *counts)
+
+    def get_counts(self):
+        """Return the (signups, guests, seats) that this signup adds to the
+        signup counters of its event.
+        """
+        if self.unsignup:
+            return (0, 0, 0)
+        return (1, self.num_guests, self.driving)
+
     def __unicode__(self):
         action = 'unsigned' if self.unsignup else 'signed'
         if self.user is None:
@@ -382,10 +509,87 @@ class EventSignUp(models.Model):
             event_name=self.event.name)
 
 
+class EventAttendanceManager(models.Manager):
+    def update_attendance(self, event, add_users=(), remove_users=()):
+        """Record attendance at the given event for all of the users in
+        add_users, and remove attendance for all of the users in remove_users.
+
+        Unlike saving or deleting EventAttendance objects one at a time, the
+        changes are made in a single transaction with a bulk insert and delete,
+        the event's project report attendance lists are updated with one query
+        per list, and the leaderboard is updated once for the whole batch. The
+        attendance_updated signal is then sent in place of the post_save and
+        post_delete signals for each attendance record.
+
+        Return a tuple of the lists of users whose attendance was actually
+        added and removed.
+        """
+        with transaction.atomic():
+            attendee_pks = set(self.filter(event=event).values_list(
+                'user_id', flat=True))
+            added_users = []
+            for user in add_users:
+                if user.pk not in attendee_pks:
+                    added_users.append(user)
+                    attendee_pks.add(user.pk)
+            removed_users = []
+            for user in remove_users:
+                if user.pk in attendee_pks:
+                    removed_users.append(user)
+                    attendee_pks.remove(user.pk)
+
+            self.bulk_create([EventAttendance(event=event, user=user)
+                              for user in added_users])
+            if removed_users:
+                # Deleted with a single statement and without the post_delete
+                # signal, whose receiver would update the leaderboard once per
+                # removed user. Nothing refers to attendance records, and the
+                # project report lists and the leaderboard are updated for the
+                # whole batch below.
+                self.filter(event=event, user__in=removed_users)._raw_delete(
+                    using=self.db)
+
+            project_report = event.project_report
+            if project_report and added_users:
+                users_by_list = {}
+                added_user_pks = [user.pk for user in added_users]
+                for user in get_user_model().objects.filter(
+                        pk__in=added_user_pks).select_related(
+                        'userprofile', 'studentorguserprofile'):
+                    list_name = EventAttendance.get_project_report_list_name(
+                        user)
+                    if list_name:
+                        users_by_list.setdefault(list_name, []).append(user)
+                for list_name, users in users_by_list.iteritems():
+                    getattr(project_report, list_name).add(*users)
+            if project_report and removed_users:
+                project_report.officer_list.remove(*removed_users)
+                project_report.candidate_list.remove(*removed_users)
+                project_report.member_list.remove(*removed_users)
+
+            if added_users or removed_users:
+                LeaderboardEntry.objects.rebuild(event.term)
+
+        if added_users or removed_users:
+            attendance_updated.send(
+                sender=EventAttendance, event=event, added_users=added_users,
+                removed_users=removed_users)
+        return added_users, removed_users
+
+
+# Sent after EventAttendanceManager.update_attendance changes attendance for
+# an event, in place of the post_save and post_delete signals for each
+# attendance record
+attendance_updated = Signal(
+    providing_args=['event', 'added_users', 'removed_users'])
+
+
 class EventAttendance(models.Model):
     event = models.ForeignKey(Event)
     user = models.ForeignKey(settings.AUTH_USER_MODEL)
 
+    objects = EventAttendanceManager()
+
     # TODO(sjdemartini): Deal with the pre-noiro attendance importing? Note
     # that noiro added a separate field here to handle pre-noiro attendance
     # imports, as well as ImportedAttendance objects
@@ -395,19 +599,32 @@ class EventAttendance(models.Model):
                                         self.event.name)
 
     def save(self, *args, **kwargs):
+        self.add_to_project_report()
+        super(EventAttendance, self).save(*args, **kwargs)
+
+    def add_to_project_report(self):
         """If a project report is required for the corresponding event, add the
         user to the appropriate attendance list.
         """
         if self.event.project_report:
-            project_report = self.event.project_report
-            user_profile = self.user.userprofile
-            if user_profile.is_officer(current=True):
-                project_report.officer_list.add(self.user)
-            elif user_profile.is_candidate():
-                project_report.candidate_list.add(self.user)
-            elif user_profile.is_member():
-                project_report.member_list.add(self.user)
-        super(EventAttendance, self).save(*args, **kwargs)
+            list_name = self.get_project_report_list_name(self.user)
+            if list_name:
+                getattr(self.event.project_report, list_name).add(self.user)
+
+    @staticmethod
+    def get_project_report_list_name(user):
+        """Return the name of the project report attendance list that the
+        given user belongs on ('officer_list', 'candidate_list' or
+        'member_list'), or None if the user belongs on none of them.
+        """
+        user_profile = user.userprofile
+        if user_profile.is_officer(current=True):
+            return 'officer_list'
+        elif user_profile.is_candidate():
+            return 'candidate_list'
+        elif user_profile.is_member():
+            return 'member_list'
+        return None
 
     def delete(self, *args, **kwargs):
         """If a project report is required for the corresponding event, remove
@@ -422,3 +639,223 @@ class EventAttendance(models.Model):
 
     class Meta(object):
         unique_together = ('event', 'user')
+
+
+class LeaderboardEntryManager(models.Manager):
+    def get_user_position(self, term, user):
+        """Return the leaderboard position category of the given user in the
+        given term.
+
+        A user is in the officer category if they held a non-auxiliary officer
+        position that term, in the candidate category if they were a candidate
+        that term, and in the member category otherwise.
+        """
+        # Avoid circular dependency by importing here:
+        from quark.candidates.models import Candidate
+
+        if Officer.objects.filter(
+                user=user, term=term, position__auxiliary=False).exists():
+            return LeaderboardEntry.OFFICER
+        elif Candidate.objects.filter(user=user, term=term).exists():
+            return LeaderboardEntry.CANDIDATE
+        return LeaderboardEntry.MEMBER
+
+    def update_user_entry(self, term, user):
+        """Recount the given user's attendance in the given term and update
+        their leaderboard entry and the ranks for the term accordingly.
+        """
+        count = EventAttendance.objects.filter(
+            user=user, event__term=term, event__cancelled=False).count()
+        with transaction.atomic():
+            if count == 0:
+                self.filter(term=term, user=user).delete()
+            else:
+                entry, created = self.get_or_create(
+                    term=term, user=user,
+                    defaults={'count': count,
+                              'position': self.get_user_position(term, user)})
+                if not created and entry.count != count:
+                    entry.count = count
+                    entry.save(update_fields=['count'])
+            self.update_ranks(term)
+
+    def update_user_position(self, term, user):
+        """Update the position category of the given user's leaderboard entry
+        for the given term, if they have one.
+        """
+        self.filter(term=term, user=user).update(
+            position=self.get_user_position(term, user))
+
+    def update_ranks(self, term):
+        """Recompute the ranks of all leaderboard entries for the given term.
+
+        Users with the same attendance count share the same rank, and the
+        following rank is skipped accordingly (e.g., 1, 2, 2, 4). Each rank is
+        one more than the number of entries with a higher count, so all of the
+        ranks are updated with a single statement. The other entries are read
+        from a grouped subquery rather than from the table itself, since MySQL
+        does not allow a subquery on the table being updated.
+        """
+        quote_name = connections[self.db].ops.quote_name
+        opts = self.model._meta
+        sql = (
+            'UPDATE {table} SET {rank} = 1 + COALESCE(('
+            'SELECT SUM(higher.num) FROM ('
+            'SELECT {count}, COUNT(*) AS num FROM {table} '
+            'WHERE {term} = %s GROUP BY {count}) AS higher '
+            'WHERE higher.{count} > {table}.{count}), 0) '
+            'WHERE {term} = %s').format(
+            table=quote_name(opts.db_table),
+            rank=quote_name(opts.get_field('rank').column),
+            count=quote_name(opts.get_field('count').column),
+            term=quote_name(opts.get_field('term').column))
+        connections[self.db].cursor().execute(sql, [term.pk, term.pk])
+
+    def rebuild(self, term):
+        """Recompute all leaderboard entries for the given term from scratch.
+
+        Used when an event's attendance changes as a whole (for instance, when
+        an event is cancelled) and for initially populating the leaderboard.
+        """
+        # Avoid circular dependency by importing here:
+        from quark.candidates.models import Candidate
+
+        counts = dict(EventAttendance.objects.filter(
+            event__term=term, event__cancelled=False).values_list(
+            'user').annotate(count=Count('pk')).order_by())
+        officer_pks = set(Officer.objects.filter(
+            term=term, position__auxiliary=False).values_list(
+            'user', flat=True))
+        candidate_pks = set(Candidate.objects.filter(term=term).values_list(
+            'user', flat=True))
+
+        def get_position(user_pk):
+            if user_pk in officer_pks:
+                return LeaderboardEntry.OFFICER
+            elif user_pk in candidate_pks:
+                return LeaderboardEntry.CANDIDATE
+            return LeaderboardEntry.MEMBER
+
+        with transaction.atomic():
+            existing = {}
+            for entry in self.filter(term=term):
+                existing[entry.user_id] = entry
+            stale_pks = [entry.pk for user_pk, entry in existing.iteritems()
+                         if user_pk not in counts]
+            self.filter(pk__in=stale_pks).delete()
+
+            new_entries = []
+            for user_pk, count in counts.iteritems():
+                position = get_position(user_pk)
+                entry = existing.get(user_pk)
+                if entry is None:
+                    new_entries.append(LeaderboardEntry(
+                        term=term, user_id=user_pk, count=count,
+                        position=position))
+                elif entry.count != count or entry.position != position:
+                    entry.count = count
+                    entry.position = position
+                    entry.save(update_fields=['count', 'position'])
+            self.bulk_create(new_entries)
+            self.update_ranks(term)
+
+
+class LeaderboardEntry(models.Model):
+    """A user's event attendance in a term, as shown on the leaderboard.
+
+    Entries are maintained by signal handlers on EventAttendance, Event,
+    Officer and Candidate, so that a term's leaderboard can be read with a
+    single indexed query instead of being recounted for every page view.
+    """
+    # Position category constants
+    OFFICER = 'officer'
+    CANDIDATE = 'candidate'
+    MEMBER = 'member'
+
+    POSITION_CHOICES = (
+        (OFFICER, 'Officer'),
+        (CANDIDATE, 'Candidate'),
+        (MEMBER, 'Member'),
+    )
+
+    term = models.ForeignKey(Term)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL)
+    count = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of non-cancelled events attended in the term.')
+    position = models.CharField(
+        max_length=9, choices=POSITION_CHOICES, default=MEMBER)
+    rank = models.PositiveIntegerField(default=1)
+
+    objects = LeaderboardEntryManager()
+
+    class Meta(object):
+        ordering = ('term', 'rank')
+        index_together = (('term', 'rank'),)
+        unique_together = ('term', 'user')
+        verbose_name_plural = 'leaderboard entries'
+
+    def __unicode__(self):
+        return u'{}: {} events in {}'.format(
+            self.user.get_full_name(), self.count, self.term)
+
+
+@disable_for_loaddata
+def leaderboard_attendance_post_save(sender, instance, created, **kwargs):
+    """Update the attendee's leaderboard entry for the event's term."""
+    if created:
+        LeaderboardEntry.objects.update_user_entry(
+            instance.event.term, instance.user)
+
+
+def leaderboard_attendance_post_delete(sender, instance, **kwargs):
+    """Update the former attendee's leaderboard entry for the event's term."""
+    LeaderboardEntry.objects.update_user_entry(
+        instance.event.term, instance.user)
+
+
+@disable_for_loaddata
+def leaderboard_event_post_save(sender, instance, created, **kwargs):
+    """Rebuild the leaderboard for the event's term if the event has
+    attendance, since the event may have been cancelled or uncancelled.
+    """
+    if not created and instance.eventattendance_set.exists():
+        LeaderboardEntry.objects.rebuild(instance.term)
+
+
+def signup_post_delete(sender, instance, **kwargs):
+    """Remove a deleted signup from the signup counters of its event."""
+    Event.objects.update_signup_counts(
+        instance.event_id, *[-count for count in instance.get_counts()])
+
+
+def invalidate_event_cache(sender, instance, **kwargs):
+    """Invalidate the cached iCal feeds and event lists when any event or
+    event type is changed.
+    """
+    Event.objects.invalidate_cache()
+
+
+@disable_for_loaddata
+def leaderboard_officer_post_save(sender, instance, **kwargs):
+    """Update the officer's leaderboard position for the officer's term."""
+    LeaderboardEntry.objects.update_user_position(instance.term, instance.user)
+
+
+def leaderboard_officer_post_delete(sender, instance, **kwargs):
+    """Update the former officer's leaderboard position for the term."""
+    LeaderboardEntry.objects.update_user_position(instance.term, instance.user)
+
+
+models.signals.post_save.connect(
+    leaderboard_attendance_post_save, sender=EventAttendance)
+models.signals.post_delete.connect(
+    leaderboard_attendance_post_delete, sender=EventAttendance)
+models.signals.post_delete.connect(signup_post_delete, sender=EventSignUp)
+models.signals.post_save.connect(leaderboard_event_post_save, sender=Event)
+models.signals.post_save.connect(invalidate_event_cache, sender=Event)
+models.signals.post_delete.connect(invalidate_event_cache, sender=Event)
+models.signals.post_save.connect(invalidate_event_cache, sender=EventType)
+models.signals.post_save.connect(leaderboard_officer_post_save, sender=Officer)
+models.signals.post_delete.connect(
+    leaderboard_officer_post_delete, sender=Officer)
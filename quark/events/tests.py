@@ -1,21 +1,40 @@
 import datetime
+import json
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.contrib.auth.models import Permission
+from django.core.cache import get_cache
+from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import RequestFactory
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.test.utils import override_settings
 from django.utils import timezone
+from django.utils.http import http_date
+from django.utils.http import quote_etag
+from mock import Mock
+from mock import patch
+import vobject
 
 from quark.base.models import Officer
 from quark.base.models import OfficerPosition
 from quark.base.models import Term
 from quark.candidates.models import Candidate
+from quark.events import models as event_models
+from quark.events import views as event_views
 from quark.events.forms import EventForm
 from quark.events.models import Event
 from quark.events.models import EventAttendance
 from quark.events.models import EventSignUp
 from quark.events.models import EventType
+from quark.events.models import LeaderboardEntry
+from quark.events.models import attendance_updated
+from quark.events.views import EventListView
+from quark.events.views import IndividualAttendanceListView
+from quark.events.views import ical_not_modified
 from quark.project_reports.models import ProjectReport
 from quark.shortcuts import get_object_or_none
 from quark.user_profiles.models import StudentOrgUserProfile
@@ -344,6 +363,67 @@ class EventTest(EventTesting):
         self.assertEqual('Signup updated!',
                          str(list(r2_get.context['messages'])[0]))
 
+    def test_signup_counts(self):
+        start_time = timezone.now()
+        end_time = start_time + datetime.timedelta(hours=2)
+        event = self.create_event(start_time, end_time)
+
+        def assert_counts(num_signups, num_guests, num_seats):
+            saved_event = Event.objects.get(pk=event.pk)
+            self.assertEqual(
+                (saved_event.num_signups, saved_event.num_guests,
+                 saved_event.num_seats),
+                (num_signups, num_guests, num_seats))
+            self.assertEqual(
+                saved_event.get_num_rsvps(), num_signups + num_guests)
+
+        signup = EventSignUp(event=event, user=self.user, num_guests=2,
+                             driving=4)
+        signup.save()
+        anonymous_signup = EventSignUp(event=event, name='Anonymous',
+                                       email='anonymous@example.com')
+        anonymous_signup.save()
+        assert_counts(2, 2, 4)
+
+        # Updating a signup only changes the counters by the difference
+        signup.num_guests = 1
+        signup.save()
+        assert_counts(2, 1, 4)
+
+        # Unsigned up signups are not counted
+        signup.unsignup = True
+        signup.save()
+        assert_counts(1, 0, 0)
+        signup.unsignup = False
+        signup.save()
+        assert_counts(2, 1, 4)
+
+        # Moving a signup to another event moves its counts as well
+        other_event = self.create_event(start_time, end_time)
+        signup.event = other_event
+        signup.save()
+        assert_counts(1, 0, 0)
+        self.assertEqual(Event.objects.get(pk=other_event.pk).num_seats, 4)
+
+        anonymous_signup.delete()
+        assert_counts(0, 0, 0)
+
+        # Counters that have drifted are corrected when reconciling
+        Event.objects.filter(pk=other_event.pk).update(num_signups=5)
+        self.assertEqual(Event.objects.reconcile_signup_counts(),
+                         [other_event.pk])
+        self.assertEqual(Event.objects.reconcile_signup_counts(), [])
+        self.assertEqual(Event.objects.get(pk=other_event.pk).num_signups, 1)
+
+        # Saving an event loaded before a signup keeps the signup's counts
+        stale_event = Event.objects.get(pk=event.pk)
+        EventSignUp(event=event, name='Late', email='late@example.com',
+                    num_guests=1).save()
+        stale_event.name = 'Renamed Event'
+        stale_event.save()
+        assert_counts(1, 1, 0)
+        self.assertEqual(Event.objects.get(pk=event.pk).name, 'Renamed Event')
+
     def test_list_date(self):
         start_time = datetime.datetime(2015, 3, 14, 9, 26, 53, 59)
         start_time = timezone.make_aware(start_time,
@@ -640,6 +720,391 @@ class EventTest(EventTesting):
         self.assertQuerysetEqual(project_report.candidate_list.all(), [])
         self.assertQuerysetEqual(project_report.member_list.all(), [])
 
+    def test_update_attendance(self):
+        start_time = timezone.now()
+        end_time = start_time + datetime.timedelta(hours=2)
+        event = self.create_event(start_time, end_time)
+        project_report = ProjectReport.objects.create(
+            term=self.term,
+            date=datetime.date.today(),
+            title='Test project report',
+            author=self.user,
+            committee=self.committee)
+        event.project_report = project_report
+        event.save()
+
+        users = {}
+        for role in ['candidate', 'member', 'officer']:
+            users[role] = get_user_model().objects.create_user(
+                username=role,
+                email='it@tbp.berkeley.edu',
+                password=role,
+                first_name='Fake',
+                last_name=role)
+            StudentOrgUserProfile.objects.get_or_create(user=users[role])
+        Candidate(user=users['candidate'], term=self.term).save()
+        profile = users['member'].studentorguserprofile
+        profile.initiation_term = self.term
+        profile.save()
+        Officer(user=users['officer'], position=self.committee,
+                term=self.term).save()
+
+        # Recording attendance for everyone at once updates the project report
+        # attendance lists and the leaderboard
+        all_users = [users['candidate'], users['member'], users['officer'],
+                     self.user]
+        added, removed = EventAttendance.objects.update_attendance(
+            event, add_users=all_users)
+        self.assertEqual(added, all_users)
+        self.assertEqual(removed, [])
+        self.assertEqual(EventAttendance.objects.filter(event=event).count(),
+                         4)
+        self.assertQuerysetEqual(
+            project_report.officer_list.all(), [repr(users['officer'])])
+        self.assertQuerysetEqual(
+            project_report.candidate_list.all(), [repr(users['candidate'])])
+        self.assertQuerysetEqual(
+            project_report.member_list.all(), [repr(users['member'])])
+        self.assertEqual(
+            LeaderboardEntry.objects.filter(term=self.term, count=1).count(),
+            4)
+
+        # Users who already attended are not added again, and removed users
+        # are taken off of the project report attendance lists
+        added, removed = EventAttendance.objects.update_attendance(
+            event, add_users=[users['member']],
+            remove_users=[users['officer'], self.user])
+        self.assertEqual(added, [])
+        self.assertEqual(removed, [users['officer'], self.user])
+        self.assertQuerysetEqual(
+            EventAttendance.objects.filter(event=event).order_by('user'),
+            [repr(users['candidate']), repr(users['member'])],
+            transform=lambda attendance: repr(attendance.user))
+        self.assertQuerysetEqual(project_report.officer_list.all(), [])
+        self.assertQuerysetEqual(
+            project_report.member_list.all(), [repr(users['member'])])
+        self.assertEqual(
+            LeaderboardEntry.objects.filter(term=self.term).count(), 2)
+
+    def test_update_attendance_queries(self):
+        start_time = timezone.now()
+        end_time = start_time + datetime.timedelta(hours=2)
+        event = self.create_event(start_time, end_time)
+        users = [get_user_model().objects.create_user(
+            username='user{}'.format(i), email='it@tbp.berkeley.edu',
+            password='user', first_name='Fake', last_name='User')
+            for i in range(6)]
+        EventAttendance.objects.update_attendance(event, add_users=users)
+
+        # The number of queries does not depend on the number of removed users
+        with CaptureQueriesContext(connection) as queries:
+            EventAttendance.objects.update_attendance(
+                event, remove_users=users[:1])
+        with self.assertNumQueries(len(queries)):
+            EventAttendance.objects.update_attendance(
+                event, remove_users=users[1:])
+        self.assertFalse(EventAttendance.objects.filter(event=event).exists())
+        self.assertFalse(
+            LeaderboardEntry.objects.filter(term=self.term).exists())
+
+    def test_attendance_update_view(self):
+        start_time = timezone.now()
+        end_time = start_time + datetime.timedelta(hours=2)
+        event = self.create_event(start_time, end_time)
+        other_user = get_user_model().objects.create_user(
+            username='other', email='it@tbp.berkeley.edu', password='other',
+            first_name='Other', last_name='User')
+        receiver = Mock()
+        attendance_updated.connect(
+            receiver, sender=EventAttendance, weak=False)
+        self.addCleanup(attendance_updated.disconnect, receiver,
+                        sender=EventAttendance)
+        update_url = reverse('events:attendance-update')
+        add_data = {'eventPK': event.pk,
+                    'addUserPKs': [self.user.pk, other_user.pk]}
+        remove_data = {'eventPK': event.pk, 'removeUserPKs': [other_user.pk]}
+
+        def post(data):
+            request = RequestFactory().post(update_url, data)
+            # Load the user again, so that new permissions are seen
+            request.user = get_user_model().objects.get(pk=self.user.pk)
+            return event_views.attendance_update(request)
+
+        # Recording attendance requires permission
+        self.assertRaises(PermissionDenied, post, add_data)
+        self.assertFalse(EventAttendance.objects.exists())
+
+        self.user.user_permissions.add(
+            Permission.objects.get(codename='add_eventattendance'))
+        response = post(add_data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content),
+                         {'added': [self.user.pk, other_user.pk],
+                          'removed': []})
+        self.assertEqual(
+            EventAttendance.objects.filter(event=event).count(), 2)
+        self.assertEqual(receiver.call_count, 1)
+        self.assertEqual(receiver.call_args[1]['added_users'],
+                         [self.user, other_user])
+
+        # Removing attendance requires the delete permission as well
+        self.assertRaises(PermissionDenied, post, remove_data)
+        self.assertEqual(
+            EventAttendance.objects.filter(event=event).count(), 2)
+
+        self.user.user_permissions.add(
+            Permission.objects.get(codename='delete_eventattendance'))
+        response = post(remove_data)
+        self.assertEqual(json.loads(response.content),
+                         {'added': [], 'removed': [other_user.pk]})
+        self.assertQuerysetEqual(
+            EventAttendance.objects.filter(event=event),
+            [repr(self.user)],
+            transform=lambda attendance: repr(attendance.user))
+        self.assertEqual(receiver.call_count, 2)
+        self.assertEqual(receiver.call_args[1]['removed_users'], [other_user])
+        self.assertEqual(
+            LeaderboardEntry.objects.filter(term=self.term).count(), 1)
+
+        # Nothing is sent if nothing changed
+        post(remove_data)
+        self.assertEqual(receiver.call_count, 2)
+
+    def test_leaderboard_entries(self):
+        start_time = timezone.now()
+        end_time = start_time + datetime.timedelta(hours=2)
+        event1 = self.create_event(start_time, end_time, name='Event 1')
+        event2 = self.create_event(start_time, end_time, name='Event 2')
+
+        candidate = get_user_model().objects.create_user(
+            username='fakecandidate',
+            email='it@tbp.berkeley.edu',
+            password='candidate',
+            first_name='Fake',
+            last_name='Candidate')
+        Candidate(user=candidate, term=self.term).save()
+        officer = get_user_model().objects.create_user(
+            username='fakeofficer',
+            email='it@tbp.berkeley.edu',
+            password='officer',
+            first_name='Fake',
+            last_name='Officer')
+
+        def get_entry(user):
+            return get_object_or_none(
+                LeaderboardEntry, term=self.term, user=user)
+
+        # Recording attendance creates entries with the right positions
+        EventAttendance.objects.create(user=candidate, event=event1)
+        EventAttendance.objects.create(user=officer, event=event1)
+        EventAttendance.objects.create(user=self.user, event=event1)
+        self.assertEqual(LeaderboardEntry.objects.count(), 3)
+        self.assertEqual(get_entry(candidate).position,
+                         LeaderboardEntry.CANDIDATE)
+        self.assertEqual(get_entry(officer).position, LeaderboardEntry.MEMBER)
+        self.assertEqual(get_entry(self.user).position,
+                         LeaderboardEntry.MEMBER)
+        for user in [candidate, officer, self.user]:
+            self.assertEqual(get_entry(user).count, 1)
+            self.assertEqual(get_entry(user).rank, 1)
+
+        # Becoming an officer updates the position
+        Officer(user=officer, position=self.committee, term=self.term).save()
+        self.assertEqual(get_entry(officer).position,
+                         LeaderboardEntry.OFFICER)
+
+        # Ranks are shared by users with the same count
+        EventAttendance.objects.create(user=candidate, event=event2)
+        self.assertEqual(get_entry(candidate).count, 2)
+        self.assertEqual(get_entry(candidate).rank, 1)
+        self.assertEqual(get_entry(officer).rank, 2)
+        self.assertEqual(get_entry(self.user).rank, 2)
+
+        # Removing attendance updates counts and removes empty entries
+        EventAttendance.objects.get(user=self.user, event=event1).delete()
+        self.assertIsNone(get_entry(self.user))
+        EventAttendance.objects.get(user=candidate, event=event2).delete()
+        self.assertEqual(get_entry(candidate).count, 1)
+        self.assertEqual(get_entry(candidate).rank, 1)
+        self.assertEqual(get_entry(officer).rank, 1)
+
+        # Cancelled events do not count towards the leaderboard
+        event1.cancelled = True
+        event1.save()
+        self.assertFalse(
+            LeaderboardEntry.objects.filter(term=self.term).exists())
+        event1.cancelled = False
+        event1.save()
+        self.assertEqual(get_entry(candidate).count, 1)
+        self.assertEqual(get_entry(officer).count, 1)
+
+    def test_leaderboard_update_ranks(self):
+        counts = [5, 3, 3, 3, 1, 0]
+        for i, count in enumerate(counts):
+            user = get_user_model().objects.create_user(
+                username='user{}'.format(i), email='it@tbp.berkeley.edu',
+                password='user', first_name='Fake', last_name='User')
+            LeaderboardEntry.objects.create(
+                term=self.term, user=user, count=count, rank=100)
+        other_term = Term(term=Term.FALL, year=2000)
+        other_term.save()
+        LeaderboardEntry.objects.create(
+            term=other_term, user=self.user, count=10, rank=100)
+
+        # All ranks of the term are updated with a single query, and entries
+        # of other terms are left alone
+        with self.assertNumQueries(1):
+            LeaderboardEntry.objects.update_ranks(self.term)
+        self.assertEqual(
+            list(LeaderboardEntry.objects.filter(term=self.term).values_list(
+                'count', 'rank')),
+            [(5, 1), (3, 2), (3, 2), (3, 2), (1, 5), (0, 6)])
+        self.assertEqual(
+            LeaderboardEntry.objects.get(term=other_term).rank, 100)
+
+    def test_ical(self):
+        start_time = timezone.now()
+        end_time = start_time + datetime.timedelta(hours=2)
+        self.create_event(start_time, end_time, name='Public Event',
+                          restriction=Event.PUBLIC)
+        self.create_event(start_time, end_time, name='Officer Event')
+
+        # The feed only includes events that the user can view
+        response = self.client.get(reverse('events:ical'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        # pylint: disable=E1103
+        content = ''.join(response.streaming_content)
+        cal = vobject.readOne(content, transform=False)
+        self.assertEqual([vevent.summary.value for vevent in cal.vevent_list],
+                         ['Public Event'])
+        self.assertEqual(cal.vtimezone.tzid.value, 'America/Los_Angeles')
+
+        # Clients with an up-to-date copy of the feed get a Not Modified
+        # response
+        factory = RequestFactory()
+        request = factory.get('/', HTTP_IF_NONE_MATCH=quote_etag('abc'))
+        self.assertTrue(ical_not_modified(request, 'abc', 100))
+        self.assertFalse(ical_not_modified(request, 'def', 100))
+        request = factory.get('/', HTTP_IF_MODIFIED_SINCE=http_date(100))
+        self.assertTrue(ical_not_modified(request, 'abc', 100))
+        self.assertFalse(ical_not_modified(request, 'abc', 101))
+        self.assertFalse(ical_not_modified(factory.get('/'), 'abc', 100))
+
+    def test_ical_cache_keys(self):
+        start_time = timezone.now()
+        end_time = start_time + datetime.timedelta(hours=2)
+        self.create_event(start_time, end_time, name='Public Event',
+                          restriction=Event.PUBLIC)
+        cache = Mock(wraps=get_cache(
+            'django.core.cache.backends.locmem.LocMemCache',
+            LOCATION=self.id()))
+        factory = RequestFactory()
+
+        def get_feed(**params):
+            response = event_views.ical(factory.get('/', params))
+            return ''.join(response.streaming_content
+                           if response.streaming else response.content)
+
+        with patch.object(event_views, 'cache', cache):
+            full_feed = get_feed()
+            self.assertIn('Public Event', full_feed)
+            self.assertEqual(get_feed(term=self.term.get_url_name()),
+                             full_feed)
+
+            # Terms that do not exist share one cache entry, whose key does
+            # not include the given parameter
+            for term in ['bogus', 'not a term', 'fa\x01']:
+                self.assertNotIn('Public Event', get_feed(term=term))
+        keys = set(args[0] for args, _ in cache.set.call_args_list)
+        self.assertEqual(len(keys), 3)
+        for key in keys:
+            self.assertRegexpMatches(key, r'^[\w:.]+$')
+
+    def test_individual_attendance(self):
+        now = timezone.now()
+        hour = datetime.timedelta(hours=1)
+        attended = self.create_event(
+            now - 3 * hour, now - 2 * hour, name='Attended',
+            restriction=Event.PUBLIC)
+        not_attended = self.create_event(
+            now - 3 * hour, now - 2 * hour, name='Not Attended',
+            restriction=Event.PUBLIC)
+        not_recorded = self.create_event(
+            now - 3 * hour, now - 2 * hour, name='Not Recorded',
+            restriction=Event.PUBLIC)
+        signed_up = self.create_event(
+            now + hour, now + 2 * hour, name='Signed Up',
+            restriction=Event.PUBLIC)
+        not_signed_up = self.create_event(
+            now + hour, now + 2 * hour, name='Not Signed Up',
+            restriction=Event.PUBLIC)
+        other_user = get_user_model().objects.create_user(
+            username='other', email='other@tbp.berkeley.edu',
+            password='password', first_name='Other', last_name='User')
+        EventAttendance(event=attended, user=self.user).save()
+        EventAttendance(event=not_attended, user=other_user).save()
+        EventSignUp(event=signed_up, user=self.user).save()
+        EventSignUp(event=not_signed_up, user=self.user, unsignup=True).save()
+
+        request = RequestFactory().get('/')
+        request.user = self.user
+        view = IndividualAttendanceListView.as_view()
+
+        def get_context():
+            return view(request, username=self.user.username).context_data
+
+        context = get_context()
+        self.assertEqual(context['attended'], [attended])
+        self.assertEqual(context['not_attended'], [not_attended])
+        self.assertEqual(context['past_not_recorded'], [not_recorded])
+        self.assertEqual(context['future_participating'], [signed_up])
+        self.assertEqual(context['future_not_participating'], [not_signed_up])
+
+        # The number of queries does not depend on the number of events
+        with CaptureQueriesContext(connection) as queries:
+            get_context()
+        for _ in range(3):
+            self.create_event(now + hour, now + 2 * hour,
+                              restriction=Event.PUBLIC)
+        with self.assertNumQueries(len(queries)):
+            context = get_context()
+        self.assertEqual(len(context['future_not_participating']), 4)
+
+    def test_list_cache(self):
+        start_time = timezone.now()
+        end_time = start_time + datetime.timedelta(hours=2)
+        event = self.create_event(start_time, end_time, name='Public Event',
+                                  restriction=Event.PUBLIC)
+        self.create_event(start_time, end_time, name='Officer Event')
+
+        request = RequestFactory().get('/')
+        request.user = self.user
+        view = EventListView.as_view()
+        # A separate cache for this test, since caches of the same location
+        # are shared by the whole process
+        cache = get_cache('django.core.cache.backends.locmem.LocMemCache',
+                          LOCATION=self.id())
+        with patch.object(event_models, 'cache', cache), \
+                patch.object(event_views, 'cache', cache):
+            events_table = view(request).context_data['events_table']
+            self.assertIn('Public Event', events_table)
+            self.assertNotIn('Officer Event', events_table)
+
+            # The rendered list is now cached, so changes that bypass the
+            # event signals are not shown
+            Event.objects.filter(pk=event.pk).update(name='Updated Event')
+            self.assertEqual(
+                view(request).context_data['events_table'], events_table)
+
+            # Changing any event invalidates the cached list
+            event.name = 'Renamed Event'
+            event.save()
+            events_table = view(request).context_data['events_table']
+            self.assertIn('Renamed Event', events_table)
+            self.assertNotIn('Public Event', events_table)
+
 
 class EventFormsTest(EventTesting):
     def setUp(self):
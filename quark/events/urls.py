@@ -5,6 +5,7 @@ from quark.emailer.views import EventEmailerView
 from quark.events.views import attendance_delete
 from quark.events.views import attendance_search
 from quark.events.views import attendance_submit
+from quark.events.views import attendance_update
 from quark.events.views import AttendanceRecordView
 from quark.events.views import EventCreateView
 from quark.events.views import EventDetailView
@@ -34,6 +35,7 @@ urlpatterns = patterns(
     url(r'^attendance/delete/$', attendance_delete, name='attendance-delete'),
     url(r'^attendance/search/$', attendance_search, name='attendance-search'),
     url(r'^attendance/submit/$', attendance_submit, name='attendance-submit'),
+    url(r'^attendance/update/$', attendance_update, name='attendance-update'),
     url(r'^user/(?P<username>[a-zA-Z0-9._-]+)/$',
         IndividualAttendanceListView.as_view(), name='individual-attendance'),
     url(r'^calendar/$', EventListView.as_view(show_all=True,
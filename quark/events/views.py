@@ -1,6 +1,7 @@
 from pytz import timezone as tz
 from datetime import datetime
 from datetime import timedelta
+import hashlib
 import vobject
 
 from django.conf import settings
@@ -9,17 +10,25 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.decorators import permission_required
 from django.contrib.auth.views import redirect_to_login
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse
 from django.db.models import Q
 from django.db.models import Count
 from django.db.models import Sum
 from django.http import HttpResponse
+from django.http import HttpResponseNotModified
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.template.loader import render_to_string
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.utils.html import format_html
+from django.utils.http import http_date
+from django.utils.http import parse_etags
+from django.utils.http import parse_http_date_safe
+from django.utils.http import quote_etag
+from django.utils.safestring import mark_safe
 from django.views.decorators.http import require_GET
 from django.views.decorators.http import require_POST
 from django.views.generic import CreateView
@@ -38,12 +47,17 @@ from quark.events.forms import EventSignUpForm
 from quark.events.models import Event
 from quark.events.models import EventAttendance
 from quark.events.models import EventSignUp
+from quark.events.models import LeaderboardEntry
+from quark.user_profiles.models import UserProfile
+from quark.user_profiles.models import UserProfileSearchToken
 from quark.utils.ajax import AjaxFormResponseMixin
 from quark.utils.ajax import json_response
 
 
 user_model = get_user_model()
 
+ICAL_FOOTER = 'END:VCALENDAR\r\n'
+
 
 class EventListView(TermParameterMixin, ListView):
     """List events in a particular term (display_term from TermParameterMixin).
@@ -75,6 +89,7 @@ class EventListView(TermParameterMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super(EventListView, self).get_context_data(**kwargs)
         context['show_all'] = self.show_all
+        context['events_table'] = self.get_events_table()
         if not self.request.user.is_authenticated():
             login_message = format_html(u'Please <a href="{}">log in</a>! Some '
                                         'events may not be visible.',
@@ -82,6 +97,38 @@ class EventListView(TermParameterMixin, ListView):
             messages.info(self.request, login_message)
         return context
 
+    def get_events_table(self):
+        """Return the rendered table of events.
+
+        The table only depends on the events themselves, the display term, the
+        show_all flag and the user's restriction level, so it is cached under
+        those (with the events represented by their version) and shared by all
+        users with the same restriction level.
+        """
+        cache_key = 'event_list:{}:{}:{}:{}'.format(
+            Event.objects.get_version(),
+            Event.get_user_restriction_level(self.request.user),
+            self.display_term.pk, int(self.show_all))
+        events_table = cache.get(cache_key)
+        if events_table is None:
+            events = list(self.object_list)
+            events_table = render_to_string(
+                'events/_list_table.html', {'events': events})
+
+            # Events are marked as past (or no longer listed) once they end,
+            # which does not change the event version, so the table must not
+            # be cached beyond the end of the next event to end
+            now = timezone.now()
+            end_times = [event.end_datetime for event in events
+                         if event.end_datetime > now]
+            if end_times:
+                seconds_to_end = (min(end_times) - now).total_seconds()
+                cache.set(cache_key, events_table,
+                          min(int(seconds_to_end) + 1, cache.default_timeout))
+            else:
+                cache.set(cache_key, events_table)
+        return mark_safe(events_table)
+
 
 class EventCreateView(CreateView):
     """View for adding new events."""
@@ -202,12 +249,11 @@ class EventDetailView(DetailView):
 
         context['user_signed_up'] = signup is not None and not signup.unsignup
 
-        context['num_signups'] = len(context['signup_list'])
+        context['num_signups'] = self.object.num_signups
         context['num_guests'] = self.object.get_num_guests()
-        total_rsvps = context['num_signups'] + context['num_guests']
+        total_rsvps = self.object.get_num_rsvps()
 
-        context['total_seats'] = context['signup_list'].aggregate(
-            Sum('driving'))['driving__sum'] or 0
+        context['total_seats'] = self.object.num_seats
 
         context['available_seats'] = context['total_seats'] - total_rsvps
 
@@ -399,6 +445,33 @@ def attendance_delete(request):
     return json_response()
 
 
+@require_POST
+@permission_required('events.add_eventattendance', raise_exception=True)
+def attendance_update(request):
+    """Record and remove attendance for many users at a given event at once.
+
+    The event is specified by an eventPK post parameter, the users whose
+    attendance should be recorded by any number of addUserPKs post parameters,
+    and the users whose attendance should be removed by any number of
+    removeUserPKs post parameters. The response includes the PKs of the users
+    whose attendance was actually added and removed.
+    """
+    event = get_object_or_404(Event, pk=request.POST['eventPK'])
+    add_user_pks = request.POST.getlist('addUserPKs')
+    remove_user_pks = request.POST.getlist('removeUserPKs')
+    if remove_user_pks and not request.user.has_perm(
+            'events.delete_eventattendance'):
+        raise PermissionDenied
+    added_users, removed_users = EventAttendance.objects.update_attendance(
+        event,
+        add_users=user_model.objects.filter(pk__in=add_user_pks),
+        remove_users=user_model.objects.filter(pk__in=remove_user_pks))
+    return json_response(data={
+        'added': [user.pk for user in added_users],
+        'removed': [user.pk for user in removed_users]
+    })
+
+
 def attendance_search(request, max_results=20):
     """Return a JSON response of members based on search for name.
 
@@ -410,35 +483,26 @@ def attendance_search(request, max_results=20):
     event_pk = request.GET['eventPK']
     event = Event.objects.get(pk=event_pk)
 
-    # Get all users who did not attend this event:
+    # Search all users who did not attend this event:
     # TODO(sjdemartini): Properly filter for members, instead of just getting
     # all users who are not officers or candidates (as these other users may
     # include company users, etc.)
-    members = user_model.objects.exclude(
-        eventattendance__event=event).select_related(
-        'userprofile')
+    user_profiles = UserProfile.objects.exclude(
+        user__eventattendance__event=event)
+    matches = UserProfileSearchToken.objects.search(
+        search_query, user_profiles=user_profiles, max_results=max_results)
 
     # A list of entries for each member that matches the search query:
     member_matches = []
-
-    # Parse the search query into separate pieces if the query includes
-    # whitespace
-    search_terms = search_query.lower().split()
-    for member in members:
-        name = member.userprofile.get_verbose_full_name()
-        name_lower = name.lower()
-        if all(search_term in name_lower for search_term in search_terms):
-            pic_html = render_to_string(
-                '_user_thumbnail.html',
-                {'user_profile': member.userprofile})
-            entry = {
-                'label': name,
-                'value': member.pk,
-                'picture': pic_html
-            }
-            member_matches.append(entry)
-        if len(member_matches) >= max_results:
-            break
+    for user_profile in matches:
+        pic_html = render_to_string(
+            '_user_thumbnail.html', {'user_profile': user_profile})
+        entry = {
+            'label': user_profile.get_verbose_full_name(),
+            'value': user_profile.user_id,
+            'picture': pic_html
+        }
+        member_matches.append(entry)
     return json_response(data=member_matches)
 
 
@@ -459,41 +523,53 @@ class IndividualAttendanceListView(TermParameterMixin, TemplateView):
         context['attendance_user'] = self.attendance_user
 
         # Get non-cancelled events from the given term, and select_related for
-        # event_type, since it is used in the template for each event:
+        # event_type, since it is used in the template for each event. The
+        # number of attendees tells whether attendance was recorded:
         events = Event.objects.get_user_viewable(self.request.user).filter(
             term=self.display_term, cancelled=False).order_by(
-            'end_datetime').select_related('event_type')
-
+            'end_datetime').select_related('event_type').annotate(
+            num_attendees=Count('eventattendance'))
+
+        # Get the events that the user attended or signed up for, and then
+        # partition the term's events in a single pass rather than querying
+        # for each category separately:
+        attended_pks = set(EventAttendance.objects.filter(
+            user=self.attendance_user, event__term=self.display_term
+        ).values_list('event_id', flat=True))
+        signed_up_pks = set(EventSignUp.objects.filter(
+            user=self.attendance_user, unsignup=False,
+            event__term=self.display_term).values_list('event_id', flat=True))
+        participating_pks = attended_pks | signed_up_pks
+
+        attended = []
+        not_attended = []
+        past_not_recorded = []
+        future_participating = []
+        future_not_participating = []
         current_time = timezone.now()
-        past_events = events.filter(end_datetime__lte=current_time)
-        future_events = events.filter(end_datetime__gt=current_time)
-
-        context['attended'] = past_events.filter(
-            eventattendance__user=self.attendance_user)
-
-        # Get future events that the user has either signed up for or already
-        # received attendance for:
-        signup_filter = Q(eventsignup__user=self.attendance_user,
-                          eventsignup__unsignup=False)
-        attendance_filter = Q(eventattendance__user=self.attendance_user)
-        participation_filter = signup_filter | attendance_filter
-        context['future_participating'] = future_events.filter(
-            participation_filter).distinct()
-
-        # Get past events that don't have attendance recorded:
-        context['past_not_recorded'] = past_events.filter(
-            eventattendance__isnull=True)
-
-        # Get past events (that had attendance recorded) that the user did not
-        # attend:
-        context['not_attended'] = past_events.exclude(
-            eventattendance__isnull=True).exclude(pk__in=context['attended'])
-
-        # Get future events for which the user has not signed up or received
-        # attendance:
-        context['future_not_participating'] = future_events.exclude(
-            pk__in=context['future_participating'])
-
+        for event in events:
+            if event.end_datetime > current_time:
+                # Future events that the user has either signed up for or
+                # already received attendance for, or neither:
+                if event.pk in participating_pks:
+                    future_participating.append(event)
+                else:
+                    future_not_participating.append(event)
+            elif event.pk in attended_pks:
+                attended.append(event)
+            elif event.num_attendees == 0:
+                # Past events that don't have attendance recorded:
+                past_not_recorded.append(event)
+            else:
+                # Past events (that had attendance recorded) that the user did
+                # not attend:
+                not_attended.append(event)
+
+        context['attended'] = attended
+        context['not_attended'] = not_attended
+        context['past_not_recorded'] = past_not_recorded
+        context['future_participating'] = future_participating
+        context['future_not_participating'] = future_not_participating
         return context
 
 
@@ -501,125 +577,77 @@ class LeaderboardListView(TermParameterMixin, ListView):
     """View for selecting all users who have attended an event in a
     particular term (display_term from TermParameterMixin).
 
-    The view omits all users with no attendance.
+    The view omits all users with no attendance. Attendance counts, position
+    categories and ranks are read from the term's LeaderboardEntry objects,
+    which are kept up to date as attendance is recorded.
     """
     context_object_name = 'leader_list'
     paginate_by = 75
     template_name = 'events/leaderboard.html'
-    candidate_aggregate = None
-    member_aggregate = None
-    officer_aggregate = None
-    top_officer = None
-    top_candidate = None
-    top_member = None
 
     @method_decorator(login_required)
     def dispatch(self, *args, **kwargs):
-        # Create dicts of aggregates for officers, candidates, and members
-        # (including advisors), with the total number of users of that category
-        # who have attended events this semester and the total number of events
-        # that group has attended.
-        self.candidate_aggregate = {'attendees': 0,
-                                    'attendance': 0,
-                                    'ratio': 0}
-        self.member_aggregate = {'attendees': 0,
-                                 'attendance': 0,
-                                 'ratio': 0}
-        self.officer_aggregate = {'attendees': 0,
-                                  'attendance': 0,
-                                  'ratio': 0}
-
         return super(LeaderboardListView, self).dispatch(*args, **kwargs)
 
     def get_queryset(self):
-        leaders = get_user_model().objects.filter(
-            eventattendance__event__term=self.display_term,
-            eventattendance__event__cancelled=False).select_related(
-            'userprofile').annotate(count=Count('eventattendance')).order_by(
-            '-count')
-
-        if len(leaders) > 0:
-            max_events = leaders[0].count or 0
-        else:
-            max_events = 0
-
-        # Create a list of "leader" entries, where each entry is a dictionary
-        # that includes the user, their rank on the leaderboard (1st, 2nd,
-        # etc.), and their leaderboard width "factor" (see below for details).
-        leader_list = []
-        if max_events > 0:  # make sure there's no divide by zero
-            prev_value = -1
-            prev_rank = 1
-
-            for i, leader in enumerate(leaders, start=prev_rank):
-                # factor used for CSS width property (percentage). Use 70 as
-                # the max width (i.e. the user who attended the most events has
-                # width 70%), including adding 2.5 to every factor to make sure
-                # that there is enough room for text to be displayed.
-                factor = 2.5 + leader.count * 67.5 / max_events
-
-                # Determine the position of the leader for use in CSS styling
-                # as well as updating the position aggregates and checking if
-                # this user is at the top of their position group
-                profile = leader.userprofile
-                if profile.is_officer(current=True, exclude_aux=True):
-                    position = 'officer'
-                    self.officer_aggregate['attendees'] += 1
-                    self.officer_aggregate['attendance'] += leader.count
-
-                    if self.officer_aggregate['attendees'] == 1:
-                        self.top_officer = leader
-
-                elif profile.is_candidate():
-                    position = 'candidate'
-                    self.candidate_aggregate['attendees'] += 1
-                    self.candidate_aggregate['attendance'] += leader.count
-
-                    if self.candidate_aggregate['attendees'] == 1:
-                        self.top_candidate = leader
-
-                else:
-                    position = 'member'
-                    self.member_aggregate['attendees'] += 1
-                    self.member_aggregate['attendance'] += leader.count
-
-                    if self.member_aggregate['attendees'] == 1:
-                        self.top_member = leader
-
-                if leader.count == prev_value:
-                    rank = prev_rank
-                else:
-                    rank = i
-                prev_rank = rank
-                prev_value = leader.count
-
-                # Add the leader entry to the list
-                leader_list.append({'user': leader,
-                                    'position': position,
-                                    'factor': factor,
-                                    'rank': rank})
-        return leader_list
+        return LeaderboardEntry.objects.filter(
+            term=self.display_term).select_related(
+            'user__userprofile').order_by('rank', 'user__last_name')
 
     def get_context_data(self, **kwargs):
         context = super(LeaderboardListView, self).get_context_data(**kwargs)
+        entries = LeaderboardEntry.objects.filter(term=self.display_term)
+
+        # The top-ranked entries have the most attendance in the term
+        max_events = entries.filter(rank=1).values_list(
+            'count', flat=True).first() or 0
 
-        # Obtain the number of events per user in each position category
-        self.candidate_aggregate['ratio'] = (
-            self.get_average_attendance(self.candidate_aggregate['attendees'],
-                                        self.candidate_aggregate['attendance']))
-        self.member_aggregate['ratio'] = (
-            self.get_average_attendance(self.member_aggregate['attendees'],
-                                        self.member_aggregate['attendance']))
-        self.officer_aggregate['ratio'] = (
-            self.get_average_attendance(self.officer_aggregate['attendees'],
-                                        self.officer_aggregate['attendance']))
-
-        context['candidate_aggregate'] = self.candidate_aggregate
-        context['member_aggregate'] = self.member_aggregate
-        context['officer_aggregate'] = self.officer_aggregate
-        context['top_candidate'] = self.top_candidate
-        context['top_member'] = self.top_member
-        context['top_officer'] = self.top_officer
+        # Create a list of "leader" entries for this page, where each entry is
+        # a dictionary that includes the user, their attendance count, their
+        # rank on the leaderboard (1st, 2nd, etc.), their position category
+        # and their leaderboard width "factor" (see below for details).
+        leader_list = []
+        for entry in context['leader_list']:
+            # factor used for CSS width property (percentage). Use 70 as the
+            # max width (i.e. the user who attended the most events has width
+            # 70%), including adding 2.5 to every factor to make sure that
+            # there is enough room for text to be displayed.
+            factor = 2.5 + entry.count * 67.5 / max_events
+            leader_list.append({'user': entry.user,
+                                'count': entry.count,
+                                'position': entry.position,
+                                'factor': factor,
+                                'rank': entry.rank})
+        context['leader_list'] = leader_list
+
+        # Create dicts of aggregates for officers, candidates, and members
+        # (including advisors), with the total number of users of that category
+        # who have attended events this semester and the total number of events
+        # that group has attended, along with the number of events per user in
+        # each position category.
+        aggregates = {}
+        for position, _ in LeaderboardEntry.POSITION_CHOICES:
+            aggregates[position] = {'attendees': 0,
+                                    'attendance': 0,
+                                    'ratio': 0}
+        position_totals = entries.values('position').annotate(
+            attendees=Count('pk'), attendance=Sum('count')).order_by()
+        for totals in position_totals:
+            aggregate = aggregates[totals['position']]
+            aggregate['attendees'] = totals['attendees']
+            aggregate['attendance'] = totals['attendance'] or 0
+            aggregate['ratio'] = self.get_average_attendance(
+                aggregate['attendees'], aggregate['attendance'])
+
+        context['candidate_aggregate'] = aggregates[LeaderboardEntry.CANDIDATE]
+        context['member_aggregate'] = aggregates[LeaderboardEntry.MEMBER]
+        context['officer_aggregate'] = aggregates[LeaderboardEntry.OFFICER]
+        context['top_candidate'] = self.get_top_entry(
+            entries, LeaderboardEntry.CANDIDATE)
+        context['top_member'] = self.get_top_entry(
+            entries, LeaderboardEntry.MEMBER)
+        context['top_officer'] = self.get_top_entry(
+            entries, LeaderboardEntry.OFFICER)
 
         return context
 
@@ -627,6 +655,13 @@ class LeaderboardListView(TermParameterMixin, ListView):
         """Returns the average attendance for a group on the leaderboard."""
         return attendance / float(attendees) if attendees > 0 else 0
 
+    def get_top_entry(self, entries, position):
+        """Return the highest-ranked leaderboard entry in the given position
+        category, or None if there are no entries in that category.
+        """
+        return entries.filter(position=position).select_related(
+            'user__userprofile').order_by('rank', 'user__last_name').first()
+
 
 def ical(request, event_pk=None):
     """Return an ICS file for the given event, or for all events if no event
@@ -639,6 +674,108 @@ def ical(request, event_pk=None):
     "user" and "key" URL parameters (which correspond to the user's PK and API
     key, respectively). If the "user" and "key" parameters are not valid or are
     not provided, only publicly visible events are included.
+
+    Since calendar clients poll this view frequently, the responses include
+    ETag and Last-Modified headers based on when any event was last changed,
+    and feeds of multiple events are cached for each restriction level and
+    term until an event is changed.
+    """
+    user = None
+    user_pk = request.GET.get('user', None)
+    key = request.GET.get('key', None)
+    if user_pk and key:
+        try:
+            api_key = APIKey.objects.get(user__pk=user_pk, key=key)
+            user = api_key.user
+        except APIKey.DoesNotExist:
+            pass
+
+    if event_pk is None:
+        # We want multiple events
+        filename = 'events.ics'
+        term = request.GET.get('term', '')
+        term_obj = None
+        # The term is part of the cache key only as a term pk or a fixed
+        # token, so that arbitrary term parameters cannot fill the cache
+        feed_term = 'all'
+        if term:
+            term_obj = Term.objects.get_by_url_name(term)
+            feed_term = term_obj.pk if term_obj else 'unknown'
+
+        # Only the event restriction levels visible to the user affect which
+        # events are in the feed, so users who can see the same events share
+        # the same cached feed
+        user_level = Event.get_user_restriction_level(user)
+        feed_levels = (Event.PUBLIC, Event.MEMBER, Event.OFFICER)
+        user_level = max(
+            level for level in feed_levels if level <= user_level)
+        feed_name = 'events:{}:{}'.format(user_level, feed_term)
+    else:
+        # We want a specific event
+        event = get_object_or_404(Event, pk=event_pk)
+        if not event.can_user_view(user):
+            raise PermissionDenied
+        filename = 'event.ics'
+        feed_name = 'event:{}'.format(event.pk)
+
+    version = Event.objects.get_version()
+    etag = hashlib.md5('{}:{}'.format(version, feed_name)).hexdigest()
+    if ical_not_modified(request, etag, version):
+        response = HttpResponseNotModified()
+    elif event_pk is not None:
+        response = HttpResponse(''.join(generate_ical([event])),
+                                content_type='text/calendar')
+    else:
+        cache_key = 'ical:{}:{}'.format(version, feed_name)
+        content = cache.get(cache_key)
+        if content is not None:
+            response = HttpResponse(content, content_type='text/calendar')
+        else:
+            events = Event.objects.get_viewable_at_level(user_level).filter(
+                cancelled=False)
+            if term:
+                # Filter by the given term
+                events = events.filter(term=term_obj)
+            response = StreamingHttpResponse(
+                cache_ical(cache_key, generate_ical(events.iterator())),
+                content_type='text/calendar')
+
+    response['Filename'] = filename  # IE needs this
+    response['Content-Disposition'] = 'attachment; filename={}'.format(filename)
+    response['ETag'] = quote_etag(etag)
+    response['Last-Modified'] = http_date(version)
+    return response
+
+
+def ical_not_modified(request, etag, last_modified):
+    """Return True if the client's copy of an ICS file with the given ETag and
+    last modified timestamp is up to date, based on the request's conditional
+    headers.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return etag in etags or '*' in etags
+    if_modified_since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'))
+    return (if_modified_since is not None and
+            int(last_modified) <= if_modified_since)
+
+
+def cache_ical(cache_key, chunks):
+    """Yield the given chunks of an ICS file, and then cache the whole file
+    under the given key once all of the chunks have been generated.
+    """
+    content = []
+    for chunk in chunks:
+        content.append(chunk)
+        yield chunk
+    cache.set(cache_key, ''.join(content))
+
+
+def build_ical_header():
+    """Return the beginning of an ICS calendar (everything up to the events),
+    including the calendar properties and the timezone definition.
     """
     cal = vobject.iCalendar()
 
@@ -666,49 +803,33 @@ def ical(request, event_pk=None):
         1970, 11, 1, 2, 0, 0, 0, tz('US/Pacific'))  # '19701101T020000'
     std.add('rrule').value = 'FREQ=YEARLY;BYMONTH=11;BYDAY=1SU'
 
-    user = None
-    user_pk = request.GET.get('user', None)
-    key = request.GET.get('key', None)
-    if user_pk and key:
-        try:
-            api_key = APIKey.objects.get(user__pk=user_pk, key=key)
-            user = api_key.user
-        except APIKey.DoesNotExist:
-            pass
+    # Leave off the end of the calendar so that events can follow
+    return cal.serialize()[:-len(ICAL_FOOTER)]
 
-    if event_pk is None:
-        # We want multiple events
-        filename = 'events.ics'
-        term = request.GET.get('term', '')
-        events = Event.objects.get_user_viewable(user).filter(cancelled=False)
-        if term:
-            # Filter by the given term
-            term_obj = Term.objects.get_by_url_name(term)
-            events = events.filter(term=term_obj)
-        for event in events:
-            add_event_to_ical(event, cal)
-    else:
-        # We want a specific event
-        event = get_object_or_404(Event, pk=event_pk)
-        if not event.can_user_view(user):
-            raise PermissionDenied
-        filename = 'event.ics'
-        add_event_to_ical(event, cal)
 
-    response = HttpResponse(cal.serialize(), content_type='text/calendar')
-    response['Filename'] = filename  # IE needs this
-    response['Content-Disposition'] = 'attachment; filename={}'.format(filename)
-    return response
+# The header is the same for every calendar, so it is only generated once
+ICAL_HEADER = build_ical_header()
+
+
+def generate_ical(events):
+    """Yield an ICS calendar of the given events one piece at a time, so that
+    large calendars do not need to be serialized all at once.
+    """
+    yield ICAL_HEADER
+    for event in events:
+        ical_event = vobject.newFromBehavior('vevent')
+        add_event_to_ical(event, ical_event)
+        yield ical_event.serialize()
+    yield ICAL_FOOTER
 
 
-def add_event_to_ical(event, cal):
-    """Helper method used by the ical view for adding an event to an ICS
-    calendar object.
+def add_event_to_ical(event, ical_event):
+    """Helper method used by the ical view for filling in an ICS event
+    component.
 
-    Takes in "event" and "cal", where "event" is the actual event object and
-    "cal" is the ical object.
+    Takes in "event" and "ical_event", where "event" is the actual event object
+    and "ical_event" is the vevent object.
     """
-    ical_event = cal.add('vevent')
     name = event.name
     if event.restriction == Event.MEMBER:
         name += " (Members Only)"
@@ -1,3 +1,5 @@
+import os
+
 from chosen import forms as chosen_forms
 from django import forms
 from django.db.models import Count
@@ -11,6 +13,7 @@ from quark.courses.models import Instructor
 from quark.exams.models import Exam
 from quark.exams.models import ExamFlag
 from quark.exams.models import InstructorPermission
+from quark.shortcuts import get_file_hash
 from quark.shortcuts import get_file_mimetype
 from quark.shortcuts import get_object_or_none
 
@@ -102,10 +105,14 @@ class UploadForm(ExamForm):
         self.fields.keyOrder += ['exam_file', 'agreed']
 
     def clean_exam_file(self):
-        """Check if uploaded exam file is of an acceptable format."""
+        """Check if uploaded exam file is of an acceptable format, and find
+        the hash of its contents.
+        """
         exam_file = self.cleaned_data.get('exam_file')
         if get_file_mimetype(exam_file) != 'application/pdf':
             raise forms.ValidationError('Uploaded file must be a PDF file.')
+        self.instance.file_hash = get_file_hash(exam_file)
+        self.instance.file_ext = os.path.splitext(exam_file.name)[1]
         return exam_file
 
     def clean(self):
@@ -122,12 +129,22 @@ class UploadForm(ExamForm):
         return cleaned_data
 
     def save(self, *args, **kwargs):
-        """Check if professors are blacklisted."""
+        """Check if professors are blacklisted, and use the existing file if
+        the same file was uploaded before.
+        """
         for instructor in self.exam_instructors:
             permission = get_object_or_none(
                 InstructorPermission, instructor=instructor)
             if permission and permission.permission_allowed is False:
                 self.instance.blacklisted = True
+
+        # Share the file of an existing exam with the same contents rather
+        # than storing the same file again
+        existing_files = Exam.objects.filter(
+            file_hash=self.instance.file_hash).exclude(
+            exam_file='').values_list('exam_file', flat=True)[:1]
+        if existing_files:
+            self.instance.exam_file = existing_files[0]
         return super(UploadForm, self).save(*args, **kwargs)
 
 
@@ -0,0 +1,67 @@
+from optparse import make_option
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from quark.exams.models import Exam
+from quark.shortcuts import get_file_hash
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '-l', '--link', action='store_true', dest='link', default=False,
+            help='Make exams with the same file contents share one file, and '
+                 'delete the other copies'),
+        )
+
+    def handle(self, *args, **kwargs):
+        """Find the hashes of the files of exams that were uploaded before
+        exam files were hashed, so that uploads of the same files are detected
+        as duplicates of them.
+        """
+        verbose = int(kwargs.get('verbosity')) > 0
+        num_hashed = 0
+        for exam in Exam.objects.filter(file_hash='').exclude(exam_file=''):
+            try:
+                file_hash = get_file_hash(exam.exam_file)
+            except IOError:
+                self.stderr.write('Missing file for exam {}: {}'.format(
+                    exam.pk, exam.exam_file.name))
+                continue
+            finally:
+                exam.exam_file.close()
+            Exam.objects.filter(pk=exam.pk).update(file_hash=file_hash)
+            num_hashed += 1
+        if verbose:
+            self.stdout.write('Hashed {} exam files'.format(num_hashed))
+
+        if kwargs.get('link'):
+            num_deleted = self.link_duplicates()
+            if verbose:
+                self.stdout.write(
+                    'Deleted {} duplicate exam files'.format(num_deleted))
+
+    def link_duplicates(self):
+        """Point all exams with the same file hash to the file of the first
+        of them, delete the files that are no longer used and return the
+        number of files deleted.
+        """
+        num_deleted = 0
+        file_hashes = Exam.objects.exclude(file_hash='').values(
+            'file_hash').annotate(count=Count('pk')).filter(
+            count__gt=1).values_list('file_hash', flat=True)
+        for file_hash in file_hashes:
+            file_names = []
+            for file_name in Exam.objects.filter(
+                    file_hash=file_hash).order_by('pk').values_list(
+                    'exam_file', flat=True):
+                if file_name not in file_names:
+                    file_names.append(file_name)
+            for file_name in file_names[1:]:
+                Exam.objects.filter(exam_file=file_name).update(
+                    exam_file=file_names[0])
+                default_storage.delete(file_name)
+                num_deleted += 1
+        return num_deleted
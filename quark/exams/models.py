@@ -3,10 +3,13 @@ import os
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.db import models
-from django.db.models.signals import pre_delete
+from django.db.models.signals import post_delete
 from django.db.models.signals import post_save
+from django.db.models.signals import pre_delete
+from django.db.models.signals import pre_save
 from uuidfield import UUIDField
 
+from quark.courses.models import CourseCatalogEntry
 from quark.courses.models import CourseInstance
 from quark.courses.models import Instructor
 from quark.shortcuts import disable_for_loaddata
@@ -31,11 +34,15 @@ def generate_exam_filepath(instance, filename):
     Used for the Exam model's exam file upload_to function.
 
     Files are stored in directories inside the exam files directory
-    corresponding to the first two characters of the unique id. File names
-    consist of the whole unique 32-character alphanumeric id, without hyphens.
+    corresponding to the first two characters of the file's SHA-256 hash (or
+    of the unique id, if the hash is not known). File names consist of the
+    whole 64-character hash, or the whole unique 32-character alphanumeric
+    id without hyphens, so files with the same contents share the same path.
     """
     instance.file_ext = os.path.splitext(filename)[1]
-    return instance.get_relative_pathname()
+    file_id = instance.file_hash or str(instance.unique_id)
+    return os.path.join(
+        Exam.EXAM_FILES_LOCATION, file_id[0:2], file_id + instance.file_ext)
 
 
 class Exam(models.Model):
@@ -80,6 +87,9 @@ class Exam(models.Model):
     flags = models.PositiveSmallIntegerField(default=0)
     blacklisted = models.BooleanField(default=False)
     exam_file = models.FileField(upload_to=generate_exam_filepath)
+    # The SHA-256 hash of the exam file, by which uploads that are exact
+    # duplicates of existing exams are detected and share the same file
+    file_hash = models.CharField(max_length=64, blank=True, db_index=True)
 
     objects = ExamManager()
 
@@ -120,25 +130,39 @@ class Exam(models.Model):
 
     def get_folder(self):
         """Return the path of the folder where the exam file is."""
-        return os.path.join(
-            settings.MEDIA_ROOT, Exam.EXAM_FILES_LOCATION,
-            str(self.unique_id)[0:2])
+        return os.path.dirname(self.get_absolute_pathname())
 
     def get_relative_pathname(self):
         """Return the relative path of the exam file from inside the media
-        root.
+        root, or an empty string if the exam has no file.
+
+        The path is the one the file was stored at, which need not be the one
+        generate_exam_filepath would give now (for instance, for files stored
+        before they were hashed, or renamed by the storage to avoid a clash).
         """
-        return os.path.join(Exam.EXAM_FILES_LOCATION,
-                            str(self.unique_id)[0:2],
-                            str(self.unique_id) + self.file_ext)
+        return self.exam_file.name or ''
 
     def get_absolute_pathname(self):
-        """Return the absolute path of the exam file."""
-        return os.path.join(settings.MEDIA_ROOT, self.get_relative_pathname())
+        """Return the absolute path of the exam file, or an empty string if
+        the exam has no file.
+        """
+        relative_pathname = self.get_relative_pathname()
+        if not relative_pathname:
+            return ''
+        return os.path.join(settings.MEDIA_ROOT, relative_pathname)
 
     def get_absolute_url(self):
         return reverse('exams:edit', args=(self.pk,))
 
+    def get_duplicates(self):
+        """Return a queryset of the other exams whose files have exactly the
+        same contents as this exam's file.
+        """
+        if not self.file_hash:
+            return Exam.objects.none()
+        return Exam.objects.filter(file_hash=self.file_hash).exclude(
+            pk=self.pk)
+
     def get_download_file_name(self):
         """Return the file name of the exam file when it is downloaded."""
         # Use 'unknown' if the course instance does not have a term
@@ -210,8 +234,14 @@ class InstructorPermission(models.Model):
 
 
 def delete_file(sender, instance, **kwargs):
-    """Delete an exam file after the exam has been deleted, if it exists."""
+    """Delete an exam file after the exam has been deleted, if it exists and
+    no other exam shares it.
+    """
     if bool(instance.exam_file):  # check if exam file exists
+        if Exam.objects.filter(exam_file=instance.exam_file.name).exclude(
+                pk=instance.pk).exists():
+            # Exams with the same file contents share the file
+            return
         try:
             instance.exam_file.delete()
         except OSError:
@@ -244,6 +274,47 @@ def update_exam_blacklist(sender, instance, **kwargs):
                 exam.save()
 
 
+def store_exam_course(sender, instance, **kwargs):
+    """Remember the course that an exam belongs to before it is saved or
+    deleted, so that the catalog entry of that course is updated afterwards
+    even if the exam moves to a different course.
+    """
+    instance.previous_course_pk = Exam.objects.filter(
+        pk=instance.pk).values_list(
+        'course_instance__course', flat=True).first()
+
+
+def update_exam_catalog_entries(sender, instance, **kwargs):
+    """Update the catalog entries of the courses that an exam belonged to
+    before and after it was saved or deleted, since whether it counts as an
+    approved exam of its course may have changed.
+    """
+    if kwargs.get('raw'):
+        # Skip loading fixtures (disable_for_loaddata needs save signals)
+        return
+    course_pks = set(CourseInstance.objects.filter(
+        pk=instance.course_instance_id).values_list('course', flat=True))
+    course_pks.add(getattr(instance, 'previous_course_pk', None))
+    course_pks.discard(None)
+    CourseCatalogEntry.objects.update_courses(course_pks)
+
+
+@disable_for_loaddata
+def update_instructor_catalog_entries(sender, instance, **kwargs):
+    """Update the catalog entries of the courses an instructor has taught
+    every time the instructor's permission is updated, since their exams may
+    have been blacklisted (with a queryset update that sends no signals).
+    """
+    CourseCatalogEntry.objects.update_courses(CourseInstance.objects.filter(
+        instructors=instance.instructor).values_list('course', flat=True))
+
+
 pre_delete.connect(delete_file, sender=Exam)
+pre_save.connect(store_exam_course, sender=Exam)
+pre_delete.connect(store_exam_course, sender=Exam)
+post_save.connect(update_exam_catalog_entries, sender=Exam)
+post_delete.connect(update_exam_catalog_entries, sender=Exam)
 post_save.connect(update_exam_flags, sender=ExamFlag)
 post_save.connect(update_exam_blacklist, sender=InstructorPermission)
+post_save.connect(update_instructor_catalog_entries,
+                  sender=InstructorPermission)
@@ -2,15 +2,22 @@ import os
 import shutil
 
 from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
 from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import Http404
+from django.test import RequestFactory
 from django.test import TestCase
 from django.test.utils import override_settings
 
 from quark.base.models import Term
 from quark.courses.models import CourseInstance
+from quark.exams.forms import UploadForm
 from quark.exams.models import Exam
 from quark.exams.models import ExamFlag
 from quark.exams.models import InstructorPermission
+from quark.exams.views import ExamDownloadView
 
 
 def make_test_exam(number):
@@ -94,6 +101,58 @@ class ExamTest(TestCase):
         self.test_exam1.delete()
         self.assertFalse(os.path.exists(file_name))
 
+    def test_pathname_of_stored_file(self):
+        # Exams whose files were stored before they were hashed keep the path
+        # of their file
+        file_name = self.test_exam1.get_absolute_pathname()
+        self.assertIn(str(self.test_exam1.unique_id), file_name)
+        Exam.objects.filter(pk=self.test_exam1.pk).update(file_hash='ab' * 32)
+        exam = Exam.objects.get(pk=self.test_exam1.pk)
+        self.assertEqual(exam.get_absolute_pathname(), file_name)
+        self.assertEqual(exam.get_folder(), os.path.dirname(file_name))
+
+        # Files renamed by the storage to avoid a clash are found as well
+        exam.exam_file.save('exam.pdf', ContentFile('First'))
+        other_exam = Exam.objects.get(pk=self.test_exam2.pk)
+        other_exam.file_hash = exam.file_hash
+        other_exam.exam_file.save('exam.pdf', ContentFile('Second'))
+        self.assertNotEqual(other_exam.get_absolute_pathname(),
+                            exam.get_absolute_pathname())
+        with open(other_exam.get_absolute_pathname()) as exam_file:
+            self.assertEqual(exam_file.read(), 'Second')
+
+    def test_upload_duplicate(self):
+        def upload(exam_number):
+            exam_file = SimpleUploadedFile(
+                'exam.pdf', '%PDF-1.4\nThe same test exam.\n%%EOF\n')
+            form = UploadForm(
+                {'department': 1, 'course_number': '100', 'instructors': [10],
+                 'term': 100, 'exam_number': exam_number,
+                 'exam_type': Exam.EXAM, 'agreed': True},
+                {'exam_file': exam_file})
+            self.assertTrue(form.is_valid(), form.errors)
+            return form.save()
+
+        exam1 = upload(Exam.MT2)
+        self.assertEqual(len(exam1.file_hash), 64)
+        self.assertTrue(exam1.exam_file.name.startswith(os.path.join(
+            Exam.EXAM_FILES_LOCATION, exam1.file_hash[:2], exam1.file_hash)))
+        self.assertFalse(exam1.get_duplicates().exists())
+
+        # An upload of the same file shares the existing file and is linked to
+        # the existing exam
+        exam2 = upload(Exam.MT3)
+        self.assertEqual(exam2.file_hash, exam1.file_hash)
+        self.assertEqual(exam2.exam_file.name, exam1.exam_file.name)
+        self.assertEqual(list(exam2.get_duplicates()), [exam1])
+
+        # The shared file is only deleted along with the last exam using it
+        file_name = exam1.get_absolute_pathname()
+        exam1.delete()
+        self.assertTrue(os.path.exists(file_name))
+        exam2.delete()
+        self.assertFalse(os.path.exists(file_name))
+
     def test_response(self):
         resp = self.client.get('/courses/Test/100/')
         # A successful HTTP GET request has status code 200
@@ -332,3 +391,69 @@ class ExamTest(TestCase):
         self.assertFalse(self.test_exam1.verified)
         resp = self.client.get('/courses/Test/100/')
         self.assertEqual(resp.context['exams'].count(), 2)
+
+    def download(self, exam, **headers):
+        request = RequestFactory().get('/', **headers)
+        request.user = AnonymousUser()
+        return ExamDownloadView.as_view()(request, exam_pk=exam.pk)
+
+    def test_download(self):
+        resp = self.download(self.test_exam1)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(''.join(resp.streaming_content),
+                         'This is a test file.')
+        self.assertEqual(resp['Content-Length'], '20')
+        self.assertEqual(resp['Accept-Ranges'], 'bytes')
+        self.assertEqual(
+            resp['Content-Disposition'], 'inline;filename="{}"'.format(
+                Exam.objects.get(
+                    pk=self.test_exam1.pk).get_download_file_name()))
+
+        # Conditional requests for an unchanged file are not modified
+        etag = resp['ETag']
+        last_modified = resp['Last-Modified']
+        resp = self.download(self.test_exam1, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        resp = self.download(self.test_exam1, HTTP_IF_NONE_MATCH='"other"',
+                             HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(resp.status_code, 200)
+        resp = self.download(self.test_exam1,
+                             HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(resp.status_code, 304)
+
+        # Byte ranges
+        resp = self.download(self.test_exam1, HTTP_RANGE='bytes=5-6')
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(''.join(resp.streaming_content), 'is')
+        self.assertEqual(resp['Content-Range'], 'bytes 5-6/20')
+        resp = self.download(self.test_exam1, HTTP_RANGE='bytes=-5')
+        self.assertEqual(''.join(resp.streaming_content), 'file.')
+        resp = self.download(self.test_exam1, HTTP_RANGE='bytes=20-')
+        self.assertEqual(resp.status_code, 416)
+        self.assertEqual(resp['Content-Range'], 'bytes */20')
+        resp = self.download(self.test_exam1, HTTP_RANGE='bytes=5-6',
+                             HTTP_IF_RANGE='"other"')
+        self.assertEqual(resp.status_code, 200)
+
+        # Unapproved exams can't be downloaded
+        self.test_exam1.verified = False
+        self.test_exam1.save()
+        self.assertRaises(Http404, self.download, self.test_exam1)
+
+    def test_download_front_end_backends(self):
+        with self.settings(FILE_DELIVERY_BACKEND=(
+                'quark.utils.file_delivery.XSendfileBackend')):
+            resp = self.download(self.test_exam1)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.content, '')
+            self.assertEqual(resp['X-Sendfile'],
+                             self.test_exam1.get_absolute_pathname())
+        with self.settings(FILE_DELIVERY_BACKEND=(
+                'quark.utils.file_delivery.XAccelRedirectBackend')):
+            resp = self.download(self.test_exam1)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.content, '')
+            self.assertEqual(
+                resp['X-Accel-Redirect'],
+                settings.FILE_DELIVERY_ACCEL_PREFIX +
+                self.test_exam1.get_relative_pathname())
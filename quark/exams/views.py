@@ -3,14 +3,11 @@ import mimetypes
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.decorators import permission_required
-from django.core.servers.basehttp import FileWrapper
 from django.core.urlresolvers import reverse
 from django.http import Http404
-from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.utils.decorators import method_decorator
-from django.utils.encoding import smart_bytes
 from django.views.generic import CreateView
 from django.views.generic import DeleteView
 from django.views.generic import DetailView
@@ -24,6 +21,7 @@ from quark.exams.forms import UploadForm
 from quark.exams.models import Exam
 from quark.exams.models import ExamFlag
 from quark.exams.models import InstructorPermission
+from quark.utils.file_delivery import send_file
 
 
 class ExamUploadView(CreateView):
@@ -66,14 +64,8 @@ class ExamDownloadView(DetailView):
                 and not self.request.user.has_perm('exams.view_all_exams')):
             raise Http404
 
-        mime_type, _ = mimetypes.guess_type(self.object.exam_file.name)
-        response = HttpResponse(
-            FileWrapper(self.object.exam_file),
-            content_type=mime_type)
-        response['Content-Disposition'] = 'inline;filename="{exam}"'.format(
-            exam=smart_bytes(
-                self.object.get_download_file_name(), encoding='ascii'))
-        return response
+        return send_file(request, self.object.exam_file.path,
+                         self.object.get_download_file_name())
 
 
 class ExamReviewListView(ListView):
@@ -107,6 +99,24 @@ class ExamReviewListView(ListView):
             'course_instance__term',
             'course_instance__course__department').prefetch_related(
             'course_instance__instructors')
+
+        # Find the exams with exactly the same files as the exams to review,
+        # all at once, so that duplicate uploads can be spotted easily
+        exams = context['exams']
+        file_hashes = set(exam.file_hash for exam in exams if exam.file_hash)
+        exams_by_hash = {}
+        for exam in Exam.objects.filter(
+                file_hash__in=file_hashes).select_related(
+                'course_instance__term',
+                'course_instance__course__department').prefetch_related(
+                'course_instance__instructors').order_by('pk'):
+            exams_by_hash.setdefault(exam.file_hash, []).append(exam)
+        context['duplicate_exams'] = []
+        for exam in exams:
+            duplicates = [duplicate for duplicate in exams_by_hash.get(
+                exam.file_hash, []) if duplicate.pk != exam.pk]
+            if duplicates:
+                context['duplicate_exams'].append((exam, duplicates))
         return context
 
 
@@ -1,9 +1,30 @@
 from django.conf import settings
 from django.contrib.contenttypes import generic
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.db import models
 
 
+class NotificationManager(models.Manager):
+    @staticmethod
+    def get_uncleared_cache_key(user_pk):
+        return 'uncleared_notifications_{}'.format(user_pk)
+
+    def get_uncleared(self, user):
+        """Return a list of the notifications for the given user that have
+        not been cleared.
+
+        The list is cached until one of the user's notifications is saved or
+        deleted.
+        """
+        cache_key = self.get_uncleared_cache_key(user.pk)
+        notifications = cache.get(cache_key)
+        if notifications is None:
+            notifications = list(self.filter(user=user, cleared=False))
+            cache.set(cache_key, notifications)
+        return notifications
+
+
 class Notification(models.Model):
     NEGATIVE = 'negative'
     NEUTRAL = 'neutral'
@@ -51,9 +72,24 @@ class Notification(models.Model):
         default=False, db_index=True,
         help_text='Whether the user has closed this notification.')
 
+    objects = NotificationManager()
+
     class Meta(object):
         unique_together = ('user', 'content_type', 'object_pk')
 
     def __unicode__(self):
         return 'Notification for {}: {} ({})'.format(
             self.user.get_username(), self.title, self.subtitle)
+
+
+def invalidate_uncleared_notifications(sender, instance, **kwargs):
+    """Make sure the cached list of the user's uncleared notifications is
+    reloaded after one of their notifications is changed.
+    """
+    cache.delete(Notification.objects.get_uncleared_cache_key(instance.user_id))
+
+
+models.signals.post_save.connect(
+    invalidate_uncleared_notifications, sender=Notification)
+models.signals.post_delete.connect(
+    invalidate_uncleared_notifications, sender=Notification)
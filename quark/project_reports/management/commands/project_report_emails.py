@@ -1,9 +1,15 @@
+import os
 import random
+import tempfile
+import time
+from optparse import make_option
 
 from django.core.mail import EmailMultiAlternatives
+from django.core.mail import get_connection
 from django.core.management import BaseCommand
 from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.datastructures import SortedDict
 
 from quark.base.models import Officer
 from quark.base.models import OfficerPosition
@@ -15,31 +21,88 @@ from quark.shortcuts import get_object_or_none
 
 
 class Command(BaseCommand):
-    def handle(self, *args, **options):
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '-n', '--dry-run', action='store_true', dest='dry_run',
+            default=False,
+            help='Write the reminder emails to files instead of sending them'),
+        make_option(
+            '-o', '--output-dir', dest='output_dir', default='',
+            help='The directory that a dry run writes the reminder emails to '
+                 '(a new temporary directory by default)'),
+        )
+
+    def handle(self, *args, **kwargs):
+        """Send every committee a single reminder email listing all of its
+        overdue project reports from the current academic year, all over one
+        connection to the mail server.
+        """
+        timings = SortedDict()
+        start_time = time.time()
+
         # exclude reports from just today or reports that can't possibly be in
         # the current academic year
-        last_year = Term.objects.get_current_term().year - 1
-        unfinished_reports = ProjectReport.objects.filter(
-            complete=False, term__year__gte=last_year,
-            date__lt=timezone.localtime(timezone.now()).date())
-
-        reports_by_committee = {}
+        current_term = Term.objects.get_current_term()
+        unfinished_reports = ProjectReport.objects.get_overdue().filter(
+            term__year__gte=current_term.year - 1).select_related(
+            'author__userprofile', 'committee').order_by(
+            'committee__rank', 'date')
 
+        reports_by_committee = SortedDict()
         for report in unfinished_reports:
-            committee = report.committee
-            if committee not in reports_by_committee:
-                reports_by_committee[committee] = []
-            reports_by_committee[committee].append(report)
+            if report.committee_id not in reports_by_committee:
+                reports_by_committee[report.committee_id] = (
+                    report.committee, [])
+            reports_by_committee[report.committee_id][1].append(report)
+        timings['query'] = time.time() - start_time
+
+        start_time = time.time()
+        sender = self.get_sender(current_term)
+        digests = [(committee, self.get_message(committee, reports, **sender))
+                   for committee, reports in reports_by_committee.itervalues()]
+        messages = [message for _, message in digests]
+        timings['render'] = time.time() - start_time
+
+        start_time = time.time()
+        if kwargs.get('dry_run'):
+            output_dir = kwargs.get('output_dir') or tempfile.mkdtemp(
+                prefix='project_report_emails_')
+            self.write_digests(digests, output_dir)
+            timings['write'] = time.time() - start_time
+            self.write_timings(
+                timings, len(messages), len(unfinished_reports), output_dir)
+        else:
+            get_connection().send_messages(messages)
+            timings['send'] = time.time() - start_time
 
+        if int(kwargs.get('verbosity')) > 0:
+            self.stdout.write(
+                '{action} {num_messages} reminder emails for {num_reports} '
+                'project reports in {total:.2f}s ({timings})'.format(
+                    action='Wrote' if kwargs.get('dry_run') else 'Sent',
+                    num_messages=len(messages),
+                    num_reports=len(unfinished_reports),
+                    total=sum(timings.values()),
+                    timings=', '.join(
+                        '{} {:.2f}s'.format(step, seconds)
+                        for step, seconds in timings.iteritems())))
+            if kwargs.get('dry_run'):
+                self.stdout.write('Reminder emails written to {}'.format(
+                    output_dir))
+
+    def get_sender(self, current_term):
+        """Return a dictionary of the from email addresses, the RSec mailing
+        list and the signature lines shared by all reminder emails.
+        """
         from_emails = []
         for from_email in ProjectReportFromEmail.objects.all():
             email_str = '"{}" <{}@{}>'.format(
                 from_email.name, from_email.email_prefix, HOSTNAME)
             from_emails.append(email_str)
 
-        rsec = get_object_or_none(Officer,
-                                  term=Term.objects.get_current_term(),
-                                  position__short_name='rsec')
+        rsec = get_object_or_none(Officer.objects.select_related(
+            'user__userprofile'), term=current_term,
+            position__short_name='rsec')
         rsec_mailing_list = OfficerPosition.objects.get(
             short_name='rsec').mailing_list
         if rsec:
@@ -48,27 +111,58 @@ class Command(BaseCommand):
         else:
             signature_lines = ['IT Committee']
 
-        for committee, reports in reports_by_committee.items():
-            context = {'committee': committee.long_name,
-                       'reports': reports,
-                       'signature_lines': signature_lines}
-            txt_message = render_to_string(
-                'project_reports/email_reminder.txt', context)
-            html_message = render_to_string(
-                'project_reports/email_reminder.html', context)
-
-            subject_format = '[TBP] {} Project Report Reminders as of {:%m/%d}'
-            complete_message = EmailMultiAlternatives(
-                subject=subject_format.format(
-                    committee.long_name, timezone.localtime(timezone.now())),
-                body=txt_message,
-                from_email=random.choice(from_emails),
-                to=list(set(['{}@{}'.format(report.author.username, HOSTNAME)
-                             for report in reports])),
-                cc=['{}@{}'.format(committee.mailing_list, HOSTNAME),
-                    '{}@{}'.format(rsec_mailing_list, HOSTNAME)],
-                headers={'Reply-to': '{}@{}'.format(
-                    rsec_mailing_list, HOSTNAME)})
-            complete_message.attach_alternative(html_message, 'text/html')
-            complete_message.content_subtype = 'html'
-            complete_message.send()
+        return {'from_emails': from_emails,
+                'rsec_mailing_list': rsec_mailing_list,
+                'signature_lines': signature_lines}
+
+    def get_message(self, committee, reports, from_emails, rsec_mailing_list,
+                    signature_lines):
+        """Return the reminder email for the given committee and its overdue
+        project reports, with the templates rendered once for all of them.
+        """
+        context = {'committee': committee.long_name,
+                   'reports': reports,
+                   'signature_lines': signature_lines}
+        txt_message = render_to_string(
+            'project_reports/email_reminder.txt', context)
+        html_message = render_to_string(
+            'project_reports/email_reminder.html', context)
+
+        subject_format = '[TBP] {} Project Report Reminders as of {:%m/%d}'
+        complete_message = EmailMultiAlternatives(
+            subject=subject_format.format(
+                committee.long_name, timezone.localtime(timezone.now())),
+            body=txt_message,
+            from_email=random.choice(from_emails),
+            to=list(set(['{}@{}'.format(report.author.username, HOSTNAME)
+                         for report in reports])),
+            cc=['{}@{}'.format(committee.mailing_list, HOSTNAME),
+                '{}@{}'.format(rsec_mailing_list, HOSTNAME)],
+            headers={'Reply-to': '{}@{}'.format(
+                rsec_mailing_list, HOSTNAME)})
+        complete_message.attach_alternative(html_message, 'text/html')
+        complete_message.content_subtype = 'html'
+        return complete_message
+
+    def write_digests(self, digests, output_dir):
+        """Write the reminder email of each (committee, message) pair to
+        <committee short name>.eml in the given directory.
+        """
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+        for committee, message in digests:
+            path = os.path.join(
+                output_dir, '{}.eml'.format(committee.short_name))
+            with open(path, 'w') as message_file:
+                message_file.write(message.message().as_string())
+
+    def write_timings(self, timings, num_messages, num_reports, output_dir):
+        """Write the time taken by each step of a dry run to timing.txt in the
+        given directory.
+        """
+        with open(os.path.join(output_dir, 'timing.txt'), 'w') as timing_file:
+            timing_file.write(
+                '{} reminder emails for {} project reports\n'.format(
+                    num_messages, num_reports))
+            for step, seconds in timings.iteritems():
+                timing_file.write('{}: {:.3f}s\n'.format(step, seconds))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from quark.project_reports.models import ProjectReport
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **kwargs):
+        """Create or update the notifications for overdue project reports, so
+        that their authors are reminded and how long each project report has
+        been overdue stays up to date.
+        """
+        num_reports = ProjectReport.objects.sync_notifications()
+        if int(kwargs.get('verbosity')) > 0:
+            self.stdout.write(
+                'Updated notifications for {} overdue project reports'.format(
+                    num_reports))
@@ -4,14 +4,33 @@ from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.urlresolvers import reverse
 from django.db import models
+from django.utils import timesince
 from django.utils import timezone
 
 from quark.base.models import OfficerPosition
 from quark.base.models import Term
 from quark.notifications.models import Notification
+from quark.shortcuts import disable_for_loaddata
 from quark.shortcuts import get_object_or_none
 
 
+class ProjectReportManager(models.Manager):
+    def get_overdue(self):
+        """Return the incomplete project reports whose dates have passed."""
+        return self.filter(
+            complete=False,
+            date__lt=timezone.localtime(timezone.now()).date())
+
+    def sync_notifications(self):
+        """Create or update the notifications for all overdue project reports
+        from all terms. Returns the number of overdue project reports.
+        """
+        overdue_reports = self.get_overdue().select_related('author')
+        for project_report in overdue_reports:
+            project_report.update_notification()
+        return len(overdue_reports)
+
+
 class ProjectReport(models.Model):
     PROJECT_AREA_CHOICES = (
         ('cl', 'Community/Liberal Culture'),
@@ -65,6 +84,8 @@ class ProjectReport(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
+    objects = ProjectReportManager()
+
     def __unicode__(self):
         return '%s (%s)' % (self.title, self.date)
 
@@ -78,6 +99,52 @@ class ProjectReport(models.Model):
     def get_absolute_url(self):
         return reverse('project-reports:detail', args=(self.pk,))
 
+    def is_overdue(self):
+        return not self.complete and (
+            self.date < timezone.localtime(timezone.now()).date())
+
+    def update_notification(self):
+        """Create or update the author's notification for this project report
+        if it is overdue, or clear the notification if it exists otherwise.
+        """
+        content_type = ContentType.objects.get_for_model(ProjectReport)
+        if not self.is_overdue():
+            notification = get_object_or_none(
+                Notification,
+                user=self.author,
+                content_type=content_type,
+                object_pk=self.pk)
+            if notification and not notification.cleared:
+                notification.cleared = True
+                notification.save()
+            return
+
+        notification, _ = Notification.objects.get_or_create(
+            user=self.author,
+            content_type=content_type,
+            object_pk=self.pk,
+            defaults={'status': Notification.NEGATIVE,
+                      'title': 'Missing Project Report'})
+        # Description must be unicode because timesince generates a unicode
+        # string. Only whole days are counted, so that the description only
+        # changes once a day.
+        today = timezone.localtime(timezone.now()).date()
+        fields = {
+            'subtitle': self.title,
+            'description': u'{} overdue'.format(
+                timesince.timesince(self.date, today)),
+            'url': reverse('project-reports:edit', args=(self.pk,)),
+            'cleared': False,
+        }
+        # Only save the notification if it changed, so that its cached
+        # uncleared notifications aren't needlessly reloaded
+        changed_fields = [field for field, value in fields.iteritems()
+                          if getattr(notification, field) != value]
+        if changed_fields:
+            for field in changed_fields:
+                setattr(notification, field, fields[field])
+            notification.save(update_fields=changed_fields)
+
     def word_count(self):
         text = [self.description, self.purpose, self.organization, self.cost,
                 self.problems, self.results]
@@ -97,19 +164,12 @@ class ProjectReportFromEmail(models.Model):
     email_prefix = models.CharField(max_length=100, unique=True)
 
 
+@disable_for_loaddata
 def project_report_notification(sender, instance, created, **kwargs):
-    """Clear the notification if it exists for the project report when it is
-    completed.
+    """Update the notification for the project report, which is cleared when
+    the project report is completed.
     """
-    if instance.complete:
-        notification = get_object_or_none(
-            Notification,
-            user=instance.author,
-            content_type=ContentType.objects.get_for_model(ProjectReport),
-            object_pk=instance.pk)
-        if notification:
-            notification.cleared = True
-            notification.save()
+    instance.update_notification()
 
 
 def project_report_notification_delete(sender, instance, **kwargs):
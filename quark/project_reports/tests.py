@@ -1,13 +1,20 @@
 import datetime
+import os
+import shutil
+import tempfile
 
 from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
 import mox
 
 from quark.base.models import OfficerPosition
 from quark.base.models import Term
+from quark.notifications.models import Notification
 from quark.project_reports.models import ProjectReport
+from quark.project_reports.models import ProjectReportFromEmail
 
 
 class ProjectReportTest(TestCase):
@@ -90,3 +97,67 @@ class ProjectReportTest(TestCase):
         self.project_report.results = 'ten'
 
         self.assertEquals(self.project_report.word_count(), 10)
+
+    def test_overdue_notification(self):
+        # The project report isn't overdue until after its date
+        self.assertFalse(self.project_report.is_overdue())
+        self.assertEquals(ProjectReport.objects.sync_notifications(), 0)
+        self.assertEquals(Notification.objects.get_uncleared(self.user), [])
+
+        self.project_report.date = timezone.localtime(
+            timezone.now()).date() - datetime.timedelta(days=3)
+        self.project_report.save()
+        self.assertTrue(self.project_report.is_overdue())
+        notification = Notification.objects.get(user=self.user)
+        self.assertEquals(notification.subtitle, 'Test')
+        self.assertEquals(notification.description, u'3\xa0days overdue')
+        self.assertEquals(Notification.objects.get_uncleared(self.user),
+                          [notification])
+
+        # Syncing doesn't change the notification if nothing has changed
+        with self.assertNumQueries(2):
+            self.assertEquals(ProjectReport.objects.sync_notifications(), 1)
+
+        # Cleared notifications come back when syncing while the project
+        # report is still overdue
+        notification.cleared = True
+        notification.save()
+        self.assertEquals(Notification.objects.get_uncleared(self.user), [])
+        ProjectReport.objects.sync_notifications()
+        self.assertEquals(Notification.objects.get_uncleared(self.user),
+                          [notification])
+
+        # Completing the project report clears the notification
+        self.project_report.complete = True
+        self.project_report.save()
+        self.assertFalse(self.project_report.is_overdue())
+        self.assertTrue(Notification.objects.get(pk=notification.pk).cleared)
+        self.assertEquals(Notification.objects.get_uncleared(self.user), [])
+
+    def test_reminder_emails(self):
+        ProjectReportFromEmail.objects.create(
+            name='Recording Secretary', email_prefix='rsec')
+        self.project_report.date = timezone.localtime(
+            timezone.now()).date() - datetime.timedelta(days=3)
+        self.project_report.save()
+        ProjectReport.objects.create(
+            term=self.term, author=self.user, committee=self.committee,
+            title='Another Test', date=self.project_report.date)
+
+        # A dry run writes the reminder emails to files instead of sending them
+        output_dir = tempfile.mkdtemp()
+        try:
+            call_command('project_report_emails', dry_run=True,
+                         output_dir=output_dir, verbosity=0)
+            self.assertEqual(len(mail.outbox), 0)
+            self.assertItemsEqual(os.listdir(output_dir),
+                                  ['it.eml', 'timing.txt'])
+        finally:
+            shutil.rmtree(output_dir)
+
+        # A single email lists all of the committee's overdue reports
+        call_command('project_report_emails', verbosity=0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['user@tbp.berkeley.edu'])
+        self.assertIn('Test', mail.outbox[0].body)
+        self.assertIn('Another Test', mail.outbox[0].body)
@@ -60,7 +60,7 @@ class LDAPBackend(ModelBackend):
         filter_pattern = '(&(objectClass=inetOrgPerson)(uid=%s))' % username
         keys = ['uid', 'givenName', 'sn', 'mail']
 
-        ldap_handle = utils.initialize()
+        ldap_handle = utils.get_connection()
         if ldap_handle is None:
             return None
         result = ldap_handle.search_s(
@@ -0,0 +1,69 @@
+from optparse import make_option
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from quark.qldap import utils as ldap_utils
+
+
+class Command(BaseCommand):
+    args = '[ldap_group ...]'
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '-n', '--dry-run', action='store_true', dest='dry_run',
+            default=False,
+            help='Report the changes that would be made without making them'),
+        )
+
+    def handle(self, *args, **kwargs):
+        """Make the members of each LDAP group in the LDAP_GROUP_SYNC setting
+        (or only of the given LDAP groups) the users in the corresponding auth
+        groups, with a single modification per LDAP group.
+        """
+        ldap_groups = args or sorted(settings.LDAP_GROUP_SYNC.keys())
+        for ldap_group in ldap_groups:
+            if ldap_group not in settings.LDAP_GROUP_SYNC:
+                raise CommandError(
+                    '{} is not in LDAP_GROUP_SYNC'.format(ldap_group))
+
+        # Read the memberships of all auth groups involved in one query
+        user_model = get_user_model()
+        group_names = set()
+        for ldap_group in ldap_groups:
+            group_names.update(settings.LDAP_GROUP_SYNC[ldap_group])
+        group_usernames = {}
+        memberships = user_model.groups.through.objects.filter(
+            group__name__in=group_names).values_list(
+            'group__name', 'user__{}'.format(user_model.USERNAME_FIELD))
+        for group_name, username in memberships:
+            group_usernames.setdefault(group_name, set()).add(username)
+
+        verbosity = int(kwargs.get('verbosity'))
+        dry_run = kwargs.get('dry_run', False)
+        failed = []
+        for ldap_group in ldap_groups:
+            usernames = set()
+            for group_name in settings.LDAP_GROUP_SYNC[ldap_group]:
+                usernames.update(group_usernames.get(group_name, set()))
+            result = ldap_utils.sync_group_members(
+                ldap_group, usernames, dry_run=dry_run)
+            if result is None:
+                failed.append(ldap_group)
+                continue
+            # pylint: disable=W0633
+            added, removed = result
+            if verbosity > 0:
+                self.stdout.write(
+                    '{prefix}{group}: {added} added, {removed} removed'.format(
+                        prefix='(dry run) ' if dry_run else '',
+                        group=ldap_group, added=len(added),
+                        removed=len(removed)))
+                for username in added:
+                    self.stdout.write('  + {}'.format(username))
+                for username in removed:
+                    self.stdout.write('  - {}'.format(username))
+        if failed:
+            raise CommandError(
+                'Failed to sync LDAP groups: {}'.format(', '.join(failed)))
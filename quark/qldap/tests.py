@@ -2,10 +2,14 @@ import os
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import get_cache
 from django.test import TestCase
 from django.test.client import Client
 from django.test.utils import override_settings
+from ldap import LDAPError
 from ldap import MOD_ADD
+from mock import Mock
+from mock import patch
 
 from quark.qldap import utils
 
@@ -49,6 +53,18 @@ class LDAPTestCase(TestCase):
         self.assertIsNone(utils.initialize(base_dn=bad_dn, base_pw=bad_pw))
         self.assertIsNotNone(utils.initialize())
 
+    def test_pooled_connection(self):
+        # The same connection is reused by a thread
+        connection = utils.get_connection()
+        self.assertIsNotNone(connection)
+        self.assertIs(utils.get_connection(), connection)
+        self.assertTrue(utils.username_exists(self.user))
+
+        # A closed connection is reconnected when used
+        connection.handle.unbind_s()
+        self.assertTrue(utils.username_exists(self.user))
+        self.assertIs(utils.get_connection(), connection)
+
     def test_create_new_user(self):
         """Can properly create new user"""
         self.assertFalse(utils.username_exists(self.new_user))
@@ -170,6 +186,32 @@ class LDAPTestCase(TestCase):
         # Group size should be 0 again:
         self.assertTrue(len(utils.get_group_members(self.posix_group)) == 0)
 
+    def test_sync_group_members(self):
+        """Test adding and removing members of both kinds of groups with a
+        single modification each"""
+        for group in [self.group_of_names, self.posix_group]:
+            # A dry run does not modify the group:
+            self.assertEqual(
+                utils.sync_group_members(group, [self.user], dry_run=True),
+                ([self.user], []))
+            self.assertFalse(utils.is_group_member(self.user, group))
+
+            self.assertEqual(utils.sync_group_members(group, [self.user]),
+                             ([self.user], []))
+            self.assertTrue(utils.is_group_member(self.user, group))
+
+            # Nothing changes if the group is already in sync:
+            self.assertEqual(utils.sync_group_members(group, [self.user]),
+                             ([], []))
+
+            self.assertEqual(utils.sync_group_members(group, []),
+                             ([], [self.user]))
+            self.assertFalse(utils.is_group_member(self.user, group))
+
+        # The default user stays in the groupOfNames:
+        self.assertEqual(utils.get_group_members(self.group_of_names),
+                         [settings.LDAP_DEFAULT_USER])
+
     def test_valid_username_regex(self):
         """Test USERNAME_REGEX against valid, too-short, too-long, and
         number-prefixed usernames"""
@@ -198,3 +240,82 @@ class LDAPTestCase(TestCase):
         self.assertTrue(new_user.is_superuser)
         self.assertFalse(client.login(username=self.user, password=''))
         self.assertFalse(client.login(username='superfakeuser', password=''))
+
+
+@override_settings(LDAP_CACHE_TIMEOUTS={'membership': 60})
+class LDAPCacheTest(TestCase):
+    def setUp(self):
+        # A separate cache for each test, since caches of the same location
+        # are shared by the whole process
+        self.cache = get_cache(
+            'django.core.cache.backends.locmem.LocMemCache',
+            LOCATION=self.id())
+        self.cache_patcher = patch.object(utils, 'cache', self.cache)
+        self.cache_patcher.start()
+        self.lookups = []
+
+    def tearDown(self):
+        self.cache_patcher.stop()
+        self.cache.clear()
+
+    def lookup(self, username):
+        self.lookups.append(username)
+        return username == 'member'
+
+    def test_cached_lookup(self):
+        lookup = utils.cached_lookup('membership')(self.lookup)
+        stats = utils.get_cache_stats().get(
+            'membership', {'hits': 0, 'misses': 0})
+
+        self.assertTrue(lookup('member'))
+        self.assertFalse(lookup('nonmember'))
+        self.assertTrue(lookup('member'))
+        self.assertFalse(lookup('nonmember'))
+        self.assertEqual(self.lookups, ['member', 'nonmember'])
+        new_stats = utils.get_cache_stats()['membership']
+        self.assertEqual(new_stats['hits'], stats['hits'] + 2)
+        self.assertEqual(new_stats['misses'], stats['misses'] + 2)
+
+        # Invalidating the cache makes the lookups go to LDAP again
+        utils.invalidate_cache('membership')
+        self.assertTrue(lookup('member'))
+        self.assertEqual(self.lookups, ['member', 'nonmember', 'member'])
+
+    def test_uncached_lookup(self):
+        # Lookups of kinds without a timeout are not cached
+        lookup = utils.cached_lookup('email')(self.lookup)
+        lookup('member')
+        lookup('member')
+        self.assertEqual(self.lookups, ['member', 'member'])
+
+        # False is not cached if it indicates an error
+        lookup = utils.cached_lookup('membership', cache_false=False)(
+            self.lookup)
+        lookup('nonmember')
+        lookup('nonmember')
+        self.assertEqual(self.lookups, ['member', 'member', 'nonmember',
+                                        'nonmember'])
+
+    def test_failed_lookup_not_cached(self):
+        # Membership lookups that fail because LDAP is unavailable are not
+        # cached as non-membership
+        with patch.object(utils, 'get_connection',
+                          return_value=None) as get_connection:
+            self.assertIsNone(utils.is_group_member('member', 'tbp-members'))
+            self.assertIsNone(utils.is_group_member('member', 'tbp-members'))
+        self.assertEqual(get_connection.call_count, 2)
+
+        ldap_handle = Mock()
+        ldap_handle.search_s.side_effect = LDAPError
+        with patch.object(utils, 'get_connection', return_value=ldap_handle):
+            self.assertIsNone(utils.is_group_member('member', 'tbp-members'))
+            self.assertIsNone(utils.is_group_member('member', 'tbp-members'))
+        self.assertEqual(ldap_handle.search_s.call_count, 2)
+
+        # Successful lookups are cached
+        ldap_handle = Mock()
+        ldap_handle.search_s.return_value = []
+        with patch.object(utils, 'get_connection', return_value=ldap_handle):
+            self.assertFalse(utils.is_group_member('member', 'tbp-members'))
+            self.assertFalse(utils.is_group_member('member', 'tbp-members'))
+        self.assertEqual(ldap_handle.search_s.call_count, 1)
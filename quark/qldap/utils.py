@@ -1,5 +1,6 @@
 import base64
 import copy
+import functools
 import grp
 import hashlib
 import hmac
@@ -8,10 +9,14 @@ import os
 import random
 import re
 import string
+import threading
+import time
+import uuid
 
 from django.conf import settings
 from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
 from django.contrib.auth.hashers import UNUSABLE_PASSWORD_SUFFIX_LENGTH
+from django.core.cache import cache
 from django.core.mail import mail_admins
 from django.utils.crypto import get_random_string
 from django.utils.encoding import smart_bytes
@@ -24,6 +29,9 @@ USERNAME_REGEX = re.compile(settings.VALID_USERNAME or '')
 LDAP_HASH_PREFIX = '{SSHA}'
 # OpenLDAP salt must be 4 bytes
 LDAP_SALT_LENGTH = 4
+# Pooled connections idle for longer than this many seconds are checked before
+# being used, in case the server has closed them
+LDAP_IDLE_CHECK_SECONDS = 60
 
 
 # smart_bytes is used to convert unicode to byte strings for python-ldap.
@@ -48,12 +56,188 @@ def initialize(base_dn=settings.LDAP_BASE['DN'],
         return None
 
 
+class PooledConnection(object):
+    """
+    An LDAP connection bound as the admin DN, which is kept open for reuse.
+    Supports the LDAP operations used by these helpers. If the server went
+    away (for instance after restarting), the operation reconnects and is
+    retried once.
+    """
+    def __init__(self):
+        self.handle = None
+        self.last_used = 0
+
+    def connect(self):
+        self.handle = initialize()
+        self.last_used = time.time()
+        return self.handle is not None
+
+    def close(self):
+        if self.handle is not None:
+            try:
+                self.handle.unbind_s()
+            except ldap.LDAPError:
+                pass
+            self.handle = None
+
+    def is_alive(self):
+        """
+        Returns whether the connection can still be used, checking with a
+        cheap "Who am I?" request if it has been idle for a while.
+        """
+        if time.time() - self.last_used < LDAP_IDLE_CHECK_SECONDS:
+            return True
+        try:
+            self.handle.whoami_s()
+        except ldap.LDAPError:
+            return False
+        self.last_used = time.time()
+        return True
+
+    def call(self, method, *args, **kwargs):
+        try:
+            result = getattr(self.handle, method)(*args, **kwargs)
+        except ldap.SERVER_DOWN as error:
+            self.close()
+            if not self.connect():
+                raise error
+            try:
+                result = getattr(self.handle, method)(*args, **kwargs)
+            except ldap.SERVER_DOWN:
+                self.close()
+                raise
+        self.last_used = time.time()
+        return result
+
+    def add_s(self, *args, **kwargs):
+        return self.call('add_s', *args, **kwargs)
+
+    def delete_s(self, *args, **kwargs):
+        return self.call('delete_s', *args, **kwargs)
+
+    def modify_s(self, *args, **kwargs):
+        return self.call('modify_s', *args, **kwargs)
+
+    def rename_s(self, *args, **kwargs):
+        return self.call('rename_s', *args, **kwargs)
+
+    def search_s(self, *args, **kwargs):
+        return self.call('search_s', *args, **kwargs)
+
+
+class ConnectionPool(object):
+    """
+    A thread-safe pool of admin LDAP connections, which keeps one open
+    connection for each thread that uses LDAP (so with uWSGI, one for each of
+    its threads), instead of connecting and binding for every operation.
+    """
+    def __init__(self):
+        self.local = threading.local()
+
+    def get_connection(self):
+        """
+        Returns this thread's PooledConnection, connecting if necessary.
+        If it failed to connect, returns None
+        """
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = PooledConnection()
+            self.local.connection = connection
+        if connection.handle is not None and not connection.is_alive():
+            connection.close()
+        if connection.handle is None and not connection.connect():
+            return None
+        return connection
+
+
+CONNECTION_POOL = ConnectionPool()
+
+
+def get_connection():
+    """
+    Returns a pooled LDAP connection bound as the admin DN, or None if it
+    failed to connect. Unlike handles from initialize, it must not be unbound.
+    """
+    return CONNECTION_POOL.get_connection()
+
+
+# Counts of cache hits and misses for each kind of cached lookup, for this
+# process (see get_cache_stats)
+CACHE_STATS = {}
+CACHE_STATS_LOCK = threading.Lock()
+
+
+def get_cache_generation(kind):
+    """
+    Returns the current generation of the cached lookups of the given kind,
+    which is part of their cache keys so that invalidate_cache can discard
+    all of them at once.
+    """
+    generation_key = 'qldap_generation_%s' % kind
+    generation = cache.get(generation_key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        cache.set(generation_key, generation, None)
+    return generation
+
+
+def invalidate_cache(*kinds):
+    """
+    Discards all cached lookups of the given kinds. Called after the
+    directory is changed through this module.
+    """
+    for kind in kinds:
+        cache.set('qldap_generation_%s' % kind, uuid.uuid4().hex, None)
+
+
+def get_cache_stats():
+    """
+    Returns a dictionary mapping each kind of cached lookup to a dictionary
+    with the number of cache 'hits' and 'misses' in this process.
+    """
+    with CACHE_STATS_LOCK:
+        return dict((kind, dict(stats)) for kind, stats in CACHE_STATS.items())
+
+
+def cached_lookup(kind, cache_false=True):
+    """
+    Decorator caching the results of an LDAP lookup for the number of
+    seconds given for its kind in the LDAP_CACHE_TIMEOUTS setting (not cached
+    if there is none). None is never cached, and False is only cached if
+    cache_false is True, since some lookups return it upon errors.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            timeout = settings.LDAP_CACHE_TIMEOUTS.get(kind)
+            if not timeout:
+                return func(*args)
+
+            args_hash = hashlib.md5(repr(
+                [smart_bytes(arg) for arg in args])).hexdigest()
+            cache_key = 'qldap_%s_%s_%s_%s' % (
+                kind, get_cache_generation(kind), func.__name__, args_hash)
+            result = cache.get(cache_key)
+            with CACHE_STATS_LOCK:
+                stats = CACHE_STATS.setdefault(kind, {'hits': 0, 'misses': 0})
+                stats['hits' if result is not None else 'misses'] += 1
+            if result is not None:
+                return result
+
+            result = func(*args)
+            if result is not None and (cache_false or result is not False):
+                cache.set(cache_key, result, timeout)
+            return result
+        return wrapper
+    return decorator
+
+
 def username_exists(username):
     """
     Checks if the username is in the People tree.
     Returns True/False, or None upon error.
     """
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return None
 
@@ -81,7 +265,7 @@ def create_user(username, password, email, first_name, last_name):
     if USERNAME_REGEX.match(username) is None:
         return False
 
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return False
 
@@ -106,7 +290,6 @@ def create_user(username, password, email, first_name, last_name):
     except ldap.ALREADY_EXISTS:
         return False
 
-    ldap_handle.unbind()
     return True
 
 
@@ -118,7 +301,7 @@ def delete_user(username):
     if not username:
         return False
 
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return False
 
@@ -130,7 +313,7 @@ def delete_user(username):
     except ldap.LDAPError:
         return False
 
-    ldap_handle.unbind()
+    invalidate_cache('email', 'membership')
     return True
 
 
@@ -143,7 +326,7 @@ def rename_user(username, new_username):
     if not (username and new_username):
         return (False, 'Invalid username argument(s)')
 
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return (False, 'LDAP connection failed')
 
@@ -165,6 +348,7 @@ def rename_user(username, new_username):
         ldap_handle.rename_s(old_dn, new_rdn)
     except ldap.LDAPError:
         return (False, 'LDAP error while renaming user')
+    invalidate_cache('email', 'membership')
 
     # Search in posixGroups (i.e. cn=web) for old username and replace
     # with new username. groupOfNames are automatically changed by rename_s
@@ -185,6 +369,7 @@ def rename_user(username, new_username):
         except ldap.LDAPError:
             return (False, 'LDAP error while migrating groups')
 
+    invalidate_cache('membership')
     return (True, 'User %s renamed to %s' % (username, new_username))
 
 
@@ -196,7 +381,7 @@ def mod_user_group(username, group, action=ldap.MOD_ADD):
     if action not in [ldap.MOD_ADD, ldap.MOD_DELETE]:
         return False
 
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return False
 
@@ -214,6 +399,7 @@ def mod_user_group(username, group, action=ldap.MOD_ADD):
         ldap_handle.modify_s(gdn, attr)
     except ldap.LDAPError:
         return False
+    invalidate_cache('membership')
     return True
 
 
@@ -222,7 +408,7 @@ def set_password(username, password):
     Sets the user's password, overwriting the old one.
     Returns True on success, False otherwise (including errors)
     """
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return False
 
@@ -242,7 +428,7 @@ def set_email(username, email):
     Set the email attribute in LDAP. Used for Officer email forwarding.
     Although LDAP allows multiple email attributes, we only allow one.
     """
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return False
 
@@ -265,15 +451,17 @@ def set_email(username, email):
         ldap_handle.modify_s(udn, attr)
     except ldap.LDAPError:
         return False
+    invalidate_cache('email')
     return True
 
 
+@cached_lookup('email', cache_false=False)
 def get_email(username):
     """
     Gets the user's email attribute from LDAP
     Returns the string (currently bytestring) or False if an error occurred.
     """
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return False
 
@@ -308,10 +496,6 @@ def check_password(username, password):
     This authenticates using LDAP bind. Upon a successful bind, it will
     upgrade an MD5 hash to salted SHA1 (SSHA) if applicable.
     """
-    ldap_handle = initialize()
-    if ldap_handle is None:
-        return False
-
     # don't allow blank username or password
     # This is important because a binding with a blank password can be
     # interpreted as an anonymous bind, which would succeed when it should not.
@@ -319,33 +503,38 @@ def check_password(username, password):
         username = smart_bytes(username)
         password = smart_bytes(password)
 
-        # attempt to bind as user
+        # attempt to bind as user, using a separate short-lived connection so
+        # that the pooled connections stay bound as the admin DN
         user_dn = 'uid=%s,%s' % (username, settings.LDAP_BASE['PEOPLE'])
         out = initialize(user_dn, password)
         if out is None:
             return False
-        else:
-            # Authentication successful; attempt to migrate password
-            # Then return success
-            searchstr = '(&(objectClass=inetOrgPerson)(uid=%s))' % username
-            try:
-                pw_result = ldap_handle.search_s(
-                    settings.LDAP_BASE['PEOPLE'],
-                    settings.LDAP['SCOPE'],
-                    searchstr,
-                    ['userPassword'])
-            except ldap.LDAPError:
-                return False
-            # pw_result must be of the form:
-            # [(DN, {'userPassword': ['password',],}),]
-            if len(pw_result) != 1 or len(pw_result[0]) != 2:
-                mail_admins('LDAP Anomaly Detected',
-                            ('Non-standard password results for %s in'
-                             'check_password') % username)
-            # Automatically update password to new hash algorithm
-            if LDAP_HASH_PREFIX not in pw_result[0][1]['userPassword'][0]:
-                set_password(username, password)
-            return True
+        out.unbind_s()
+
+        # Authentication successful; attempt to migrate password
+        # Then return success
+        ldap_handle = get_connection()
+        if ldap_handle is None:
+            return False
+        searchstr = '(&(objectClass=inetOrgPerson)(uid=%s))' % username
+        try:
+            pw_result = ldap_handle.search_s(
+                settings.LDAP_BASE['PEOPLE'],
+                settings.LDAP['SCOPE'],
+                searchstr,
+                ['userPassword'])
+        except ldap.LDAPError:
+            return False
+        # pw_result must be of the form:
+        # [(DN, {'userPassword': ['password',],}),]
+        if len(pw_result) != 1 or len(pw_result[0]) != 2:
+            mail_admins('LDAP Anomaly Detected',
+                        ('Non-standard password results for %s in'
+                         'check_password') % username)
+        # Automatically update password to new hash algorithm
+        if LDAP_HASH_PREFIX not in pw_result[0][1]['userPassword'][0]:
+            set_password(username, password)
+        return True
     else:
         # Bad username or password
         return False
@@ -356,7 +545,7 @@ def has_usable_password(username):
     Gets the user's password entry from LDAP.
     Returns False if it's an unusable password, or encounters LDAP errors
     """
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return False
 
@@ -432,14 +621,15 @@ def obfuscate(password):
     return smart_bytes(hash_prefix + pw_hash)
 
 
+@cached_lookup('membership')
 def is_group_member(username, group):
     """
     Checks if the user is a member of an LDAP Group.
-    Returns False if any errors are encountered
+    Returns True/False, or None upon error (so that errors are not cached).
     """
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
-        return False
+        return None
 
     username = smart_bytes(username)
     group = smart_bytes(group)
@@ -452,7 +642,7 @@ def is_group_member(username, group):
                                       settings.LDAP['SCOPE'],
                                       filter_pattern)
     except ldap.LDAPError:
-        return False
+        return None
 
     return len(result) > 0
 
@@ -470,7 +660,7 @@ def create_group(group, object_class='groupOfNames'):
     if object_class not in ['groupOfNames', 'posixGroup']:
         return False
 
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return False
 
@@ -494,7 +684,7 @@ def create_group(group, object_class='groupOfNames'):
     except ldap.LDAPError:
         return False
 
-    ldap_handle.unbind()
+    invalidate_cache('membership')
     return True
 
 
@@ -504,7 +694,7 @@ def generate_new_gidnumber():
     the range [2001, 65533]. The function finds the current highest value gid
     in that range and adds 1 to it to create a new gid.
     """
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return False
 
@@ -554,7 +744,7 @@ def delete_group(group):
     Deletes an LDAP group
     Returns False if any errors were encountered
     """
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return False
 
@@ -566,7 +756,7 @@ def delete_group(group):
     except ldap.LDAPError:
         return False
 
-    ldap_handle.unbind()
+    invalidate_cache('membership')
     return True
 
 
@@ -575,7 +765,7 @@ def group_exists(group):
     Checks if the group is in the Group LDAP tree
     Returns True/False, or None upon error.
     """
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return None
 
@@ -590,13 +780,14 @@ def group_exists(group):
         return None
 
 
+@cached_lookup('membership', cache_false=False)
 def get_group_member_attr(group):
     """
     Returns the group member attribute type for this group: "member" if this
     group is of the objectClass groupOfNames, or "memberUid" if it is of the
     objectClass posixGroup.
     """
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return False
 
@@ -625,11 +816,12 @@ def get_group_member_attr(group):
     return member_attribute
 
 
+@cached_lookup('membership', cache_false=False)
 def get_group_members(group):
     """
     Return a list of the members in the group.
     """
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return False
 
@@ -664,7 +856,7 @@ def clear_group_members(group):
     member, then the function ensures that the default user remains in the
     group. Returns True upon successful completion, False otherwise.
     """
-    ldap_handle = initialize()
+    ldap_handle = get_connection()
     if ldap_handle is None:
         return False
 
@@ -685,8 +877,10 @@ def clear_group_members(group):
     group_dn = entry[0][0]
     entry_properties = entry[0][1]
     group_classes = entry_properties['objectClass']
-    members = get_group_members(group)
     member_attribute = get_group_member_attr(group)
+    # Use the members from the search above rather than get_group_members,
+    # whose result may be cached
+    members = list(entry_properties.get(member_attribute, []))
 
     if settings.LDAP_DEFAULT_USER in members:
         # Do not wish to remove the default user from the ldap group, so remove
@@ -708,9 +902,84 @@ def clear_group_members(group):
         ldap_handle.modify_s(group_dn, modlist)
     except ldap.LDAPError:
         return False
+    invalidate_cache('membership')
     return True
 
 
+def sync_group_members(group, usernames, dry_run=False):
+    """
+    Makes the members of an ldap group the users with the given usernames,
+    using a single modification that only adds the missing members and
+    deletes the extra ones. Members that are not in the People tree (like the
+    default user) are left alone. If dry_run is True, the group is not
+    modified. Returns a (added, removed) tuple of sorted lists of usernames,
+    or None upon error.
+    """
+    ldap_handle = get_connection()
+    if ldap_handle is None:
+        return None
+
+    group = smart_bytes(group)
+    searchstr = '(cn=%s)' % group
+    try:
+        entry = ldap_handle.search_s(settings.LDAP_BASE['GROUP'],
+                                     settings.LDAP['SCOPE'],
+                                     searchstr)
+    except ldap.LDAPError:
+        return None
+
+    # Should only return one successful entry (since there should only be one
+    # group that matches the group parameter used with this function)
+    if len(entry) != 1 or len(entry[0]) != 2:
+        return None
+
+    group_dn = entry[0][0]
+    entry_properties = entry[0][1]
+    member_attribute = get_group_member_attr(group)
+    if not member_attribute:
+        return None
+
+    # Map the usernames of the current members in the People tree to their
+    # attribute values
+    members = entry_properties.get(member_attribute, [])
+    if member_attribute == 'memberUid':
+        value_format = '%s'
+        current = dict((member, member) for member in members)
+    else:
+        value_format = 'uid=%s,' + settings.LDAP_BASE['PEOPLE']
+        people_dn = re.compile(
+            '^uid=(.+),%s$' % re.escape(settings.LDAP_BASE['PEOPLE']))
+        current = dict((people_dn.match(member).group(1), member)
+                       for member in members if people_dn.match(member))
+
+    desired = set(smart_bytes(username) for username in usernames)
+    added = sorted(desired.difference(current))
+    removed = sorted(set(current).difference(desired))
+    if dry_run or not (added or removed):
+        return (added, removed)
+
+    modlist = []
+    if added:
+        modlist.append((ldap.MOD_ADD, member_attribute,
+                        [value_format % username for username in added]))
+    if removed:
+        modlist.append((ldap.MOD_DELETE, member_attribute,
+                        [current[username] for username in removed]))
+        if (member_attribute == 'member' and not desired and
+                len(current) == len(members)):
+            # groupOfNames requires at least one member, so keep the default
+            # user in a group that would otherwise be left empty
+            modlist.insert(0, (ldap.MOD_ADD, member_attribute,
+                               settings.LDAP_DEFAULT_USER))
+
+    try:
+        ldap_handle.modify_s(group_dn, modlist)
+    except ldap.LDAPError:
+        return None
+    invalidate_cache('membership')
+    return (added, removed)
+
+
 # TODO(flieee): move else where or delete for quark tbp/pie repo split
 def is_tbp(username):
     """
@@ -1,6 +1,9 @@
+from chosen import forms as chosen_forms
 from django import forms
 from django.forms import formsets
 
+from quark.base.models import Major
+from quark.base.models import Term
 from quark.resumes.models import Resume
 from quark.shortcuts import get_file_mimetype
 
@@ -86,3 +89,15 @@ ResumeVerifyFormSet = formsets.formset_factory(
 # pylint: disable=C0103
 ResumeCritiqueFormSet = formsets.formset_factory(
     ResumeCritiqueForm, formset=BaseResumeCritiqueForm)
+
+
+class ResumeBookForm(forms.Form):
+    """Form for choosing which releasable resumes go into a resume book."""
+    grad_terms = chosen_forms.ChosenModelMultipleChoiceField(
+        queryset=Term.objects.get_terms(
+            include_future=True, include_summer=True, reverse=True),
+        required=False, label='Graduation terms',
+        help_text='Leave blank to include all graduation terms.')
+    majors = chosen_forms.ChosenModelMultipleChoiceField(
+        queryset=Major.objects.all(), required=False,
+        help_text='Leave blank to include all majors.')
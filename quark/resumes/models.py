@@ -4,8 +4,19 @@ from django.conf import settings
 from django.db import models
 
 
+class ResumeManager(models.Manager):
+    def get_releasable(self):
+        """Return the resumes that can be released to companies, which are
+        those that have been verified and that their users chose to release.
+        """
+        return self.filter(verified=True, release=True)
+
+
 class Resume(models.Model):
     RESUMES_LOCATION = 'resumes'
+    # Where finished resume books are kept, so that the same book does not
+    # have to be built again until one of its resumes changes
+    RESUME_BOOKS_LOCATION = 'resume_books'
 
     # Custom displays for the verified NullBooleanField
     VERIFIED_CHOICES = (
@@ -53,6 +64,8 @@ class Resume(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField()
 
+    objects = ResumeManager()
+
     class Meta(object):
         permissions = (
             ('view_resumes', 'Can view all resumes'),
@@ -0,0 +1,177 @@
+import os
+import shutil
+import zipfile
+from cStringIO import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.models import Permission
+from django.contrib.messages import get_messages
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.exceptions import PermissionDenied
+from django.core.files.base import ContentFile
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from quark.base.models import Major
+from quark.base.models import Term
+from quark.base.models import University
+from quark.resumes.models import Resume
+from quark.resumes.views import ResumeBookView
+from quark.user_profiles.models import CollegeStudentInfo
+
+
+@override_settings(
+    MEDIA_ROOT=os.path.join(settings.WORKSPACE_ROOT, 'media', 'tests'))
+class ResumeBookViewTest(TestCase):
+    def setUp(self):
+        self.user_model = get_user_model()
+        self.officer = self.user_model.objects.create_user(
+            'officer', 'officer@tbp.berkeley.edu', 'testpw')
+        self.officer.user_permissions.add(
+            Permission.objects.get(codename='view_resumes'))
+        # Re-fetch the user so that the new permission is not hidden by the
+        # user's permission cache
+        self.officer = self.user_model.objects.get(pk=self.officer.pk)
+
+        self.term = Term(term=Term.SPRING, year=2014, current=True)
+        self.term.save()
+        self.term_later = Term(term=Term.SPRING, year=2015)
+        self.term_later.save()
+        university = University(short_name='univ', long_name='University')
+        university.save()
+        self.major = Major(short_name='ee', long_name='EE',
+                           university=university)
+        self.major.save()
+        self.major_other = Major(short_name='me', long_name='ME',
+                                 university=university)
+        self.major_other.save()
+
+        self.resume_ann = self.make_resume(
+            'ann', 'Ann', 'Adams', self.term, self.major)
+        self.resume_bob = self.make_resume(
+            'bob', 'Bob', 'Brown', self.term_later, self.major)
+        self.resume_cat = self.make_resume(
+            'cat', 'Cat', 'Clark', self.term, self.major_other)
+        # Unreleased resumes are never included
+        self.make_resume('dan', 'Dan', 'Davis', self.term, self.major,
+                         release=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(os.path.join(settings.WORKSPACE_ROOT, 'media', 'tests'),
+                      ignore_errors=True)
+
+    def make_resume(self, username, first_name, last_name, grad_term, major,
+                    release=True):
+        user = self.user_model.objects.create_user(
+            username, '{}@tbp.berkeley.edu'.format(username), 'testpw',
+            first_name=first_name, last_name=last_name)
+        info, _ = CollegeStudentInfo.objects.get_or_create(user=user)
+        info.grad_term = grad_term
+        info.save()
+        info.major.add(major)
+        resume = Resume(user=user, gpa='3.500', full_text='Resume text',
+                        verified=True, release=release,
+                        updated=timezone.now())
+        resume.resume_file.save(
+            'resume.pdf', ContentFile('Resume of {}'.format(username)))
+        return resume
+
+    def get_book(self, user=None, **params):
+        params['download'] = ''
+        request = RequestFactory().get('/resumes/book/', params)
+        request.user = user or self.officer
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        # pylint: disable=W0201
+        self.request = request
+        return ResumeBookView.as_view()(request)
+
+    def get_book_names(self, response):
+        """Return the names of the files in the streamed resume book."""
+        self.assertTrue(isinstance(response, StreamingHttpResponse))
+        book = zipfile.ZipFile(StringIO(''.join(response.streaming_content)))
+        return book.namelist()
+
+    def get_cached_books(self):
+        books_dir = os.path.join(
+            settings.MEDIA_ROOT, Resume.RESUME_BOOKS_LOCATION)
+        return [name for name in os.listdir(books_dir)
+                if name.endswith('.zip')]
+
+    def test_permissions(self):
+        response = self.get_book(user=AnonymousUser())
+        self.assertEqual(response.status_code, 302)
+        user = self.user_model.objects.create_user(
+            'member', 'member@tbp.berkeley.edu', 'testpw')
+        self.assertRaises(PermissionDenied, self.get_book, user=user)
+
+    def test_filters(self):
+        response = self.get_book()
+        self.assertEqual(
+            self.get_book_names(response),
+            ['AnnAdams_ann.pdf', 'BobBrown_bob.pdf', 'CatClark_cat.pdf'])
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment;filename="resume_book.zip"')
+
+        response = self.get_book(grad_terms=[self.term.pk])
+        self.assertEqual(self.get_book_names(response),
+                         ['AnnAdams_ann.pdf', 'CatClark_cat.pdf'])
+
+        response = self.get_book(majors=[self.major.pk])
+        self.assertEqual(self.get_book_names(response),
+                         ['AnnAdams_ann.pdf', 'BobBrown_bob.pdf'])
+
+        response = self.get_book(grad_terms=[self.term.pk],
+                                 majors=[self.major.pk, self.major_other.pk])
+        self.assertEqual(self.get_book_names(response),
+                         ['AnnAdams_ann.pdf', 'CatClark_cat.pdf'])
+
+    def test_no_resumes(self):
+        response = self.get_book(grad_terms=[self.term_later.pk],
+                                 majors=[self.major_other.pk])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context_data['form'].is_valid())
+        self.assertEqual(
+            [message.message for message in get_messages(self.request)],
+            ['No resumes match your choices.'])
+
+    def test_cached_book(self):
+        # The book is saved once it has been streamed completely
+        self.get_book_names(self.get_book(majors=[self.major.pk]))
+        self.assertEqual(len(self.get_cached_books()), 1)
+
+        # The saved book is then sent as a file, whose length is known
+        book_path = os.path.join(
+            settings.MEDIA_ROOT, Resume.RESUME_BOOKS_LOCATION,
+            self.get_cached_books()[0])
+        response = self.get_book(majors=[self.major.pk])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'],
+                         str(os.path.getsize(book_path)))
+        with open(book_path, 'rb') as book_file:
+            self.assertEqual(''.join(response.streaming_content),
+                             book_file.read())
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment;filename="resume_book.zip"')
+
+        # A book for other choices is saved separately
+        self.get_book_names(self.get_book(majors=[self.major_other.pk]))
+        self.assertEqual(len(self.get_cached_books()), 2)
+
+        # Changing a resume makes a new book, which replaces the old book for
+        # the same choices
+        old_books = self.get_cached_books()
+        self.resume_ann.updated = timezone.now()
+        self.resume_ann.save()
+        response = self.get_book(majors=[self.major.pk])
+        self.assertEqual(self.get_book_names(response),
+                         ['AnnAdams_ann.pdf', 'BobBrown_bob.pdf'])
+        new_books = self.get_cached_books()
+        self.assertEqual(len(new_books), 2)
+        self.assertEqual(len(set(old_books) & set(new_books)), 1)
@@ -1,6 +1,7 @@
 from django.conf.urls import patterns
 from django.conf.urls import url
 
+from quark.resumes.views import ResumeBookView
 from quark.resumes.views import ResumeListView
 from quark.resumes.views import ResumeCritiqueView
 from quark.resumes.views import ResumeDownloadView
@@ -17,4 +18,5 @@ urlpatterns = patterns(
         ResumeDownloadView.as_view(), name='download'),
     url(r'^critique/$', ResumeCritiqueView.as_view(), name='critique'),
     url(r'^verify/$', ResumeVerifyView.as_view(), name='verify'),
+    url(r'^book/$', ResumeBookView.as_view(), name='book'),
     )
@@ -1,4 +1,7 @@
-import mimetypes
+import glob
+import hashlib
+import os
+import tempfile
 
 from django.conf import settings
 from django.contrib import messages
@@ -7,20 +10,19 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.decorators import permission_required
 from django.core.exceptions import PermissionDenied
 from django.core.mail import EmailMessage
-from django.core.servers.basehttp import FileWrapper
 from django.core.urlresolvers import reverse_lazy
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.template.loader import render_to_string
 from django.utils import timezone
 from django.utils.decorators import method_decorator
-from django.utils.encoding import smart_bytes
 from django.views.generic import DetailView
 from django.views.generic.edit import FormView
 
 from quark.base.models import Officer
 from quark.base.models import OfficerPosition
 from quark.base.models import Term
+from quark.resumes.forms import ResumeBookForm
 from quark.resumes.forms import ResumeForm
 from quark.resumes.forms import ResumeListFormSet
 from quark.resumes.forms import ResumeCritiqueFormSet
@@ -28,6 +30,8 @@ from quark.resumes.forms import ResumeVerifyFormSet
 from quark.resumes.models import Resume
 from quark.shortcuts import get_object_or_none
 from quark.user_profiles.models import CollegeStudentInfo
+from quark.utils.file_delivery import send_file
+from quark.utils.zip_stream import generate_zip
 
 
 class ResumeViewMixin(object):
@@ -232,11 +236,135 @@ class ResumeDownloadView(DetailView):
 
     def get(self, request, *args, **kwargs):
         resume = get_object_or_404(Resume, user=self.user)
-        mime_type, _ = mimetypes.guess_type(resume.resume_file.name)
-        response = HttpResponse(
-            FileWrapper(resume.resume_file),
-            content_type=mime_type)
-        response['Content-Disposition'] = 'inline;filename="{resume}"'.format(
-            resume=smart_bytes(
-                resume.get_download_file_name(), encoding='ascii'))
+        return send_file(request, resume.resume_file.path,
+                         resume.get_download_file_name())
+
+
+class ResumeBookView(FormView):
+    """View for downloading a ZIP archive of all releasable resumes matching
+    the chosen graduation terms and majors, for giving to companies.
+    """
+    form_class = ResumeBookForm
+    template_name = 'resumes/book.html'
+
+    @method_decorator(login_required)
+    @method_decorator(
+        permission_required('resumes.view_resumes', raise_exception=True))
+    def dispatch(self, *args, **kwargs):
+        return super(ResumeBookView, self).dispatch(*args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super(ResumeBookView, self).get_form_kwargs()
+        # The form is submitted with GET, since downloading a resume book
+        # does not change anything
+        if 'download' in self.request.GET:
+            kwargs['data'] = self.request.GET
+        return kwargs
+
+    def get(self, request, *args, **kwargs):
+        form = self.get_form(self.get_form_class())
+        if form.is_bound and form.is_valid():
+            return self.form_valid(form)
+        return self.render_to_response(self.get_context_data(form=form))
+
+    def get_context_data(self, **kwargs):
+        context = super(ResumeBookView, self).get_context_data(**kwargs)
+        context['book'] = True
+        return context
+
+    def form_valid(self, form):
+        resumes = Resume.objects.get_releasable().select_related('user')
+        if form.cleaned_data['grad_terms']:
+            resumes = resumes.filter(
+                user__collegestudentinfo__grad_term__in=form.cleaned_data[
+                    'grad_terms'])
+        if form.cleaned_data['majors']:
+            resumes = resumes.filter(
+                user__collegestudentinfo__major__in=form.cleaned_data[
+                    'majors']).distinct()
+        resumes = list(resumes.order_by('user__last_name', 'user__first_name'))
+        if not resumes:
+            messages.error(self.request, 'No resumes match your choices.')
+            return self.render_to_response(self.get_context_data(form=form))
+
+        # A finished book is reused until the set of resumes in it or any of
+        # the resumes themselves change. Books are named by the choices they
+        # were made for, followed by the versions of their resumes, so that
+        # the books superseded by a newer book can be found and removed.
+        choices = ';'.join(
+            ','.join(str(obj.pk) for obj in form.cleaned_data[field])
+            for field in ('grad_terms', 'majors'))
+        versions = ','.join(
+            '{}:{}'.format(resume.pk, resume.updated.isoformat())
+            for resume in resumes)
+        path = os.path.join(
+            settings.MEDIA_ROOT, Resume.RESUME_BOOKS_LOCATION,
+            '{}_{}.zip'.format(hashlib.sha1(choices).hexdigest(),
+                               hashlib.sha1(versions).hexdigest()))
+        filename = 'resume_book.zip'
+        if os.path.exists(path):
+            response = send_file(self.request, path, filename)
+        else:
+            response = StreamingHttpResponse(
+                cache_resume_book(path, generate_zip(
+                    get_resume_book_entries(resumes))),
+                content_type='application/zip')
+            response['Cache-Control'] = 'private'
+        response['Content-Disposition'] = 'attachment;filename="{}"'.format(
+            filename)
         return response
+
+
+def get_resume_book_entries(resumes):
+    """Yield the (name, data, modified datetime) ZIP entries for the given
+    resumes, reading each resume file only when its entry is needed.
+
+    Resumes whose files are missing are left out.
+    """
+    for resume in resumes:
+        try:
+            with open(resume.resume_file.path, 'rb') as resume_file:
+                data = resume_file.read()
+        except IOError:
+            continue
+        name = u'{name}_{username}{ext}'.format(
+            name=resume.get_download_file_name(),
+            username=resume.user.get_username(),
+            ext=os.path.splitext(resume.resume_file.name)[1])
+        yield name, data, timezone.localtime(resume.updated)
+
+
+def cache_resume_book(path, chunks):
+    """Yield the given chunks of a resume book, and then save the whole book
+    to the given path once all of the chunks have been generated.
+
+    The chunks are written to a temporary file as they are yielded, which is
+    only moved to the path when complete, so that incomplete books (from
+    interrupted downloads) are never served. Once the book is saved, the
+    older books made for the same choices (whose names share the part of the
+    file name before the underscore) are deleted, since they can no longer
+    be served.
+    """
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    book_file = tempfile.NamedTemporaryFile(
+        dir=directory, suffix='.tmp', delete=False)
+    try:
+        with book_file:
+            for chunk in chunks:
+                book_file.write(chunk)
+                yield chunk
+        os.rename(book_file.name, path)
+        prefix = os.path.basename(path).split('_')[0]
+        for old_path in glob.glob(
+                os.path.join(directory, '{}_*.zip'.format(prefix))):
+            if old_path != path:
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    # Already removed by another download
+                    pass
+    finally:
+        if os.path.exists(book_file.name):
+            os.remove(book_file.name)
@@ -43,10 +43,28 @@ DATABASES = {
     }
 }
 
-# Use a default local memory cache
+# The default cache must be shared by all processes serving the site (like
+# the uWSGI workers), since cached data such as the current term is invalidated
+# by whichever process changes it. Change VERSION to discard everything cached
+# by older code.
+#
+# The file-based cache counts its files by walking the whole cache directory on
+# every set, and once MAX_ENTRIES is reached it deletes a third of the entries
+# regardless of their use (including the term, event and course catalog
+# version keys, which then start over). Django's default of 300 entries is far
+# too few for the per-user keys (roles, notifications and LDAP lookups) and the
+# per-kind event list fragments, so MAX_ENTRIES allows several entries for each
+# active user, at the cost of a longer directory walk per set. Deployments with
+# more traffic should use a memcached backend instead, which has neither cost.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(WORKSPACE_ROOT, 'cache'),
+        'KEY_PREFIX': 'quark',
+        'VERSION': 1,
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
     }
 }
 
@@ -81,9 +81,23 @@ LDAP_GROUPS = {
     'TBP': ['tbp-officers', 'tbp-members', 'tbp-candidates'],
 }
 LDAP_DEFAULT_USER = 'uid=default,ou=System,' + LDAP['BASE']
+# The auth groups whose users should be the members of each LDAP group, as kept
+# in sync by the sync_ldap_groups management command
+LDAP_GROUP_SYNC = {
+    'tbp-officers': ['Officer'],
+    'tbp-members': ['Member', 'Officer'],
+    'tbp-candidates': ['Current Candidate'],
+}
 
 USE_LDAP = False
 
+# Number of seconds that the results of LDAP lookups are cached for, by kind of
+# lookup. Lookups of a kind without a timeout are not cached.
+LDAP_CACHE_TIMEOUTS = {
+    'email': 600,
+    'membership': 300,
+}
+
 # Valid username regex
 # Please use raw string notation (i.e. r'text') to keep regex sane.
 # Update quark/qldap/tests.py: test_valid_username_regex() to match
@@ -93,3 +107,19 @@ USERNAME_HELPTEXT = ('Username must be 3-30 characters, start with a letter, '
 
 # Valid types are 'semester' and 'quarter'.
 TERM_TYPE = 'semester'
+
+# Backend used to deliver protected file downloads (like exams and resumes).
+# Use 'quark.utils.file_delivery.XSendfileBackend' (Apache mod_xsendfile) or
+# 'quark.utils.file_delivery.XAccelRedirectBackend' (nginx) to have the
+# front-end server send the files instead of Django.
+FILE_DELIVERY_BACKEND = 'quark.utils.file_delivery.DjangoBackend'
+
+# URL prefix of the internal nginx location that is an alias of MEDIA_ROOT,
+# used by the X-Accel-Redirect backend:
+FILE_DELIVERY_ACCEL_PREFIX = '/protected-media/'
+
+# Email backend used by the emailer views (like Helpdesk). The default adds
+# their emails to a queue that is sent by the send_queued_email management
+# command (using EMAIL_BACKEND), so that the views don't wait for the mail
+# server.
+EMAILER_BACKEND = 'quark.emailer.backends.QueuedEmailBackend'
@@ -1,9 +1,14 @@
 from functools import wraps
+import hashlib
 import magic
 
 from django.shortcuts import _get_queryset
 
 
+# The number of leading bytes of a file that its mimetype is determined from
+MIMETYPE_SNIFF_SIZE = 8192
+
+
 def get_object_or_none(klass, *args, **kwargs):
     """
     This shortcut is modified from django.shortcuts.get_object_or_404
@@ -29,17 +34,29 @@ def get_file_mimetype(file_object):
     This method is useful for verifying the file type of uploaded files so that
     someone cannot upload a disallowed file type by simply changing the file
     extension.
+
+    Only the leading bytes of the file are read (which is all that magic needs
+    to recognize the file types that are uploaded), whether the uploaded file
+    is stored in memory or temporarily on disk. The file is left at its start.
     """
-    # If the uploaded file is greater than 2.5MB (if multiple_chunks() returns
-    # True), then it will be stored temporarily on disk; otherwise, it will be
-    # stored in memory.
-    if file_object.multiple_chunks():
-        output = magic.from_file(file_object.temporary_file_path(), mime=True)
-    else:
-        output = magic.from_buffer(file_object.read(), mime=True)
+    file_object.seek(0)
+    output = magic.from_buffer(file_object.read(MIMETYPE_SNIFF_SIZE), mime=True)
+    file_object.seek(0)
     return output
 
 
+def get_file_hash(file_object):
+    """Return the SHA-256 hex digest of the contents of the given file.
+
+    The file is read in chunks, so that large uploaded files are never held in
+    memory all at once.
+    """
+    file_hash = hashlib.sha256()
+    for chunk in file_object.chunks():
+        file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
 def disable_for_loaddata(signal_handler):
     """Decorator that turns off signal handlers when loading fixture data.
 
@@ -0,0 +1,86 @@
+import multiprocessing
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import get_model
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.exceptions import EasyThumbnailsError
+from easy_thumbnails.files import get_thumbnailer
+
+
+# The (model, image field) pairs whose images have thumbnails
+THUMBNAIL_SOURCES = (
+    ('user_profiles.UserProfile', 'picture'),
+    ('candidates.Candidate', 'photo'),
+)
+
+
+def generate_thumbnails(file_name):
+    """Generate the missing thumbnails of the image with the given name (in
+    the default storage) for every thumbnail alias.
+
+    Run in the worker processes of the generate_thumbnails command. Return
+    the number of thumbnails generated, along with an error message if the
+    image could not be read.
+    """
+    thumbnailer = get_thumbnailer(file_name)
+    num_generated = 0
+    try:
+        for options in aliases.all(include_global=True).values():
+            if not thumbnailer.get_existing_thumbnail(
+                    thumbnailer.get_options(options)):
+                thumbnailer.get_thumbnail(options, generate=True)
+                num_generated += 1
+    except (EasyThumbnailsError, IOError) as error:
+        return num_generated, '{}: {}'.format(file_name, error)
+    return num_generated, None
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '-p', '--processes', type='int', dest='processes',
+            default=multiprocessing.cpu_count(),
+            help='The number of worker processes to generate thumbnails in '
+                 '(the number of CPUs by default)'),
+        )
+
+    def handle(self, *args, **kwargs):
+        """Generate all missing thumbnails of the existing user profile
+        pictures and candidate photos, such as for images uploaded before
+        thumbnails were generated on upload.
+        """
+        file_names = set()
+        for model_label, field_name in THUMBNAIL_SOURCES:
+            model = get_model(*model_label.split('.'))
+            file_names.update(model.objects.exclude(
+                **{field_name: ''}).exclude(
+                **{'{}__isnull'.format(field_name): True}).values_list(
+                field_name, flat=True))
+        file_names = sorted(file_names)
+
+        processes = kwargs.get('processes')
+        if processes > 1:
+            # Close the database connection, so that the worker processes
+            # open their own connections instead of sharing this one
+            connection.close()
+            pool = multiprocessing.Pool(processes)
+            try:
+                results = pool.map(generate_thumbnails, file_names)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [generate_thumbnails(file_name)
+                       for file_name in file_names]
+
+        for _, error in results:
+            if error:
+                self.stderr.write('Could not generate thumbnails for {}'.format(
+                    error))
+        if int(kwargs.get('verbosity')) > 0:
+            self.stdout.write(
+                'Generated {} thumbnails for {} images'.format(
+                    sum(num_generated for num_generated, _ in results),
+                    len(file_names)))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from quark.user_profiles.models import UserProfile
+from quark.user_profiles.models import UserProfileSearchToken
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **kwargs):
+        """Recompute the name search tokens for every user profile."""
+        user_profiles = UserProfile.objects.select_related('user')
+        for user_profile in user_profiles:
+            UserProfileSearchToken.objects.update_tokens(user_profile)
+        if int(kwargs.get('verbosity')) > 0:
+            self.stdout.write('Indexed names for {} users'.format(
+                len(user_profiles)))
@@ -1,8 +1,14 @@
 import os
+import re
+import unicodedata
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.db import models
+from easy_thumbnails.signal_handlers import generate_aliases_global
+from easy_thumbnails.signals import saved_file
 from localflavor.us.models import PhoneNumberField
 from localflavor.us.models import USStateField
 
@@ -223,6 +229,100 @@ class UserProfile(models.Model):
             return False
 
 
+class UserProfileSearchTokenManager(models.Manager):
+    @staticmethod
+    def tokenize(text):
+        """Return the list of normalized search tokens in the given text.
+
+        Text is lowercased, stripped of accents and split on any character
+        that is not a letter or digit, so that "Mary-Kate O'Brien" becomes
+        ['mary', 'kate', 'o', 'brien'].
+        """
+        text = unicodedata.normalize('NFKD', unicode(text)).encode(
+            'ascii', 'ignore').lower()
+        return [token for token in re.split(r'[^a-z0-9]+', text) if token]
+
+    def update_tokens(self, user_profile):
+        """Update the stored search tokens for the given user profile to match
+        the user's current first, preferred, middle and last names.
+        """
+        user = user_profile.user
+        names = ' '.join([user.first_name, user_profile.preferred_name,
+                          user_profile.middle_name, user.last_name])
+        new_tokens = set(token[:self.model.TOKEN_LENGTH]
+                         for token in self.tokenize(names))
+        old_tokens = set(self.filter(user_profile=user_profile).values_list(
+            'token', flat=True))
+
+        if old_tokens - new_tokens:
+            self.filter(user_profile=user_profile,
+                        token__in=old_tokens - new_tokens).delete()
+        if new_tokens - old_tokens:
+            self.bulk_create([
+                self.model(user_profile=user_profile, token=token)
+                for token in new_tokens - old_tokens])
+
+    def search(self, query, user_profiles=None, max_results=20):
+        """Return a list of up to max_results user profiles whose names match
+        every word in the query.
+
+        A profile matches a word if any of its name tokens starts with the
+        word. Profiles with more name tokens exactly equal to words in the
+        query are listed first. If user_profiles is a queryset, only profiles
+        in it are searched.
+        """
+        terms = self.tokenize(query)
+        if not terms:
+            return []
+
+        if user_profiles is None:
+            user_profiles = UserProfile.objects.all()
+        for term in terms:
+            user_profiles = user_profiles.filter(pk__in=self.filter(
+                token__startswith=term[:self.model.TOKEN_LENGTH]).values(
+                'user_profile'))
+        # Count the exactly matching tokens of each matched profile in the
+        # database, so that only the top max_results profiles are loaded, and
+        # keep the profiles in their default order otherwise
+        exact_terms = [term[:self.model.TOKEN_LENGTH] for term in terms]
+        quote_name = connection.ops.quote_name
+        num_exact_matches = (
+            'SELECT COUNT(*) FROM {tokens} WHERE {tokens}.{profile} = '
+            '{profiles}.{pk} AND {tokens}.{token} IN ({terms})').format(
+            tokens=quote_name(self.model._meta.db_table),
+            profile=quote_name(
+                self.model._meta.get_field('user_profile').column),
+            profiles=quote_name(UserProfile._meta.db_table),
+            pk=quote_name(UserProfile._meta.pk.column),
+            token=quote_name(self.model._meta.get_field('token').column),
+            terms=', '.join(['%s'] * len(exact_terms)))
+        return list(user_profiles.select_related('user').extra(
+            select={'num_exact_matches': num_exact_matches},
+            select_params=exact_terms).order_by(
+            '-num_exact_matches', *UserProfile._meta.ordering)[:max_results])
+
+
+class UserProfileSearchToken(models.Model):
+    """A normalized word from a user's names, used to index name searches.
+
+    Each UserProfile has one token for every distinct word in the user's first,
+    preferred, middle and last names, so that name searches can use prefix
+    matches against an index instead of scanning every user.
+    """
+    TOKEN_LENGTH = 32
+
+    user_profile = models.ForeignKey(UserProfile)
+    token = models.CharField(max_length=TOKEN_LENGTH, db_index=True)
+
+    objects = UserProfileSearchTokenManager()
+
+    class Meta(object):
+        unique_together = ('user_profile', 'token')
+
+    def __unicode__(self):
+        return self.token
+
+
 class CollegeStudentInfo(IDCodeMixin):
     """Information about a college student user."""
     user = models.OneToOneField(settings.AUTH_USER_MODEL)
@@ -257,9 +357,49 @@ class StudentOrgUserProfile(models.Model):
         ordering = ('user',)
         verbose_name = 'Student Organization User Profile'
 
+    # Incremented whenever any officer or candidate records change, so that
+    # role information memoized on profile instances is recomputed
+    roles_version = 0
+
+    _role_terms = None
+    _role_terms_version = None
+
     def __unicode__(self):
         return self.user.get_full_name()
 
+    @staticmethod
+    def get_role_terms_cache_key(user_pk):
+        return 'student_org_role_terms_{}'.format(user_pk)
+
+    def get_role_terms(self):
+        """Return the terms in which this user held officer and candidate roles,
+        as a tuple of a set of (term PK, whether the position is auxiliary)
+        pairs for the user's officer positions and a set of the term PKs in
+        which the user was a candidate.
+
+        The role checks below (is_officer, is_candidate, is_member) are all
+        answered from this information, which is only fetched once for each
+        profile instance (e.g., once per request for the logged-in user) and is
+        also kept in the cache until the user's officer or candidate records
+        change.
+        """
+        roles_version = StudentOrgUserProfile.roles_version
+        if (self._role_terms is None or
+                self._role_terms_version != roles_version):
+            self._role_terms_version = roles_version
+            cache_key = StudentOrgUserProfile.get_role_terms_cache_key(
+                self.user_id)
+            role_terms = cache.get(cache_key)
+            if role_terms is None:
+                role_terms = (
+                    set(Officer.objects.filter(user=self.user_id).values_list(
+                        'term_id', 'position__auxiliary')),
+                    set(Candidate.objects.filter(
+                        user=self.user_id).values_list('term_id', flat=True)))
+                cache.set(cache_key, role_terms)
+            self._role_terms = role_terms
+        return self._role_terms
+
     def is_candidate(self, current=True):
         """Return True if this person is a candidate, False if initiated.
 
@@ -281,10 +421,11 @@ class StudentOrgUserProfile(models.Model):
         # candidates app, so if they are not recorded as initiated in their
         # profile (i.e., initiation_term not None) and a Candidate object
         # exists, they are considered a candidate:
+        candidate_term_pks = self.get_role_terms()[1]
         if current:
-            return Candidate.objects.filter(
-                user=self.user, term=current_term).exists()
-        return Candidate.objects.filter(user=self.user).exists()
+            return current_term is not None and (
+                current_term.pk in candidate_term_pks)
+        return len(candidate_term_pks) > 0
 
     def is_member(self):
         """Return True if this person is a current member of the organization.
@@ -299,7 +440,7 @@ class StudentOrgUserProfile(models.Model):
         if USE_LDAP:
             is_ldap_member = ldap_utils.is_in_tbp_group(
                 self.user.get_username(), 'members')
-            return is_officer or is_ldap_member
+            return bool(is_officer or is_ldap_member)
         return is_officer
 
     def is_officer(self, current=False, exclude_aux=False):
@@ -322,10 +463,11 @@ class StudentOrgUserProfile(models.Model):
                         self.user.get_username(), 'officers')):
                 return True
             term = None
-        officer_positions = self.get_officer_positions(term)
-        if exclude_aux:
-            officer_positions = officer_positions.exclude(auxiliary=True)
-        return officer_positions.exists()
+        for term_pk, auxiliary in self.get_role_terms()[0]:
+            if (term is None or term_pk == term.pk) and not (
+                    exclude_aux and auxiliary):
+                return True
+        return False
 
     def get_officer_positions(self, term=None):
         """Return a query set of all officer positions held by this user in the
@@ -385,6 +527,15 @@ def user_profile_creation_post_save(sender, instance, created, **kwargs):
     # specified.
     if instance.first_name and not profile.preferred_name:
         profile.save()
+    else:
+        # The user's names are included in the profile's search tokens
+        UserProfileSearchToken.objects.update_tokens(profile)
+
+
+@disable_for_loaddata
+def user_profile_search_token_post_save(sender, instance, created, **kwargs):
+    """Keep the user profile's name search tokens up to date."""
+    UserProfileSearchToken.objects.update_tokens(instance)
 
 
 def student_org_creation_post_save(sender, instance, created, **kwargs):
@@ -396,6 +547,15 @@ def student_org_creation_post_save(sender, instance, created, **kwargs):
         StudentOrgUserProfile.objects.get_or_create(user=instance.user)
 
 
+def invalidate_role_terms(sender, instance, **kwargs):
+    """Make sure that role checks for the user of the changed Officer or
+    Candidate object are recomputed.
+    """
+    StudentOrgUserProfile.roles_version += 1
+    cache.delete(StudentOrgUserProfile.get_role_terms_cache_key(
+        instance.user_id))
+
+
 def student_org_user_profile_post_save(sender, instance, created, **kwargs):
     """Ensure that CollegeStudentInfo objects exist for every user with a
     StudentOrgUserProfile.
@@ -411,8 +571,20 @@ def student_org_user_profile_post_save(sender, instance, created, **kwargs):
 models.signals.post_save.connect(
     user_profile_creation_post_save, sender=get_user_model())
 
+models.signals.post_save.connect(
+    user_profile_search_token_post_save, sender=UserProfile)
+
 models.signals.post_save.connect(
     student_org_creation_post_save, sender=Officer)
 
 models.signals.post_save.connect(
     student_org_user_profile_post_save, sender=StudentOrgUserProfile)
+
+models.signals.post_save.connect(invalidate_role_terms, sender=Officer)
+models.signals.post_delete.connect(invalidate_role_terms, sender=Officer)
+models.signals.post_save.connect(invalidate_role_terms, sender=Candidate)
+models.signals.post_delete.connect(invalidate_role_terms, sender=Candidate)
+
+# Generate the thumbnails of uploaded pictures right away, so that templates
+# never have to generate them
+saved_file.connect(generate_aliases_global, sender=UserProfile)
@@ -1,11 +1,21 @@
+import shutil
+import tempfile
+from cStringIO import StringIO
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.test import TestCase
 from django.test.utils import override_settings
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.files import get_thumbnailer
+from PIL import Image
 
 from quark.base.models import Officer
 from quark.base.models import OfficerPosition
 from quark.base.models import Term
+from quark.base.templatetags.template_utils import pregenerated_thumbnail_url
 from quark.candidates.models import Candidate
 from quark.shortcuts import get_object_or_none
 from quark.user_profiles.fields import UserCommonNameChoiceField
@@ -13,6 +23,7 @@ from quark.user_profiles.fields import UserCommonNameMultipleChoiceField
 from quark.user_profiles.models import CollegeStudentInfo
 from quark.user_profiles.models import StudentOrgUserProfile
 from quark.user_profiles.models import UserProfile
+from quark.user_profiles.models import UserProfileSearchToken
 
 
 # TODO(sjdemartini): Add tests for LDAP-specific testing in methods that use
@@ -145,6 +156,39 @@ class UserProfilesTest(UserInfoTestCase):
         self.assertEqual(self.profile.get_verbose_first_name(),
                          '{} ({})'.format(preferred_name, self.first_name))
 
+    def test_name_search(self):
+        search = UserProfileSearchToken.objects.search
+
+        # The search tokens are kept up to date as names change:
+        self.assertEqual(search('edw'), [self.profile])
+        self.assertEqual(search('Ed Will'), [self.profile])
+        self.assertEqual(search('bob'), [])
+        self.profile.preferred_name = 'Bob'
+        self.profile.save()
+        self.assertEqual(search('bob williams'), [self.profile])
+        self.user.last_name = 'Smith-Jones'
+        self.user.save()
+        self.assertEqual(search('williams'), [])
+        self.assertEqual(search('jones'), [self.profile])
+
+        # Exact matches are listed before prefix matches, and results can be
+        # limited to a given queryset:
+        other_user = self.user_model.objects.create_user(
+            'other_user', 'other@tbp.berkeley.edu', 'testpw',
+            first_name='Bobby', last_name='Jones')
+        other_profile = other_user.userprofile
+        self.assertEqual(search('bob'), [self.profile, other_profile])
+        self.assertEqual(search('bobby'), [other_profile])
+        self.assertEqual(
+            search('bob', user_profiles=UserProfile.objects.exclude(
+                pk=self.profile.pk)),
+            [other_profile])
+        self.assertEqual(search('jones', max_results=1), [self.profile])
+
+        # Matching and ranking happen in a single query
+        with self.assertNumQueries(1):
+            self.assertEqual(search('bob jones'), [self.profile, other_profile])
+
     def test_is_candidate(self):
         """Ensure that basic is_candidate usage works as expected.
 
@@ -191,6 +235,38 @@ class UserProfilesTest(UserInfoTestCase):
         # Should now be considered an officer:
         self.assertTrue(self.profile.is_officer())
 
+    def test_picture_thumbnails(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        image = StringIO()
+        Image.new('RGB', (300, 300)).save(image, 'JPEG')
+        with self.settings(MEDIA_ROOT=media_root):
+            # Without a picture, there is no thumbnail url
+            self.assertEqual(
+                pregenerated_thumbnail_url(self.profile.picture, 'avatar'), '')
+
+            # Saving an uploaded picture generates its thumbnails right away
+            self.profile.picture = SimpleUploadedFile(
+                'picture.jpg', image.getvalue())
+            self.profile.save()
+            thumbnailer = get_thumbnailer(self.profile.picture)
+            avatar = thumbnailer.get_existing_thumbnail(
+                aliases.get('avatar'))
+            self.assertIsNotNone(avatar)
+            self.assertEqual(
+                pregenerated_thumbnail_url(self.profile.picture, 'avatar'),
+                avatar.url)
+
+            # Missing thumbnails fall back to the picture itself, and are
+            # generated by the generate_thumbnails command
+            thumbnailer.delete_thumbnails()
+            self.assertEqual(
+                pregenerated_thumbnail_url(self.profile.picture, 'avatar'),
+                self.profile.picture.url)
+            call_command('generate_thumbnails', processes=1, verbosity=0)
+            self.assertIsNotNone(thumbnailer.get_existing_thumbnail(
+                aliases.get('avatar')))
+
 
 class StudentOrgUserProfilesTest(UserInfoTestCase):
     def setUp(self):
@@ -317,6 +393,25 @@ class StudentOrgUserProfilesTest(UserInfoTestCase):
         self.assertFalse(self.profile.is_officer(current=True,
                                                  exclude_aux=True))
 
+    def test_role_checks_are_memoized(self):
+        # Role checks for the same profile only query officer and candidate
+        # records once
+        self.assertFalse(self.profile.is_officer())
+        with self.assertNumQueries(0):
+            self.assertFalse(self.profile.is_officer())
+            self.assertFalse(self.profile.is_officer(exclude_aux=True))
+            self.assertFalse(self.profile.is_member())
+
+        # Changing the user's officer records updates the role checks
+        officer = Officer(user=self.user, position=self.advisor_pos,
+                          term=self.term)
+        officer.save()
+        self.assertTrue(self.profile.is_officer())
+        self.assertTrue(self.profile.is_officer(current=True))
+        self.assertFalse(self.profile.is_officer(exclude_aux=True))
+        officer.delete()
+        self.assertFalse(self.profile.is_officer())
+
     def test_get_officer_positions(self):
         # Note that when given no 'term' kwarg, the method returns positions
         # from all terms. The order of the list returned is based on term, then
@@ -0,0 +1,202 @@
+"""
+Delivery of protected files (like exams and resumes) after a view has checked
+that the requesting user is allowed to download them.
+
+The backend used is given by the FILE_DELIVERY_BACKEND setting. The default
+DjangoBackend streams the file through Django, while XSendfileBackend and
+XAccelRedirectBackend only respond with a header telling the front-end server
+(Apache with mod_xsendfile or nginx, respectively) to transfer the file itself,
+so that the application worker is freed as soon as the response is returned.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.servers.basehttp import FileWrapper
+from django.http import HttpResponse
+from django.http import HttpResponseNotModified
+from django.http import StreamingHttpResponse
+from django.utils.encoding import smart_bytes
+from django.utils.http import http_date
+from django.utils.http import parse_http_date_safe
+from django.utils.http import urlquote
+from django.utils.module_loading import import_by_path
+
+
+# Matches a single byte range of a Range header, like "bytes=0-499",
+# "bytes=500-" or "bytes=-500":
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# The number of bytes read at a time when streaming part of a file:
+CHUNK_SIZE = 8192
+
+
+class DjangoBackend(object):
+    """Stream files through Django.
+
+    Supports conditional GETs (If-None-Match and If-Modified-Since) and single
+    byte-range requests (Range and If-Range), so that clients can resume
+    interrupted downloads and avoid downloading unchanged files again.
+    """
+    def serve(self, request, path, content_type):
+        stat = os.stat(path)
+        size = stat.st_size
+        mtime = int(stat.st_mtime)
+        etag = '"{mtime:x}-{size:x}"'.format(mtime=mtime, size=size)
+
+        if self.not_modified(request, etag, mtime):
+            response = HttpResponseNotModified()
+        else:
+            byte_range = None
+            if self.range_applies(request, etag, mtime):
+                byte_range = self.parse_range(
+                    request.META.get('HTTP_RANGE', ''), size)
+
+            if byte_range is None:
+                response = StreamingHttpResponse(
+                    FileWrapper(open(path, 'rb')), content_type=content_type)
+                response['Content-Length'] = size
+            elif byte_range[0] >= size:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = 'bytes */{}'.format(size)
+            else:
+                start = byte_range[0]
+                end = byte_range[1]
+                response = StreamingHttpResponse(
+                    self.read_range(path, start, end),
+                    content_type=content_type, status=206)
+                response['Content-Length'] = end - start + 1
+                response['Content-Range'] = 'bytes {start}-{end}/{size}'.format(
+                    start=start, end=end, size=size)
+            response['Accept-Ranges'] = 'bytes'
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(mtime)
+        return response
+
+    def not_modified(self, request, etag, mtime):
+        """Return whether the client's copy of the file is still current.
+
+        If-None-Match takes precedence over If-Modified-Since, as the ETag
+        also changes when the size of the file does.
+        """
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            etags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in etags or etag in etags
+
+        if_modified_since = parse_http_date_safe(
+            request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return if_modified_since is not None and mtime <= if_modified_since
+
+    def range_applies(self, request, etag, mtime):
+        """Return whether a Range header in the request should be honored.
+
+        A request with an If-Range header only wants the range if the file
+        still matches the given ETag or date; otherwise the whole file is sent.
+        """
+        if 'HTTP_RANGE' not in request.META:
+            return False
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if if_range is None:
+            return True
+        if if_range.startswith('"') or if_range.startswith('W/'):
+            return if_range == etag
+        return parse_http_date_safe(if_range) == mtime
+
+    def parse_range(self, header, size):
+        """Return the (start, end) byte positions (inclusive) requested by the
+        given Range header. The range cannot be satisfied if start is not
+        within the file.
+
+        Return None if the header is malformed or asks for multiple ranges, in
+        which case the whole file is sent, as allowed by RFC 2616.
+        """
+        match = RANGE_RE.match(header.replace(' ', ''))
+        if not match:
+            return None
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            if not last:
+                return (start, size - 1)
+            if int(last) < start:
+                return None
+            return (start, min(int(last), size - 1))
+        elif last:
+            # A suffix range, asking for the last given number of bytes:
+            return (max(size - int(last), 0) if int(last) else size, size - 1)
+        return None
+
+    def read_range(self, path, start, end):
+        """Yield the bytes of the file from start to end (inclusive)."""
+        with open(path, 'rb') as range_file:
+            range_file.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = range_file.read(min(CHUNK_SIZE, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+
+
+class XSendfileBackend(object):
+    """Have the front-end server send the file using the X-Sendfile header, as
+    supported by Apache's mod_xsendfile and lighttpd.
+    """
+    def serve(self, request, path, content_type):
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = smart_bytes(path)
+        return response
+
+
+class XAccelRedirectBackend(object):
+    """Have nginx send the file using the X-Accel-Redirect header.
+
+    nginx needs an internal location at FILE_DELIVERY_ACCEL_PREFIX that is an
+    alias of MEDIA_ROOT, for instance:
+
+        location /protected-media/ {
+            internal;
+            alias /path/to/media/;
+        }
+    """
+    def serve(self, request, path, content_type):
+        relative_path = os.path.relpath(path, settings.MEDIA_ROOT)
+        if relative_path.startswith(os.pardir):
+            raise ValueError(
+                '{} is not inside MEDIA_ROOT and cannot be sent by '
+                'X-Accel-Redirect'.format(path))
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = urlquote(
+            settings.FILE_DELIVERY_ACCEL_PREFIX + relative_path.replace(
+                os.sep, '/'))
+        return response
+
+
+def get_backend():
+    """Return an instance of the file delivery backend given by the
+    FILE_DELIVERY_BACKEND setting.
+    """
+    return import_by_path(settings.FILE_DELIVERY_BACKEND)()
+
+
+def send_file(request, path, filename, content_type=None):
+    """Return a response for downloading the file at the given absolute path,
+    to be saved by the client with the given filename.
+
+    Views must check that the user is allowed to download the file before
+    calling this, since the file is sent as is.
+    """
+    if content_type is None:
+        content_type, _ = mimetypes.guess_type(path)
+    response = get_backend().serve(
+        request, path, content_type or 'application/octet-stream')
+    response['Content-Disposition'] = 'inline;filename="{}"'.format(
+        smart_bytes(filename, encoding='ascii'))
+    # The files are only available to some users, so they must not be stored
+    # by shared caches:
+    response['Cache-Control'] = 'private'
+    return response
@@ -1,4 +1,7 @@
+import datetime
 import os
+import StringIO
+import zipfile
 
 from django.core.management.base import CommandError
 from django.test import TestCase
@@ -9,6 +12,7 @@ import mox
 from quark.utils import create_dev_db
 from quark.utils.dev import DevServer
 from quark.utils.management.commands import dev as dev_cmd
+from quark.utils.zip_stream import generate_zip
 import quark.utils as dev_utils
 
 
@@ -217,3 +221,25 @@ class CreateDevDBTest(TestCase):
         self.mox.ReplayAll()
         create_dev_db.main()
         self.mox.VerifyAll()
+
+
+class ZipStreamTest(TestCase):
+    def test_generate_zip(self):
+        modified = datetime.datetime(2014, 3, 14, 9, 26, 54)
+        entries = [('first.pdf', 'first resume', modified),
+                   (u'se\xf1or.pdf', 'second resume', modified)]
+        chunks = list(generate_zip(iter(entries)))
+
+        # One chunk for each entry, and one for the archive's directory
+        self.assertEqual(len(chunks), 3)
+        zip_file = zipfile.ZipFile(StringIO.StringIO(''.join(chunks)))
+        self.assertIsNone(zip_file.testzip())
+        self.assertEqual(zip_file.namelist(), ['first.pdf', u'se\xf1or.pdf'])
+        self.assertEqual(zip_file.read('first.pdf'), 'first resume')
+        self.assertEqual(zip_file.getinfo('first.pdf').date_time,
+                         (2014, 3, 14, 9, 26, 54))
+
+        # An archive with no entries is still valid
+        chunks = list(generate_zip([]))
+        zip_file = zipfile.ZipFile(StringIO.StringIO(''.join(chunks)))
+        self.assertEqual(zip_file.namelist(), [])
@@ -0,0 +1,55 @@
+"""
+Streaming of ZIP archives (like resume books), so that an archive of many
+files can be sent as it is built, without first holding the whole archive in
+memory or writing it to disk.
+
+The zipfile module only needs to be able to write to and tell the position of
+the file it writes an archive to, as long as entries are added with writestr.
+Only the data of the entry being added is held in memory at a time.
+"""
+import zipfile
+
+
+class ZipStreamBuffer(object):
+    """A write-only file-like object that holds what is written to it until
+    it is drained, while keeping track of the position in the whole archive.
+    """
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.position += len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Return and forget everything written since the last drain."""
+        data = ''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def generate_zip(entries, compression=zipfile.ZIP_STORED):
+    """Yield the bytes of a ZIP archive of the given entries, one chunk per
+    entry and then one for the archive's directory.
+
+    The entries are (name, data, modified datetime) tuples. They can be
+    generated lazily, since each one is only used once its chunk is needed.
+    Entries are stored uncompressed by default, which suits files that are
+    already compressed (like PDFs).
+    """
+    zip_buffer = ZipStreamBuffer()
+    zip_file = zipfile.ZipFile(zip_buffer, 'w', compression, allowZip64=True)
+    for name, data, modified in entries:
+        info = zipfile.ZipInfo(name, date_time=modified.timetuple()[:6])
+        info.external_attr = 0644 << 16  # -rw-r--r--
+        zip_file.writestr(info, data, compress_type=compression)
+        yield zip_buffer.drain()
+    zip_file.close()
+    yield zip_buffer.drain()
@@ -1,11 +1,26 @@
+import codecs
 import json
 import os
+import re
+import time
+from contextlib import contextmanager
 
 from django.conf import settings
+from django.db import transaction
 
 
 NOIRO_MEDIA_LOCATION = '/var/noiro/media'
 
+# The number of bytes of a json file read at a time by iter_json_data
+JSON_CHUNK_SIZE = 64 * 1024
+
+# The number of objects inserted at a time (and in a single transaction) by
+# BulkImporter
+BULK_CHUNK_SIZE = 1000
+
+# Matches the whitespace and commas between the objects of a json list
+SEPARATOR_RE = re.compile(r'[\s,]*')
+
 
 def get_json_data(filename):
     """Return a list of json data for a model, given a filename."""
@@ -13,3 +28,146 @@ def get_json_data(filename):
         settings.WORKSPACE_ROOT, 'scripts', 'data', filename)
     with open(data_path, 'r') as json_file:
         return json.load(json_file)
+
+
+def iter_json_data(filename):
+    """Yield the json data for a model one object at a time, given a filename.
+
+    Unlike get_json_data, the file is parsed incrementally, so the whole dump
+    never has to be held in memory. The file must contain a json list of
+    objects, as written by dumpdata.
+    """
+    data_path = os.path.join(
+        settings.WORKSPACE_ROOT, 'scripts', 'data', filename)
+    decoder = json.JSONDecoder()
+    utf8_decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(data_path, 'r') as json_file:
+        data = utf8_decoder.decode(json_file.read(JSON_CHUNK_SIZE))
+        index = len(data) - len(data.lstrip())
+        if data[index:index + 1] != '[':
+            raise ValueError('{} does not contain a json list'.format(
+                filename))
+        index += 1
+        while True:
+            index = SEPARATOR_RE.match(data, index).end()
+            if data[index:index + 1] == ']':
+                return
+            try:
+                obj, index = decoder.raw_decode(data, index)
+            except ValueError:
+                # The next object has not been read completely yet
+                chunk = json_file.read(JSON_CHUNK_SIZE)
+                if not chunk:
+                    raise
+                data = data[index:] + utf8_decoder.decode(chunk)
+                index = 0
+                continue
+            yield obj
+
+
+def get_pk_set(model):
+    """Return the set of the primary keys of all objects of a model, for
+    checking foreign keys without querying for every row.
+    """
+    return set(model.objects.values_list('pk', flat=True))
+
+
+@contextmanager
+def suspend_signals(handlers):
+    """Disconnect the given (signal, receiver, sender) signal handlers for the
+    duration of the block, for instance to recompute what they maintain only
+    once after an import instead of after every saved row.
+    """
+    for signal, receiver, sender in handlers:
+        signal.disconnect(receiver, sender=sender)
+    try:
+        yield
+    finally:
+        for signal, receiver, sender in handlers:
+            signal.connect(receiver, sender=sender)
+
+
+class BulkImporter(object):
+    """Insert objects of a model in chunks using bulk_create, with each chunk
+    in its own transaction.
+
+    Objects whose primary key already exists are skipped, like with
+    get_or_create. Since bulk_create neither calls save nor sends post_save,
+    anything maintained by a model's save method or signal handlers must be
+    recomputed after the import. Use as a context manager, which inserts the
+    remaining objects and prints the throughput at the end:
+
+        with BulkImporter(EventType) as importer:
+            for model in iter_json_data('events.eventtype.json'):
+                importer.add(EventType(pk=model['pk'], ...))
+    """
+    def __init__(self, model, chunk_size=BULK_CHUNK_SIZE,
+                 keep_auto_now=False):
+        """If keep_auto_now is True, the values of the model's fields with
+        auto_now or auto_now_add are inserted as given, rather than replaced by
+        the current time.
+        """
+        self.model = model
+        self.chunk_size = chunk_size
+        self.keep_auto_now = keep_auto_now
+        self.existing_pks = get_pk_set(model)
+        self.pending = []
+        self.num_imported = 0
+        self.num_skipped = 0
+        self.start_time = time.time()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.finish()
+
+    def add(self, instance):
+        """Queue the given (unsaved) instance for insertion."""
+        if instance.pk in self.existing_pks:
+            self.num_skipped += 1
+            return
+        if instance.pk is not None:
+            self.existing_pks.add(instance.pk)
+        self.pending.append(instance)
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Insert all queued instances."""
+        if not self.pending:
+            return
+        auto_now_fields = []
+        if self.keep_auto_now:
+            # pylint: disable=W0212
+            auto_now_fields = [
+                (field, field.auto_now, field.auto_now_add)
+                for field in self.model._meta.fields
+                if getattr(field, 'auto_now', False) or
+                getattr(field, 'auto_now_add', False)]
+        try:
+            for field, _, _ in auto_now_fields:
+                field.auto_now = field.auto_now_add = False
+            with transaction.atomic():
+                self.model.objects.bulk_create(self.pending)
+        finally:
+            for field, auto_now, auto_now_add in auto_now_fields:
+                field.auto_now = auto_now
+                field.auto_now_add = auto_now_add
+        self.num_imported += len(self.pending)
+        self.pending = []
+
+    def finish(self):
+        """Insert the remaining queued instances and print the number of
+        objects imported per second.
+        """
+        self.flush()
+        elapsed = max(time.time() - self.start_time, 0.001)
+        # pylint: disable=W0212
+        print('Imported {num} {name} in {elapsed:.1f}s ({rate:.0f}/s), '
+              'skipped {skipped} existing'.format(
+                  num=self.num_imported,
+                  name=self.model._meta.verbose_name_plural,
+                  elapsed=elapsed, rate=self.num_imported / elapsed,
+                  skipped=self.num_skipped))
@@ -1,5 +1,20 @@
 from django.core.management import call_command
-
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_save
+
+from quark.achievements.exam_achievements import exam_achievements
+from quark.achievements.officership_achievements import (
+    officership_achievements)
+from quark.base.models import Officer
+from quark.candidates.models import Candidate
+from quark.candidates.models import candidate_leaderboard_post_save
+from quark.events.models import leaderboard_officer_post_save
+from quark.exams.models import Exam
+from quark.exams.models import store_exam_course
+from quark.exams.models import update_exam_catalog_entries
+from quark.user_profiles.models import UserProfile
+from quark.user_profiles.models import user_profile_search_token_post_save
+from scripts import suspend_signals
 from scripts.alter_tables import alter_tables
 from scripts.import_achievements_models import import_user_achievements
 from scripts.import_base_models import import_officers
@@ -18,6 +33,7 @@ from scripts.import_events_models import import_events
 from scripts.import_events_models import import_event_attendances
 from scripts.import_events_models import import_event_sign_ups
 from scripts.import_events_models import import_event_types
+from scripts.import_events_models import update_event_attendance_derived_data
 from scripts.import_exams_models import import_exams
 from scripts.import_exams_models import import_exam_flags
 from scripts.import_minutes_models import import_minutes
@@ -75,6 +91,23 @@ from scripts.import_user_models import import_users
 # minutes.minutes.json
 # quoteboard.quote.json
 # achievements.userachievement.json
+#
+# Models with many rows are inserted in bulk, so their save methods and
+# post_save signal handlers are not run. The signal handlers below are also
+# suspended while importing, and what they maintain is recomputed once all
+# models are imported.
+
+
+# The (signal, receiver, sender) signal handlers suspended while importing
+DERIVED_SIGNAL_HANDLERS = [
+    (post_save, candidate_leaderboard_post_save, Candidate),
+    (post_save, exam_achievements, Exam),
+    (pre_save, store_exam_course, Exam),
+    (post_save, update_exam_catalog_entries, Exam),
+    (post_save, leaderboard_officer_post_save, Officer),
+    (post_save, officership_achievements, Officer),
+    (post_save, user_profile_search_token_post_save, UserProfile),
+]
 
 print 'Backing up all current data to scripts/data/backup.json'
 backup = open('scripts/data/backup.json', 'w')
@@ -86,70 +119,91 @@ alter_tables()
 
 print 'Importing all models from noiro.'
 
-print 'Importing terms.'
-import_terms()
-
-print 'Importing departments.'
-import_departments()
-print 'Importing courses.'
-import_courses()
-print 'Importing instructors.'
-import_instructors()
-print 'Importing course instances.'
-import_course_instances()
-
-print 'Deleting current users.'
-delete_users()
-print 'Importing users.'
-import_users()
-print 'Deleting current user profiles.'
-delete_user_profiles()
-print 'Importing user profiles.'
-import_user_profiles()
-
-print 'Importing project reports.'
-import_project_reports()
-
-print 'Importing event types.'
-import_event_types()
-print 'Importing events.'
-import_events()
-print 'Importing event sign ups.'
-import_event_sign_ups()
-print 'Importing event attendances.'
-import_event_attendances()
-
-print 'Importing officers.'
-import_officers()
-
-print 'Importing resumes.'
-import_resumes()
-
-print 'Importing exams.'
-import_exams()
-print 'Importing exam flags.'
-import_exam_flags()
-
-print 'Importing candidates.'
-import_candidates()
-print 'Importing candidate challenge requirements.'
-import_challenge_requirements()
-print 'Importing challenges.'
-import_challenges()
-print 'Importing candidate event requirements.'
-import_event_requirements()
-print 'Importing candidate requirement progresses.'
-import_candidate_progresses()
-print 'Importing candidate exam requirements.'
-import_exam_files_requirements()
-
-print 'Importing minutes.'
-import_minutes()
-
-print 'Importing quotes.'
-import_quotes()
-
-print 'Importing user achievements.'
-import_user_achievements()
+with suspend_signals(DERIVED_SIGNAL_HANDLERS):
+    print 'Importing terms.'
+    import_terms()
+
+    print 'Importing departments.'
+    import_departments()
+    print 'Importing courses.'
+    import_courses()
+    print 'Importing instructors.'
+    import_instructors()
+    print 'Importing course instances.'
+    import_course_instances()
+
+    print 'Deleting current users.'
+    delete_users()
+    print 'Importing users.'
+    import_users()
+    print 'Deleting current user profiles.'
+    delete_user_profiles()
+    print 'Importing user profiles.'
+    import_user_profiles()
+
+    print 'Importing project reports.'
+    import_project_reports()
+
+    print 'Importing event types.'
+    import_event_types()
+    print 'Importing events.'
+    import_events()
+    print 'Importing event sign ups.'
+    import_event_sign_ups()
+    print 'Importing event attendances.'
+    import_event_attendances()
+
+    print 'Importing officers.'
+    import_officers()
+
+    print 'Importing resumes.'
+    import_resumes()
+
+    print 'Importing exams.'
+    import_exams()
+    print 'Importing exam flags.'
+    import_exam_flags()
+
+    print 'Importing candidates.'
+    import_candidates()
+    print 'Importing candidate challenge requirements.'
+    import_challenge_requirements()
+    print 'Importing challenges.'
+    import_challenges()
+    print 'Importing candidate event requirements.'
+    import_event_requirements()
+    print 'Importing candidate requirement progresses.'
+    import_candidate_progresses()
+    print 'Importing candidate exam requirements.'
+    import_exam_files_requirements()
+
+    print 'Importing minutes.'
+    import_minutes()
+
+    print 'Importing quotes.'
+    import_quotes()
+
+    print 'Importing user achievements.'
+    import_user_achievements()
+
+print 'Updating event attendance lists and queueing achievements.'
+update_event_attendance_derived_data()
+print 'Evaluating officership and exam achievements.'
+officers = dict((officer.user_id, officer) for officer in Officer.objects.all())
+for officer in officers.itervalues():
+    officership_achievements(Officer, officer, False)
+exams = dict((exam.submitter_id, exam) for exam in Exam.objects.filter(
+    submitter__isnull=False))
+for exam in exams.itervalues():
+    exam_achievements(Exam, exam, False)
+call_command('process_achievements')
+print 'Rebuilding leaderboards.'
+call_command('rebuild_leaderboards')
+print 'Counting event signups.'
+call_command('reconcile_signup_counts')
+print 'Rebuilding the course catalog.'
+call_command('rebuild_course_catalog')
+print 'Rebuilding the name search index.'
+call_command('rebuild_name_search_index')
 
 print 'All models successfully imported.'
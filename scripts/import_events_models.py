@@ -2,8 +2,10 @@ from dateutil import parser
 from django.contrib.auth import get_user_model
 from django.utils.timezone import get_current_timezone
 from django.utils.timezone import make_aware
+from django.utils.timezone import now
 from pytz import AmbiguousTimeError
 
+from quark.achievements.models import PendingAchievementEvaluation
 from quark.base.models import OfficerPosition
 from quark.base.models import Term
 from quark.events.models import Event
@@ -11,7 +13,9 @@ from quark.events.models import EventAttendance
 from quark.events.models import EventSignUp
 from quark.events.models import EventType
 from quark.project_reports.models import ProjectReport
-from scripts import get_json_data
+from scripts import BulkImporter
+from scripts import get_pk_set
+from scripts import iter_json_data
 from scripts.import_base_models import SEMESTER_TO_TERM
 
 
@@ -20,92 +24,136 @@ timezone = get_current_timezone()
 
 
 def import_event_types():
-    models = get_json_data('events.eventtype.json')
-    for model in models:
-        fields = model['fields']
-        EventType.objects.get_or_create(
-            pk=model['pk'],
-            name=fields['name'])
+    with BulkImporter(EventType) as importer:
+        for model in iter_json_data('events.eventtype.json'):
+            fields = model['fields']
+            importer.add(EventType(
+                pk=model['pk'],
+                name=fields['name']))
 
 
 def import_events():
-    models = get_json_data('events.event.json')
-    for model in models:
-        fields = model['fields']
-
-        # Convert the naive datetimes into aware datetimes
-        start_datetime = make_aware(
-            parser.parse(fields['start_datetime']), timezone)
-        end_datetime = make_aware(
-            parser.parse(fields['end_datetime']), timezone)
-
-        event, _ = Event.objects.get_or_create(
-            pk=model['pk'],
-            name=fields['name'],
-            event_type=EventType.objects.get(pk=fields['event_type']),
-            start_datetime=start_datetime,
-            end_datetime=end_datetime,
-            term=Term.objects.get(pk=SEMESTER_TO_TERM[fields['semester']]),
-            tagline=fields['tagline'],
-            description=fields['description'],
-            location=fields['location'],
-            contact=user_model.objects.get(pk=fields['contact']),
-            restriction=fields['restriction'],
-            signup_limit=fields['signup_limit'],
-            needs_drivers=fields['needs_drivers'],
-            cancelled=fields['cancelled'],
-            requirements_credit=fields['requirements_credit'])
-
-        if fields['committee']:
-            event.committee = OfficerPosition.objects.get(
-                pk=fields['committee'])
-        if fields['project_report']:
-            event.project_report = ProjectReport.objects.get(
-                pk=fields['project_report'])
-
-        event.save()
+    event_type_pks = get_pk_set(EventType)
+    user_pks = get_pk_set(user_model)
+    committee_pks = get_pk_set(OfficerPosition)
+    project_report_pks = get_pk_set(ProjectReport)
+
+    with BulkImporter(Event) as importer:
+        for model in iter_json_data('events.event.json'):
+            fields = model['fields']
+            if (fields['event_type'] not in event_type_pks or
+                    fields['contact'] not in user_pks):
+                print('ERROR: Missing event type or contact for event '
+                      '{}'.format(model['pk']))
+                continue
+
+            # Convert the naive datetimes into aware datetimes
+            start_datetime = make_aware(
+                parser.parse(fields['start_datetime']), timezone)
+            end_datetime = make_aware(
+                parser.parse(fields['end_datetime']), timezone)
+
+            event = Event(
+                pk=model['pk'],
+                name=fields['name'],
+                event_type_id=fields['event_type'],
+                start_datetime=start_datetime,
+                end_datetime=end_datetime,
+                term_id=SEMESTER_TO_TERM[fields['semester']],
+                tagline=fields['tagline'],
+                description=fields['description'],
+                location=fields['location'],
+                contact_id=fields['contact'],
+                restriction=fields['restriction'],
+                signup_limit=fields['signup_limit'],
+                needs_drivers=fields['needs_drivers'],
+                cancelled=fields['cancelled'],
+                requirements_credit=fields['requirements_credit'])
+
+            if fields['committee'] in committee_pks:
+                event.committee_id = fields['committee']
+            if fields['project_report'] in project_report_pks:
+                event.project_report_id = fields['project_report']
+
+            importer.add(event)
 
 
 def import_event_sign_ups():
-    models = get_json_data('events.eventsignup.json')
-    for model in models:
-        fields = model['fields']
-        pk = model['pk']
-
-        event_sign_up, _ = EventSignUp.objects.get_or_create(
-            pk=pk,
-            event=Event.objects.get(pk=fields['event']),
-            name=fields['name'],
-            driving=fields['driving'],
-            comments=fields['comments'],
-            email=fields['email'],
-            unsignup=fields['unsignup'])
-
-        if fields['person']:
-            event_sign_up.user = user_model.objects.get(pk=fields['person'])
-        event_sign_up.save()
-
-        try:
-            # Try to convert the naive datetime into an aware datetime, which
-            # may fail because of daylight savings time creating ambiguity for
-            # some timestamps
-            timestamp = make_aware(parser.parse(fields['timestamp']), timezone)
-
-            # Get a queryset of the single object so that update can be called,
-            # which doesn't call save and allows fields with auto_now=True to be
-            # overridden
-            event_sign_up = EventSignUp.objects.filter(pk=pk)
-            event_sign_up.update(timestamp=timestamp)
-        except AmbiguousTimeError:
-            print('ERROR: Could not import timestamp for {}'.format(
-                event_sign_up))
+    event_pks = get_pk_set(Event)
+    user_pks = get_pk_set(user_model)
+
+    # Keep the timestamps from noiro rather than using the time of the import
+    with BulkImporter(EventSignUp, keep_auto_now=True) as importer:
+        for model in iter_json_data('events.eventsignup.json'):
+            fields = model['fields']
+            pk = model['pk']
+            if fields['event'] not in event_pks:
+                print('ERROR: Missing event for event sign up {}'.format(
+                    pk))
+                continue
+
+            event_sign_up = EventSignUp(
+                pk=pk,
+                event_id=fields['event'],
+                name=fields['name'],
+                driving=fields['driving'],
+                comments=fields['comments'],
+                email=fields['email'],
+                unsignup=fields['unsignup'])
+
+            if fields['person'] in user_pks:
+                event_sign_up.user_id = fields['person']
+
+            try:
+                # Try to convert the naive datetime into an aware datetime,
+                # which may fail because of daylight savings time creating
+                # ambiguity for some timestamps
+                event_sign_up.timestamp = make_aware(
+                    parser.parse(fields['timestamp']), timezone)
+            except AmbiguousTimeError:
+                event_sign_up.timestamp = now()
+                print('ERROR: Could not import timestamp for event sign up '
+                      '{}'.format(pk))
+
+            importer.add(event_sign_up)
 
 
 def import_event_attendances():
-    models = get_json_data('events.eventattendance.json')
-    for model in models:
-        fields = model['fields']
-        EventAttendance.objects.get_or_create(
-            pk=model['pk'],
-            event=Event.objects.get(pk=fields['event']),
-            user=user_model.objects.get(pk=fields['person']))
+    event_pks = get_pk_set(Event)
+    user_pks = get_pk_set(user_model)
+
+    with BulkImporter(EventAttendance) as importer:
+        for model in iter_json_data('events.eventattendance.json'):
+            fields = model['fields']
+            if (fields['event'] not in event_pks or
+                    fields['person'] not in user_pks):
+                print('ERROR: Missing event or user for event attendance '
+                      '{}'.format(model['pk']))
+                continue
+
+            importer.add(EventAttendance(
+                pk=model['pk'],
+                event_id=fields['event'],
+                user_id=fields['person']))
+
+
+def update_event_attendance_derived_data():
+    """Recompute what EventAttendance.save and the event attendance signal
+    handlers maintain, which the bulk import of event attendances skips.
+
+    Should be run once all other models are imported, since the attendance
+    lists of project reports depend on the users' officer, candidate and
+    member statuses. The leaderboards must be rebuilt separately.
+    """
+    attendances = EventAttendance.objects.filter(
+        event__project_report__isnull=False).select_related(
+        'event__project_report', 'user__userprofile')
+    for attendance in attendances:
+        attendance.add_to_project_report()
+
+    for term in Term.objects.filter(event__isnull=False).distinct():
+        users = user_model.objects.filter(
+            eventattendance__event__term=term).distinct()
+        PendingAchievementEvaluation.objects.enqueue_users(
+            list(users), PendingAchievementEvaluation.EVENT_ATTENDANCE,
+            term=term)